@@ -14,6 +14,8 @@
 import os
 import sys
 import math
+sys.path.append('../lib/')
+import gf256
 
 class AES(object):
     '''AES funtions for a single block
@@ -194,17 +196,7 @@ class AES(object):
 
     def galois_multiplication(self, a, b):
         """Galois multiplication of 8 bit characters a and b."""
-        p = 0
-        for counter in range(8):
-            if b & 1: p ^= a
-            hi_bit_set = a & 0x80
-            a <<= 1
-            # keep a 8 bit
-            a &= 0xFF
-            if hi_bit_set:
-                a ^= 0x1b
-            b >>= 1
-        return p
+        return gf256.mul(a, b)
 
     #
     # substitute all the values from the state with the value in the SBox
@@ -599,19 +591,19 @@ def strip_PKCS7_padding(s):
 def encryptData(key, data, mode=AESModeOfOperation.modeOfOperation["CBC"]):
     """encrypt `data` using `key`
 
-    `key` should be a string of bytes.
+    `key` should be bytes.
 
     returned cipher is a string of bytes prepended with the initialization
     vector.
 
     """
-    key = map(ord, key)
+    key = list(key)
     if mode == AESModeOfOperation.modeOfOperation["CBC"]:
         data = append_PKCS7_padding(data)
     keysize = len(key)
     assert keysize in AES.keySize.values(), 'invalid key size: %s' % keysize
     # create a new iv using random data
-    iv = [ord(i) for i in os.urandom(16)]
+    iv = list(os.urandom(16))
     moo = AESModeOfOperation()
     (mode, length, ciph) = moo.encrypt(data, mode, key, keysize, iv)
     # With padding, the original length does not need to be known. It's a bad
@@ -622,18 +614,18 @@ def encryptData(key, data, mode=AESModeOfOperation.modeOfOperation["CBC"]):
 def decryptData(key, data, mode=AESModeOfOperation.modeOfOperation["CBC"]):
     """decrypt `data` using `key`
 
-    `key` should be a string of bytes.
+    `key` should be bytes.
 
     `data` should have the initialization vector prepended as a string of
     ordinal values.
     """
 
-    key = map(ord, key)
+    key = list(key)
     keysize = len(key)
     assert keysize in AES.keySize.values(), 'invalid key size: %s' % keysize
     # iv is first 16 bytes
-    iv = map(ord, data[:16])
-    data = map(ord, data[16:])
+    iv = [ord(c) for c in data[:16]]
+    data = [ord(c) for c in data[16:]]
     moo = AESModeOfOperation()
     decr = moo.decrypt(data, None, mode, key, keysize, iv)
     if mode == AESModeOfOperation.modeOfOperation["CBC"]:
@@ -646,20 +638,20 @@ def generateRandomKey(keysize):
     """
     if keysize not in (16, 24, 32):
         emsg = 'Invalid keysize, %s. Should be one of (16, 24, 32).'
-        raise ValueError, emsg % keysize
+        raise ValueError(emsg % keysize)
     return os.urandom(keysize)
 
 def testStr(cleartext, keysize=16, modeName = "CBC"):
     '''Test with random key, choice of mode.'''
-    print 'Random key test', 'Mode:', modeName
-    print 'cleartext:', cleartext
+    print('Random key test', 'Mode:', modeName)
+    print('cleartext:', cleartext)
     key =  generateRandomKey(keysize)
-    print 'Key:', [ord(x) for x in key]
+    print('Key:', list(key))
     mode = AESModeOfOperation.modeOfOperation[modeName]
     cipher = encryptData(key, cleartext, mode)
-    print 'Cipher:', [ord(x) for x in cipher]
+    print('Cipher:', [ord(x) for x in cipher])
     decr = decryptData(key, cipher, mode)
-    print 'Decrypted:', decr
+    print('Decrypted:', decr)
     
     
 if __name__ == "__main__":
@@ -669,10 +661,10 @@ if __name__ == "__main__":
     iv = [103,35,148,239,76,213,47,118,255,222,123,176,106,134,98,92]
     mode, orig_len, ciph = moo.encrypt(cleartext, moo.modeOfOperation["CBC"],
             cypherkey, moo.aes.keySize["SIZE_128"], iv)
-    print 'm=%s, ol=%s (%s), ciph=%s' % (mode, orig_len, len(cleartext), ciph)
+    print('m=%s, ol=%s (%s), ciph=%s' % (mode, orig_len, len(cleartext), ciph))
     decr = moo.decrypt(ciph, orig_len, mode, cypherkey,
             moo.aes.keySize["SIZE_128"], iv)
-    print decr
+    print(decr)
     testStr(cleartext, 16, "CBC")
     
 
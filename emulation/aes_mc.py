@@ -1,3 +1,6 @@
+import sys
+sys.path.append('../lib/')
+import gf256
 
 # galois multiplication of the 4x4 matrix
 def mixcolumns(state, isinv):
@@ -17,7 +20,7 @@ def mixColumn(column, isInv):
     if isInv: mult = [14, 11, 13, 9]
     else: mult = [2, 3, 1, 1]
     cpy = list(column)
-    g = galois_multiplication
+    g = gf256.mul
 
     column[0] = g(cpy[0], mult[0]) ^ g(cpy[3], mult[1]) ^ \
                 g(cpy[2], mult[2]) ^ g(cpy[1], mult[3])
@@ -30,23 +33,8 @@ def mixColumn(column, isInv):
     return column
 
 
-def galois_multiplication(a, b):
-    """Galois multiplication of 8 bit characters a and b."""
-    p = 0
-    for counter in range(8):
-        if b & 1: p ^= a
-        hi_bit_set = a & 0x80
-        a <<= 1
-        # keep a 8 bit
-        a &= 0xFF
-        if hi_bit_set:
-            a ^= 0x1b
-        b >>= 1
-    return p
-
-
 x = mixcolumns( [200 if i==15 else 0 for i in range(16)], 0)
 print([hex(y) for y in x])
-print mixcolumns(x, 1)
-print(galois_multiplication(200,2))
-print(galois_multiplication(200,3))
+print(mixcolumns(x, 1))
+print(gf256.MUL2[200])
+print(gf256.MUL3[200])
@@ -0,0 +1,576 @@
+import sys
+import collections
+import heapq
+import itertools
+import math
+import random
+import time
+sys.path.append('../lib/')
+import eth
+import ffcp
+
+# discrete-event simulation of the FFCP transmit path (see
+# hdl/networking/ffcp.v): the laptop fills the sending FPGA's packet
+# buffer queue, ffcp_tx_server sends packets from it over a link with
+# configurable rate, latency, loss and reordering, and ffcp_rx_server on
+# the receiving FPGA commits them in order and sends back acks
+# packets are only modelled by their index and an id, so that long runs
+# and parameter sweeps are cheap; unlike lib/ffcp.py, this follows the HDL
+# down to its timers and one-packet-at-a-time commit and ack paths
+# time is kept in integer picoseconds, so the simulation is exact, and the
+# timers keep a deadline and a single pending event instead of one event
+# per restart
+# a saturated link reaches a steady state that repeats every few packets;
+# loss and reordering are drawn ahead as the number of frames until the next
+# lost or delayed one, so everything in between is deterministic, and once
+# the state (relative to the current time and packet id) repeats, whole
+# periods are skipped at once up to the next random frame (fast_forward)
+
+CLK_FREQ = 50e6
+TIME_UNIT = 1e-12
+BUFFER_LEN = ffcp.BUFFER_LEN
+INDEX_MASK = ffcp.INDEX_MASK
+# preamble and inter-frame gap
+ETH_OVERHEAD = 8 + 12
+MSG_FRAME_LEN = eth.HEADER_LEN + eth.FFCP_LEN + eth.CRC_LEN
+ACK_FRAME_LEN = eth.HEADER_LEN + ffcp.ETH_MIN_PAYLOAD + eth.CRC_LEN
+
+DEFAULT_PARAMS = {
+	'window_len': ffcp.WINDOW_LEN,
+	# in clock cycles, as in ffcp_tx_server
+	'resend_timeout': 500000,
+	'resyn_timeout': 50000000,
+	'pb_queue_len': eth.PB_QUEUE_LEN,
+	'pb_almost_full_thres': eth.PB_QUEUE_ALMOST_FULL_THRES,
+	# bits/s
+	'link_rate': 100e6,
+	# one-way latency in seconds
+	'latency': 20e-6,
+	# probability that a frame is lost
+	'loss': 0.0,
+	# probability that a frame is delayed by up to reorder_delay
+	'reorder': 0.0,
+	'reorder_delay': 200e-6,
+	# time taken to commit a packet to the FGP DMA pipeline, in cycles
+	'commit_cycles': eth.FGP_LEN + 16,
+	# FGP packets per second pushed by the laptop; None to keep the
+	# packet buffer queue full
+	'offered_rate': None,
+	# stop pushing while the queue is almost full (the laptop watching
+	# the almost_full flag) instead of overflowing it
+	'respect_almost_full': False,
+	# accept acks for the entire window and re-ack duplicates (see
+	# lib/ffcp.py); False models the HDL exactly
+	'host_fixes': False,
+	# skip repeating periods of the steady state; False runs every event
+	'fast_forward': True,
+	'seed': 0,
+}
+
+# states remembered while looking for a period, before starting over; after
+# that many acks without a period, the search backs off for as many acks
+# (doubling every time)
+HISTORY_LEN = 256
+# don't search when the next random frame is closer than this
+MIN_FAST_FORWARD_FRAMES = 4 * BUFFER_LEN
+
+def ticks(seconds):
+	return round(seconds / TIME_UNIT)
+
+EV_PUSH, EV_TX_DONE, EV_RX_MSG, EV_COMMIT_DONE, EV_ACK_TX_DONE, \
+	EV_RX_ACK, EV_RESEND, EV_RESYN = range(8)
+TIMER_EVENTS = (EV_RESEND, EV_RESYN)
+
+class Sim:
+	def __init__(self, **params):
+		self.p = dict(DEFAULT_PARAMS)
+		for key in params:
+			if key not in self.p:
+				raise KeyError('unknown parameter %s' % key)
+		self.p.update(params)
+		p = self.p
+		assert(p['window_len'] < BUFFER_LEN)
+		self.rand = random.Random(p['seed'])
+		self.msg_time = ticks((MSG_FRAME_LEN + ETH_OVERHEAD) * 8 /
+			p['link_rate'])
+		self.ack_time = ticks((ACK_FRAME_LEN + ETH_OVERHEAD) * 8 /
+			p['link_rate'])
+		cycle = ticks(1 / CLK_FREQ)
+		self.resend_timeout = p['resend_timeout'] * cycle
+		self.resyn_timeout = p['resyn_timeout'] * cycle
+		self.commit_time = p['commit_cycles'] * cycle
+		self.latency = ticks(p['latency'])
+		self.push_interval = (ticks(1 / p['offered_rate'])
+			if p['offered_rate'] else None)
+		self.events = []
+		self.seq = itertools.count()
+		self.now = 0
+
+		# frames put on the link (messages and acks), and the next ones to
+		# be lost or reordered
+		self.frames = 0
+		self.next_lost = self.next_random(p['loss'])
+		self.next_reorder = self.next_random(p['reorder'])
+		# signature -> counters when the state was seen, and the latencies
+		# recorded since history was last cleared
+		self.history = {}
+		self.journal = []
+		self.skipped_time = 0
+		self.backoff = HISTORY_LEN
+		self.cooldown = 0
+
+		# packet buffer queue: (id, time generated) of unacked packets
+		self.pb = []
+		self.pb_head = 0
+		self.next_id = 0
+		# transmit server
+		self.tx_head = 0
+		self.tx_curr = 0
+		self.syn_buf = True
+		self.tx_busy = False
+		# timers: deadline, and whether an event for them is pending
+		self.resend_deadline = None
+		self.resend_pending = False
+		self.resyn_deadline = None
+		self.resyn_pending = False
+		self.resyn_armed = True
+		# receive server
+		self.rx_head = 0
+		self.rx_received = [None] * BUFFER_LEN
+		self.committing = False
+		self.ack_buf = False
+		self.ack_busy = False
+		# packets are queued in id order, so anything up to these ids has
+		# been sent or committed before
+		self.max_sent = -1
+		self.max_committed = -1
+
+		self.stats = {
+			'pushed': 0, 'overflows': 0, 'msgs_sent': 0, 'retransmits': 0,
+			'resends': 0, 'resyns': 0, 'acks_sent': 0, 'lost': 0,
+			'commits': 0, 'duplicate_commits': 0, 'skipped': 0,
+		}
+		self.good = 0
+		# latency -> number of packets
+		self.latencies = collections.Counter()
+		# packets held by the laptop: (id, time generated)
+		self.backlog = collections.deque()
+
+	def schedule(self, delay, kind, data=None):
+		heapq.heappush(self.events, (self.now + delay, next(self.seq),
+			kind, data))
+
+	# number of the next frame hit by an event of probability prob per
+	# frame (geometric), or None if it never happens
+	def next_random(self, prob, start=0):
+		if not prob:
+			return None
+		if prob >= 1:
+			return start
+		return start + int(math.log(1.0 - self.rand.random()) /
+			math.log(1.0 - prob))
+
+	# puts a frame on the link, and returns its delay, or None if it is lost
+	def link_frame(self):
+		frame = self.frames
+		self.frames += 1
+		delay = self.latency
+		if frame == self.next_reorder:
+			self.next_reorder = self.next_random(self.p['reorder'], frame + 1)
+			delay += ticks(self.rand.random() * self.p['reorder_delay'])
+			self.forget()
+		if frame == self.next_lost:
+			self.next_lost = self.next_random(self.p['loss'], frame + 1)
+			self.stats['lost'] += 1
+			self.forget()
+			return None
+		return delay
+
+	# restarts a timer; the pending event, if any, moves on to the new
+	# deadline when it fires
+	def set_resend_timer(self):
+		self.resend_deadline = self.now + self.resend_timeout
+		if not self.resend_pending:
+			self.resend_pending = True
+			self.schedule(self.resend_timeout, EV_RESEND)
+
+	def set_resyn_timer(self):
+		self.resyn_deadline = self.now + self.resyn_timeout
+		self.resyn_armed = True
+		if not self.resyn_pending:
+			self.resyn_pending = True
+			self.schedule(self.resyn_timeout, EV_RESYN)
+
+	# laptop side
+
+	# a new FGP packet from the laptop; without respect_almost_full, it is
+	# lost when the queue is full, otherwise the laptop holds on to it
+	def push(self):
+		self.schedule(self.push_interval, EV_PUSH)
+		if (not self.p['respect_almost_full'] and
+			len(self.pb) - self.pb_head >= self.p['pb_queue_len']):
+			self.stats['overflows'] += 1
+			return
+		self.backlog.append((self.next_id, self.now))
+		self.next_id += 1
+		self.fill()
+		self.tx_kick()
+
+	def fill(self):
+		limit = (self.p['pb_almost_full_thres']
+			if self.p['respect_almost_full'] else self.p['pb_queue_len'])
+		saturate = self.p['offered_rate'] is None
+		while len(self.pb) - self.pb_head < limit:
+			if self.backlog:
+				self.pb.append(self.backlog.popleft())
+			elif saturate:
+				self.pb.append((self.next_id, self.now))
+				self.next_id += 1
+			else:
+				break
+			self.stats['pushed'] += 1
+
+	# ffcp_tx_server
+
+	def window_off(self, index):
+		return (index - self.tx_head) & INDEX_MASK
+
+	def at_end(self):
+		off = self.window_off(self.tx_curr)
+		return off == self.p['window_len'] or off >= len(self.pb) - self.pb_head
+
+	def tx_kick(self):
+		if self.tx_busy:
+			return
+		if self.at_end():
+			return
+		index = self.tx_curr
+		pkt = self.pb[self.pb_head + self.window_off(index)]
+		is_syn = self.syn_buf and index == 0
+		self.tx_curr = (index + 1) & INDEX_MASK
+		self.tx_busy = True
+		self.stats['msgs_sent'] += 1
+		if pkt[0] <= self.max_sent:
+			self.stats['retransmits'] += 1
+		else:
+			self.max_sent = pkt[0]
+		self.schedule(self.msg_time, EV_TX_DONE)
+		delay = self.link_frame()
+		if delay is not None:
+			self.schedule(self.msg_time + delay, EV_RX_MSG,
+				(is_syn, index, pkt))
+
+	def tx_done(self):
+		self.tx_busy = False
+		if self.at_end():
+			# the resend timer runs while there is nothing to send
+			self.set_resend_timer()
+		else:
+			self.tx_kick()
+
+	def resend(self):
+		if self.resend_deadline > self.now:
+			self.schedule(self.resend_deadline - self.now, EV_RESEND)
+			return
+		self.resend_pending = False
+		if self.tx_busy or not self.at_end():
+			return
+		if self.tx_curr != self.tx_head:
+			self.stats['resends'] += 1
+			self.tx_curr = self.tx_head
+			self.tx_kick()
+
+	def rx_ack(self, index):
+		self.set_resyn_timer()
+		off = self.window_off(index)
+		limit = self.p['window_len'] + (1 if self.p['host_fixes'] else 0)
+		if off >= limit or off > len(self.pb) - self.pb_head:
+			return
+		self.syn_buf = False
+		self.pb_head += off
+		if self.pb_head > 4096:
+			del self.pb[:self.pb_head]
+			self.pb_head = 0
+		curr_off = (index - self.tx_curr) & INDEX_MASK
+		self.tx_head = index
+		if curr_off < self.p['window_len']:
+			self.tx_curr = index
+		self.fill()
+		self.tx_kick()
+
+	def resyn(self):
+		if self.resyn_deadline > self.now:
+			self.schedule(self.resyn_deadline - self.now, EV_RESYN)
+			return
+		self.resyn_pending = False
+		if not self.resyn_armed:
+			return
+		self.resyn_armed = False
+		self.stats['resyns'] += 1
+		self.tx_head = 0
+		self.tx_curr = 0
+		self.syn_buf = True
+		self.tx_kick()
+
+	# ffcp_rx_server
+
+	def rx_msg(self, data):
+		is_syn, index, pkt = data
+		if is_syn:
+			self.rx_head = 0
+			self.rx_received = [None] * BUFFER_LEN
+			self.ack_buf = True
+		elif (index - self.rx_head) & INDEX_MASK >= self.p['window_len']:
+			if self.p['host_fixes']:
+				self.ack_buf = True
+				self.rx_kick()
+			return
+		self.rx_received[index] = pkt
+		self.rx_kick()
+
+	def rx_kick(self):
+		if self.committing:
+			return
+		pkt = self.rx_received[self.rx_head]
+		if pkt is not None:
+			self.committing = True
+			self.ack_buf = True
+			self.schedule(self.commit_time, EV_COMMIT_DONE, pkt)
+		elif self.ack_buf and not self.ack_busy:
+			self.ack_buf = False
+			self.ack_busy = True
+			self.stats['acks_sent'] += 1
+			self.schedule(self.ack_time, EV_ACK_TX_DONE)
+			delay = self.link_frame()
+			if delay is not None:
+				self.schedule(self.ack_time + delay, EV_RX_ACK, self.rx_head)
+
+	def commit_done(self, pkt):
+		pkt_id, gen_time = pkt
+		self.committing = False
+		self.rx_received[self.rx_head] = None
+		self.rx_head = (self.rx_head + 1) & INDEX_MASK
+		self.stats['commits'] += 1
+		if pkt_id <= self.max_committed:
+			self.stats['duplicate_commits'] += 1
+		else:
+			if pkt_id != self.max_committed + 1:
+				self.stats['skipped'] += pkt_id - self.max_committed - 1
+			self.max_committed = pkt_id
+			self.good += 1
+			self.latencies[self.now - gen_time] += 1
+			self.journal.append(self.now - gen_time)
+		self.rx_kick()
+
+	def ack_tx_done(self):
+		self.ack_busy = False
+		self.rx_kick()
+
+	# packets as (id, time generated), relative to the next id and now
+	def rel_pkt(self, pkt):
+		return pkt and (pkt[0] - self.next_id, pkt[1] - self.now)
+
+	def shift_pkt(self, pkt, ids, shift):
+		return pkt and (pkt[0] + ids, pkt[1] + shift)
+
+	def rel_data(self, kind, data):
+		if kind == EV_RX_MSG:
+			return data[0], data[1], self.rel_pkt(data[2])
+		if kind == EV_COMMIT_DONE:
+			return self.rel_pkt(data)
+		return data
+
+	def shift_data(self, kind, data, ids, shift):
+		if kind == EV_RX_MSG:
+			return data[0], data[1], self.shift_pkt(data[2], ids, shift)
+		if kind == EV_COMMIT_DONE:
+			return self.shift_pkt(data, ids, shift)
+		return data
+
+	# everything that decides what happens next, relative to now and the
+	# next packet id; events keep their order, which breaks ties in time
+	# the timers are represented by their deadlines, since their pending
+	# events do nothing before them
+	def signature(self):
+		now = self.now
+		rel_pkt = self.rel_pkt
+		return (
+			tuple((t - now, kind, self.rel_data(kind, data))
+				for t, _, kind, data in sorted(self.events)
+				if kind not in TIMER_EVENTS),
+			tuple(map(rel_pkt, self.pb[self.pb_head:])),
+			tuple(map(rel_pkt, self.backlog)),
+			tuple(map(rel_pkt, self.rx_received)),
+			self.tx_head, self.tx_curr, self.syn_buf, self.tx_busy,
+			self.resend_pending and self.resend_deadline - now,
+			self.resyn_pending and self.resyn_deadline - now,
+			self.resyn_armed, self.rx_head, self.committing, self.ack_buf,
+			self.ack_busy, self.max_sent - self.next_id,
+			self.max_committed - self.next_id,
+		)
+
+	# a period that repeats must not contain a random frame
+	def forget(self):
+		self.history.clear()
+		self.journal.clear()
+
+	def counters(self):
+		return (self.now, self.next_id, self.frames, self.good,
+			len(self.journal), tuple(self.stats.values()))
+
+	# looks for the current state in history, and if it was seen before,
+	# repeats the period in between as many times as fits before duration
+	# and the next random frame
+	def fast_forward(self, duration):
+		if self.cooldown:
+			self.cooldown -= 1
+			return
+		for next_frame in (self.next_lost, self.next_reorder):
+			if (next_frame is not None and
+				next_frame - self.frames < MIN_FAST_FORWARD_FRAMES):
+				return
+		sig = self.signature()
+		seen = self.history.get(sig)
+		if seen is None:
+			if len(self.history) >= HISTORY_LEN:
+				self.forget()
+				self.cooldown = self.backoff
+				self.backoff *= 2
+			else:
+				self.history[sig] = self.counters()
+			return
+		now, next_id, frames, good, journal_len, stats = seen
+		period = self.now - now
+		periods = (duration - self.now) // period
+		d_frames = self.frames - frames
+		for next_frame in (self.next_lost, self.next_reorder):
+			if next_frame is not None and d_frames:
+				periods = min(periods, (next_frame - self.frames) // d_frames)
+		latencies = self.journal[journal_len:]
+		self.forget()
+		if periods <= 0:
+			return
+		self.backoff = HISTORY_LEN
+		shift = periods * period
+		ids = periods * (self.next_id - next_id)
+		for i, (t, seq, kind, data) in enumerate(self.events):
+			self.events[i] = (t + shift, seq, kind,
+				self.shift_data(kind, data, ids, shift))
+		self.pb[self.pb_head:] = [self.shift_pkt(pkt, ids, shift)
+			for pkt in self.pb[self.pb_head:]]
+		self.backlog = collections.deque(self.shift_pkt(pkt, ids, shift)
+			for pkt in self.backlog)
+		self.rx_received = [self.shift_pkt(pkt, ids, shift)
+			for pkt in self.rx_received]
+		if self.resend_deadline is not None:
+			self.resend_deadline += shift
+		if self.resyn_deadline is not None:
+			self.resyn_deadline += shift
+		self.now += shift
+		self.skipped_time += shift
+		self.next_id += ids
+		self.max_sent += ids
+		self.max_committed += ids
+		self.frames += periods * d_frames
+		self.good += periods * (self.good - good)
+		for key, before in zip(self.stats, stats):
+			self.stats[key] += periods * (self.stats[key] - before)
+		for latency in latencies:
+			self.latencies[latency] += periods
+
+	def run(self, duration):
+		duration = ticks(duration)
+		self.fill()
+		if self.p['offered_rate']:
+			self.schedule(0, EV_PUSH)
+		self.set_resyn_timer()
+		self.tx_kick()
+		handlers = {
+			EV_PUSH: lambda data: self.push(),
+			EV_TX_DONE: lambda data: self.tx_done(),
+			EV_RX_MSG: self.rx_msg,
+			EV_COMMIT_DONE: self.commit_done,
+			EV_ACK_TX_DONE: lambda data: self.ack_tx_done(),
+			EV_RX_ACK: self.rx_ack,
+			EV_RESEND: lambda data: self.resend(),
+			EV_RESYN: lambda data: self.resyn(),
+		}
+		fast_forward = self.p['fast_forward']
+		events = self.events
+		while events and events[0][0] <= duration:
+			t, _, kind, data = heapq.heappop(events)
+			self.now = t
+			handlers[kind](data)
+			# every period of the steady state has an ack in it
+			if fast_forward and kind == EV_RX_ACK:
+				self.fast_forward(duration)
+		self.now = duration
+		return self.results(duration * TIME_UNIT)
+
+	def results(self, duration):
+		res = dict(self.stats)
+		res['goodput_bps'] = self.good * eth.FGP_LEN * 8 / duration
+		res['goodput_pps'] = self.good / duration
+		res['link_util'] = res['goodput_pps'] * self.msg_time * TIME_UNIT
+		res['fast_forward_s'] = self.skipped_time * TIME_UNIT
+		n = sum(self.latencies.values())
+		for pct in [50, 99]:
+			res['latency_p%d_us' % pct] = None
+			rank = min(n - 1, n * pct // 100)
+			for latency in sorted(self.latencies):
+				rank -= self.latencies[latency]
+				if rank < 0:
+					res['latency_p%d_us' % pct] = latency * TIME_UNIT * 1e6
+					break
+		return res
+
+def simulate(duration, **params):
+	return Sim(**params).run(duration)
+
+# runs simulate for every combination of the given parameter values
+def sweep(duration, grid, **params):
+	keys = sorted(grid)
+	rows = []
+	for values in itertools.product(*(grid[key] for key in keys)):
+		run_params = dict(params)
+		run_params.update(zip(keys, values))
+		res = simulate(duration, **run_params)
+		rows.append((dict(zip(keys, values)), res))
+	return rows
+
+COLUMNS = ['goodput_pps', 'link_util', 'retransmits', 'resends', 'resyns',
+	'overflows', 'duplicate_commits', 'skipped', 'latency_p50_us', 'latency_p99_us']
+
+def print_csv(rows):
+	keys = list(rows[0][0]) if rows else []
+	print(','.join(keys + COLUMNS))
+	for params, res in rows:
+		print(','.join([str(params[key]) for key in keys] +
+			[('%.4g' % res[col]) if isinstance(res[col], float) else
+				str(res[col]) for col in COLUMNS]))
+
+if __name__ == '__main__':
+	# example sweeps: window length and resend timeout against loss at the
+	# current laptop frame rate, and window length with a saturating sender
+	DURATION = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+	start = time.time()
+	runs = 0
+	for grid, params in [
+		({
+			'window_len': [1, 2, 4, 8, 14],
+			'resend_timeout': [50000, 500000, 5000000],
+			'loss': [0.0, 0.01, 0.05],
+		}, {'offered_rate': 12 * 32}),
+		({
+			'window_len': [2, 4, 8, 14],
+			'loss': [0.0, 0.01],
+			'host_fixes': [False, True],
+		}, {}),
+	]:
+		rows = sweep(DURATION, grid, **params)
+		print_csv(rows)
+		print()
+		runs += len(rows)
+	elapsed = time.time() - start
+	print('# simulated %.0f s in %.1f s' % (DURATION * runs, elapsed),
+		file=sys.stderr)
@@ -7,3 +7,13 @@ sample_header[10] = 0
 sample_header[11] = 0
 print('computed: 0x%x' % ip.ipv4_checksum(bytes(sample_header)))
 print('expected: 0xc7fd')
+print('fast: 0x%x' % ip.fast_checksum(bytes(sample_header)))
+
+# incremental update should match recomputing from scratch
+header = bytearray.fromhex('45000166718a00008011c7fd00000000ffffffff')
+ip.ip_set_ttl(header, 64)
+ip.ip_set_total_len(header, 0x0200)
+print('incremental: 0x%x' % ((header[10] << 8) | header[11]))
+header[10] = 0
+header[11] = 0
+print('recomputed: 0x%x' % ip.fast_checksum(bytes(header)))
@@ -1,18 +1,141 @@
-def mul_to_shift(index, number):
-    digits = bin(number)[2:][::-1]
-    st = ""
-    for x in range(len(digits)):
-        if digits[x] == '1':
-            st+="d"*x + "bytes["+index+"]"
-            st+="^"
-    return st
-
-
-indices = [14,11,13,9]*4
-
-for i in range(0, 12, 3):
-    print(mul_to_shift("j", indices[i]))
-    print(mul_to_shift("j+4", indices[i+1]))
-    print(mul_to_shift("j+8", indices[i+2]))
-    print(mul_to_shift("j+12", indices[i+3]))
-    print('---')
+import sys
+sys.path.append('../lib/')
+import gf256
+import aes_hdl
+
+# generates the mixcolumns module of hdl/crypto/aes.v
+# multiplying by a constant is linear over GF(2), so each output bit is the
+# xor of a fixed set of input bits; the xtime terms that cancel are dropped,
+# and each bit is written as a balanced xor tree instead of going through
+# chained xtime wires
+# usage: python3 mul_to_shift.py [--write]
+# prints the module and the xor depths, and with --write replaces the
+# module in hdl/crypto/aes.v
+
+AES_V = '../hdl/crypto/aes.v'
+MODULE_START = 'module mixcolumns('
+LINE_LEN = 80
+
+# input bits of output bit t of byte j+4*r (bytes[i] = in[i*8+7:i*8]), for
+# the column matrix whose first row is mults
+def output_terms(mults, j, r, t):
+	terms = []
+	for c in range(4):
+		row = gf256.mul_matrix(mults[(c - r) % 4])[t]
+		terms += [8 * (j + 4 * c) + k for k in range(8) if row >> k & 1]
+	return sorted(terms)
+
+def network(mults):
+	return [output_terms(mults, i % 4, i // 4, t)
+		for i in range(16) for t in range(8)]
+
+def evaluate(net, x):
+	out = 0
+	for bit, terms in enumerate(net):
+		out |= (sum(x >> k & 1 for k in terms) & 1) << bit
+	return out
+
+def tree_depth(n):
+	return (n - 1).bit_length()
+
+# depth of the chained network this replaces, as written: dbytes, ddbytes
+# and dddbytes each add a level to the bits that get the 0x1b reduction,
+# and the terms of every mixed byte are xored from left to right
+def xtime_depth(mults):
+	levels = [[0] * 8]
+	for _ in range(3):
+		prev = levels[-1]
+		levels.append([prev[7] if t == 0 else
+			max(prev[t-1], prev[7]) + 1 if t in (1, 3, 4) else prev[t-1]
+			for t in range(8)])
+	depth = 0
+	for t in range(8):
+		operands = [levels[k][t] for m in mults for k in range(4)
+			if m >> k & 1]
+		bit_depth = operands[0]
+		for d in operands[1:]:
+			bit_depth = max(bit_depth, d) + 1
+		depth = max(depth, bit_depth)
+	return depth
+
+def xor_tree(names):
+	if len(names) == 1:
+		return names[0]
+	mid = (len(names) + 1) // 2
+	left, right = xor_tree(names[:mid]), xor_tree(names[mid:])
+	if mid > 1:
+		left = '(%s)' % left
+	if len(names) - mid > 1:
+		right = '(%s)' % right
+	return '%s ^ %s' % (left, right)
+
+def gen_assign(name, bit, terms):
+	words = ('assign %s[%d] = %s;' % (name, bit,
+		xor_tree(['in[%d]' % k for k in terms]))).split(' ')
+	lines = ['    ']
+	for word in words:
+		if len(lines[-1]) + len(word) + 1 > LINE_LEN:
+			lines.append('        ')
+		elif lines[-1].strip():
+			lines[-1] += ' '
+		lines[-1] += word
+	return '\n'.join(lines)
+
+def gen_module(enc, dec):
+	max_terms = max(len(terms) for terms in enc + dec)
+	lines = [
+		'module mixcolumns(input [127:0] in,',
+		'                input decrypt, // flag, when set to 1 work in decrypt mode',
+		'                output [127:0] out);',
+		'',
+		'    // generated by emulation/mul_to_shift.py, do not edit',
+		'    // columns are bytes j, j+4, j+8, j+12 (bytes[i] = in[i*8+7:i*8]),',
+		'    // left multiplied by',
+		'    //   2 3 1 1        0E 0B 0D 09',
+		'    //   1 2 3 1        09 0E 0B 0D',
+		'    //   1 1 2 3        0D 09 0E 0B',
+		'    //   3 1 1 2        0B 0D 09 0E',
+		'    // for encryption and decryption; every output bit is the xor of',
+		'    // the input bits it depends on, at most %d of them, so the' %
+			max_terms,
+		'    // longest path is %d levels of 2-input xors' %
+			tree_depth(max_terms),
+		'',
+		'    wire [127:0] out_e, out_d;',
+		'',
+	]
+	lines += [gen_assign('out_e', bit, terms) for bit, terms in enumerate(enc)]
+	lines.append('')
+	lines += [gen_assign('out_d', bit, terms) for bit, terms in enumerate(dec)]
+	lines += [
+		'',
+		'    assign out = decrypt ? out_d : out_e;',
+		'endmodule',
+		'',
+	]
+	return '\n'.join(lines)
+
+enc = network(aes_hdl.MC_ENC)
+dec = network(aes_hdl.MC_DEC)
+# the networks are linear, so checking every single-bit input checks them
+# against the transliterated verilog for all inputs
+for k in range(128):
+	assert(evaluate(enc, 1 << k) == aes_hdl.mixcolumns_ref(1 << k))
+	assert(evaluate(dec, 1 << k) == aes_hdl.mixcolumns_ref(1 << k, True))
+
+module = gen_module(enc, dec)
+if '--write' in sys.argv[1:]:
+	with open(AES_V) as f:
+		src = f.read()
+	start = src.index(MODULE_START)
+	end = src.index('endmodule', start) + len('endmodule\n')
+	with open(AES_V, 'w') as f:
+		f.write(src[:start] + module + src[end:])
+else:
+	print(module)
+for name, net, mults in [('encrypt', enc, aes_hdl.MC_ENC),
+	('decrypt', dec, aes_hdl.MC_DEC)]:
+	max_terms = max(len(terms) for terms in net)
+	print('%s: %d xors, depth %d (chained xtime: depth %d)' % (name,
+		sum(len(terms) - 1 for terms in net), tree_depth(max_terms),
+		xtime_depth(mults)), file=sys.stderr)
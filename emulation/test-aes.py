@@ -0,0 +1,213 @@
+import sys
+import os
+import random
+import time
+sys.path.append('../lib/')
+import aes
+import aes_fast
+import aes_np
+import numpy as np
+
+slow = aes.AES()
+
+def slow_encrypt(key, block):
+	return bytes(slow.encrypt(list(block), list(key), len(key)))
+
+def slow_decrypt(key, block):
+	return bytes(slow.decrypt(list(block), list(key), len(key)))
+
+# FIPS-197 appendix C
+plaintext = bytes.fromhex('00112233445566778899aabbccddeeff')
+for key, expected in [
+	('000102030405060708090a0b0c0d0e0f',
+		'69c4e0d86a7b0430d8cdb78070b4c55a'),
+	('000102030405060708090a0b0c0d0e0f1011121314151617',
+		'dda97ca4864cdfe06eaf70a0ec0d7191'),
+	('000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f',
+		'8ea2b7ca516745bfeafc49904b496089'),
+]:
+	key = bytes.fromhex(key)
+	out = aes_fast.encrypt(key, plaintext)
+	print('%d-bit: %s %s' % (len(key) * 8, out.hex(),
+		'ok' if out.hex() == expected else 'expected ' + expected))
+	assert(aes_fast.decrypt(key, out) == plaintext)
+
+# GF(2^8) tables against shift and add multiplication
+import gf256
+for a in range(256):
+	for b in range(256):
+		assert(gf256.mul(a, b) == gf256.mul_bits(a, b))
+	if a:
+		assert(gf256.mul(a, gf256.inverse(a)) == 1)
+for c, table in gf256.MUL.items():
+	assert(list(table) == [gf256.mul_bits(c, x) for x in range(256)])
+
+# random blocks against SlowAES
+rand = random.Random(0)
+for i in range(300):
+	key = bytes(rand.getrandbits(8) for _ in range(aes_fast.KEY_LENS[i % 3]))
+	block = bytes(rand.getrandbits(8) for _ in range(16))
+	rk, dk = aes_fast.expand_key(key)
+	assert(aes_fast.encrypt_block(rk, block) == slow_encrypt(key, block))
+	assert(aes_fast.decrypt_block(dk, block) == slow_decrypt(key, block))
+print('matches SlowAES')
+
+# modes against AESModeOfOperation, which takes the plaintext as a string
+moo = aes.AESModeOfOperation()
+for mode_name, length in [('CBC', 768), ('CFB', 769), ('OFB', 769)]:
+	key = os.urandom(16)
+	iv = os.urandom(16)
+	data = os.urandom(length)
+	_, _, expected = moo.encrypt(data.decode('latin-1'),
+		moo.modeOfOperation[mode_name], list(key), len(key), list(iv))
+	cipher = aes_fast.Cipher(key)
+	new_mode = {'CBC': cipher.cbc, 'CFB': cipher.cfb, 'OFB': cipher.ofb}[
+		mode_name]
+	assert(new_mode(iv).encrypt(data) == bytes(expected))
+	# in place, and in pieces through a generator
+	buf = bytearray(data)
+	assert(new_mode(iv).encrypt(buf, buf) == bytes(expected))
+	chunks = [data[i:i+100] for i in range(0, len(data), 100)]
+	out = b''.join(aes_fast.stream(new_mode(iv).encrypt, chunks,
+		mode_name == 'CBC'))
+	assert(out == bytes(expected))
+	assert(new_mode(iv).decrypt(out) == data)
+	print('%s matches SlowAES' % mode_name)
+ecb = aes_fast.Cipher(key).ecb()
+assert(ecb.decrypt(ecb.encrypt(data[:768])) == data[:768])
+
+key = os.urandom(16)
+rk, _ = aes_fast.expand_key(key)
+block = os.urandom(16)
+n = 200
+start = time.perf_counter()
+for _ in range(n):
+	slow_encrypt(key, block)
+slow_time = (time.perf_counter() - start) / n
+n = 20000
+start = time.perf_counter()
+for _ in range(n):
+	aes_fast.encrypt_block(rk, block)
+fast_time = (time.perf_counter() - start) / n
+print('SlowAES: %.1f us/block, T-table: %.1f us/block (%.0fx)' % (
+	slow_time * 1e6, fast_time * 1e6, slow_time / fast_time))
+
+# CBC over a padded FGP payload
+payload = aes_fast.zero_pad(os.urandom(769))
+cipher = aes_fast.Cipher(key)
+n = 200
+start = time.perf_counter()
+for _ in range(n):
+	cipher.cbc(bytes(16)).encrypt(payload)
+print('CBC: %.2f ms per FGP payload' % ((time.perf_counter() - start) / n * 1e3))
+
+# batched numpy AES against the T-table engine
+batch = aes_np.BatchCipher(key)
+data = os.urandom(16 * 1000)
+iv = os.urandom(16)
+assert(batch.encrypt_ecb(data).tobytes() == cipher.ecb().encrypt(data))
+assert(batch.decrypt_cbc(cipher.cbc(iv).encrypt(data), iv).tobytes() == data)
+assert(batch.ctr_keystream(iv, 3).tobytes() == b''.join(cipher.encrypt_block(
+	((int.from_bytes(iv, 'big') + i) % (1 << 128)).to_bytes(16, 'big'))
+	for i in range(3)))
+n = 200000
+blocks = np.frombuffer(os.urandom(16 * n), dtype=np.uint8).reshape(-1, 16)
+start = time.perf_counter()
+batch.encrypt_ecb(blocks)
+print('batch ECB: %.2f us/block' % ((time.perf_counter() - start) / n * 1e6))
+
+# parallel CBC decryption against the batch engine
+import aes_parallel
+data = os.urandom(16 * (aes_parallel.MIN_PARALLEL_BLOCKS + 5))
+with aes_parallel.ParallelCipher(key, 2) as parallel:
+	start = time.perf_counter()
+	out = parallel.decrypt_cbc(data, iv)
+	elapsed = time.perf_counter() - start
+	assert(out == batch.decrypt_cbc(data, iv).tobytes())
+	# CTR with an int iv, across the chunk boundaries and the top of the
+	# 128-bit counter
+	int_iv = (1 << 128) - 3
+	out = parallel.ctr_xor(data[:-7], int_iv)
+	assert(out == batch.ctr_xor(data[:-7], int_iv).tobytes())
+	assert(out[:48] == cipher.ctr(int_iv.to_bytes(16, 'big')).encrypt(
+		data[:48]))
+start = time.perf_counter()
+batch.decrypt_cbc(data, iv)
+print('parallel CBC decrypt: %.1f MB/s with %d processes '
+	'(batch engine: %.1f MB/s, %d cores)' % (len(data) / elapsed / 1e6,
+	parallel.processes, len(data) / (time.perf_counter() - start) / 1e6,
+	os.cpu_count()))
+
+# CTR on FGP payloads: precomputed keystream against the scalar mode
+import fgp_ctr
+nonce = os.urandom(fgp_ctr.NONCE_LEN)
+payload = bytes([5]) + os.urandom(768)
+with fgp_ctr.FgpCtr(key, nonce) as ctr:
+	ctr.set_frame(0)
+	expected = payload[:1] + fgp_ctr.HEADER_STRUCT.pack(nonce, 0) + cipher.ctr(
+		fgp_ctr.counter_block(nonce, 0, 5)).encrypt(payload[1:])
+	assert(ctr.encrypt(0, payload) == expected)
+	while ctr.stats()['cached_frames'] == 0:
+		time.sleep(0.001)
+	n = 1000
+	start = time.perf_counter()
+	for _ in range(n):
+		ctr.encrypt(0, payload)
+	print('CTR: %.1f us per FGP payload with precomputed keystream' % (
+		(time.perf_counter() - start) / n * 1e6))
+
+# round trip through a receiver that only knows the key: the counter comes
+# from the received bytes, across lost packets, a skipped frame, a late
+# packet of an older frame, and a new sender nonce
+sent = []
+with fgp_ctr.FgpCtr(key) as tx:
+	for frame in (7, 8, 10):
+		tx.set_frame(frame)
+		for offset in range(0, fgp_ctr.FRAME_BLOCKS, 3):
+			payload = bytes([offset]) + os.urandom(768)
+			sent.append((payload, tx.encrypt(frame, payload)))
+	sent.insert(len(sent) - 2, sent[0])
+with fgp_ctr.FgpCtr(key) as tx:
+	payload = bytes([1]) + os.urandom(768)
+	sent.append((payload, tx.encrypt(0, payload)))
+with fgp_ctr.FgpCtr(key) as rx:
+	for payload, packet in sent:
+		assert(len(packet) == fgp_ctr.CTR_PAYLOAD_LEN == 781)
+		assert(packet[fgp_ctr.DATA_OFF:] != payload[1:])
+		assert(rx.decrypt(packet) == payload)
+
+# model of the FPGA's AES: table rounds against the transliterated verilog
+import aes_hdl
+import fgp_cbc
+import ffcp
+hdl_key = aes_hdl.fpga_key(0x5a)
+keyout = aes_hdl.keygen_ref(hdl_key)
+rk, dk = aes_hdl.key_schedule(hdl_key)
+for _ in range(100):
+	x = rand.getrandbits(128)
+	out = aes_hdl.encrypt_ref(keyout, x)
+	assert(aes_hdl.encrypt_int(rk, x) == out)
+	assert(aes_hdl.decrypt_ref(keyout, out) == x)
+	assert(aes_hdl.decrypt_int(dk, out) == x)
+same = aes_hdl.encrypt_int(rk, 0).to_bytes(16, 'little') == aes_fast.encrypt(
+	hdl_key.to_bytes(16, 'big'), bytes(16))
+print('FPGA AES %s FIPS-197' % ('matches' if same else 'differs from'))
+
+# the chain carries over between FGP payloads and restarts at a SYN
+payloads = [bytes([i]) + os.urandom(768) for i in range(3)]
+stream = [ffcp.gen_ffcp_payload(1 if i else 0, i, p)
+	for i, p in enumerate(payloads)] * 2
+encrypted = list(fgp_cbc.encrypt_ffcp(stream, 0x5a))
+assert(encrypted[:3] == encrypted[3:])
+assert(all(p[1] == q[0] for p, q in zip(encrypted, payloads)))
+assert(list(fgp_cbc.decrypt_ffcp(encrypted, 0x5a)) == stream)
+data = aes_hdl.Chain(hdl_key).encrypt(b''.join(p[1:] for p in payloads))
+assert(b''.join(p[2:] for p in encrypted[:3]) == data)
+unreset = list(fgp_cbc.encrypt_fgp(payloads * 2, 0x5a))
+assert(unreset[:3] == [p[1:] for p in encrypted[:3]])
+assert(unreset[3:] != unreset[:3])
+n = 100
+start = time.perf_counter()
+list(fgp_cbc.encrypt_fgp(payloads[:1] * n))
+print('FPGA CBC: %.2f ms per FGP payload' % (
+	(time.perf_counter() - start) / n * 1e3))
@@ -18,3 +18,38 @@ expected = 0x1cdf4421
 print('poly: %08x' % crc32.POLY)
 print('out: %08x' % crc)
 print('expected: %08x' % expected)
+
+# the table-driven implementations should agree with the bitwise reference
+for name, fn in [('table', crc32.crc_table), ('slice8', crc32.crc_slice8),
+	('fast', crc32.fast_crc)]:
+	print('%s: %08x' % (name, fn(sample_frame)))
+streaming = crc32.Crc32(sample_frame[:eth.HEADER_LEN])
+print('streaming: %08x' % streaming.update(sample_frame[eth.HEADER_LEN:]).digest())
+curr = crc32.update(crc32.INIT, sample_frame[:eth.HEADER_LEN])
+print('incremental: %08x' % crc32.finalize(crc32.update(curr,
+	sample_frame[eth.HEADER_LEN:])))
+# FrameTemplate fills the crc in place from the header's register
+template = eth.FrameTemplate(sample_frame[:eth.MAC_LEN],
+	sample_frame[eth.MAC_LEN:2*eth.MAC_LEN], eth.ETHERTYPE_IP,
+	len(sample_payload))
+template.payload[:] = sample_payload
+assert(bytes(template.finish()) == sample_frame)
+
+# batch FCS check: a good frame, one with a flipped bit, and runts (shorter
+# than an ethernet header) in the middle and at the end of the buffer
+import fcs_check
+frames = [sample_frame, bytearray(sample_frame), b'\x01\x02\x03', sample_frame,
+	b'\x04' * (eth.HEADER_LEN - 1)]
+frames[1][20] ^= 0x10
+batch = fcs_check.FrameBatch()
+for i, frame in enumerate(frames):
+	batch.append(frame, i)
+res = batch.check()
+print('batch good: %s' % res['good'].tolist())
+print('batch errors: %s' % res['errors'])
+print('batch ethertypes: %s' % res['ethertypes'].tolist())
+assert(res['good'].tolist() == [True, False, False, True, False])
+assert(res['errors'][1] == (20, 4))
+ip = int.from_bytes(eth.ETHERTYPE_IP, 'big')
+assert(res['ethertypes'].tolist() == [ip, ip, fcs_check.RUNT_ETHERTYPE, ip,
+	fcs_check.RUNT_ETHERTYPE])
@@ -0,0 +1,173 @@
+import sys
+import asyncio
+import socket
+import time
+sys.path.append('../lib/')
+import eth
+import ip
+import dhcp
+import arp
+import dhcp_client
+
+# runs the DHCP/ARP client against a stand-in DHCP server on the other end
+# of a socketpair, dropping the first DISCOVER to exercise retransmission
+# and using a short lease to exercise renewal; then runs it again with a
+# server that ignores renewals, so the lease expires and the client has to
+# start over with the same xid; and once more with a server that sends
+# truncated OFFERs and NAKs the first requests, so the client has to skip
+# the bad frames and back off before starting over
+SERVER_MAC = bytes.fromhex('020000000001')
+ROUTER_MAC = bytes.fromhex('020000000002')
+SERVER_IP = bytes([10, 0, 0, 1])
+ROUTER_IP = bytes([10, 0, 0, 254])
+CLIENT_IP = bytes([10, 0, 0, 42])
+LEASE_TIME = 4
+NAK_DELAY = 0.2
+
+def gen_dhcp_reply(xid, msg_type):
+	opts = [
+		(dhcp.OPT_TYPE_CODE, bytes([msg_type])),
+		(dhcp.OPT_DHCP_SERVER_IP, SERVER_IP),
+		(dhcp.OPT_ROUTER, ROUTER_IP),
+		(dhcp.OPT_MASK, bytes([255, 255, 255, 0])),
+		(dhcp.OPT_DNS, ROUTER_IP),
+		(dhcp.OPT_LEASE_TIME, LEASE_TIME.to_bytes(4, 'big'))
+	]
+	return ip.gen_ip_udp(SERVER_IP, ip.IPADDR_BROADCAST,
+		dhcp.PORT_SERVER, dhcp.PORT_CLIENT,
+		bytes([dhcp.OP_REPLY, dhcp.HTYPE_ETH, eth.MAC_LEN, 0]) +
+		xid.to_bytes(4, 'big') + bytes(4) +
+		ip.IPADDR_ZERO + CLIENT_IP + SERVER_IP + ip.IPADDR_ZERO +
+		eth.MAC_SEND + bytes(dhcp.CHADDR_LEN - eth.MAC_LEN) +
+		bytes(dhcp.SNAME_LEN + dhcp.FILE_LEN) + dhcp.MAGIC_COOKIE +
+		b''.join(bytes([code, len(val)]) + val for code, val in opts) +
+		bytes([dhcp.OPT_END]))
+
+def gen_arp_reply(target_addr):
+	return bytes([0, arp.HTYPE_ETH, arp.PTYPE_IPV4 >> 8,
+		arp.PTYPE_IPV4 & 0xff, eth.MAC_LEN, ip.IPADDR_LEN,
+		0, arp.OP_REPLY]) + ROUTER_MAC + ROUTER_IP + eth.MAC_SEND + target_addr
+
+# drop_request(now) decides whether a REQUEST goes unanswered, and the
+# first naks REQUESTs are NAKed
+# with truncate, every OFFER is preceded by copies cut short in the DHCP
+# header and in the options
+def server(sock, log, drop_request=None, naks=0, truncate=False):
+	discovers = 0
+	requests = 0
+	eth_view = eth.EthView(b'')
+	ip_view = ip.IPv4View(b'')
+	dhcp_view = dhcp.DHCPView(b'')
+	arp_view = arp.ARPView(b'')
+	def on_readable():
+		nonlocal discovers, requests
+		frame = sock.recv(4096)
+		eth_view.reset(frame)
+		if eth_view.ethertype == eth.ETHERTYPE_ARP:
+			arp_view.reset(eth_view.buf, eth_view.payload_off)
+			log.append((time.monotonic(), 'arp', None))
+			reply = eth.gen_eth(eth.MAC_SEND, ROUTER_MAC, eth.ETHERTYPE_ARP,
+				gen_arp_reply(bytes(arp_view.sender_addr)))
+		else:
+			ip_view.reset(eth_view.buf, eth_view.payload_off)
+			dhcp_view.reset(ip_view.buf,
+				ip_view.payload_off + ip.UDP_HEADER_LEN)
+			msg_type = dhcp_view.opts()[dhcp.OPT_TYPE_CODE][0]
+			log.append((time.monotonic(), msg_type, dhcp_view.xid))
+			if msg_type == dhcp.OPT_TYPE_DISCOVER:
+				discovers += 1
+				if discovers == 1:
+					return
+				reply_type = dhcp.OPT_TYPE_OFFER
+			elif drop_request is not None and drop_request(time.monotonic()):
+				return
+			else:
+				requests += 1
+				reply_type = (dhcp.OPT_TYPE_NAK if requests <= naks else
+					dhcp.OPT_TYPE_ACK)
+			reply = eth.gen_eth(eth.MAC_SEND, SERVER_MAC, eth.ETHERTYPE_IP,
+				gen_dhcp_reply(dhcp_view.xid, reply_type))
+			if truncate and reply_type == dhcp.OPT_TYPE_OFFER:
+				dhcp_off = (eth.HEADER_LEN + ip.IP_HEADER_LEN_DEFAULT * 4 +
+					ip.UDP_HEADER_LEN)
+				for cut in (dhcp_off + 6, dhcp_off + dhcp.HEADER_LEN_BASE + 4):
+					sock.send(reply[:cut])
+		sock.send(reply[:-eth.CRC_LEN])
+	return on_readable
+
+async def run(drop_request=None, naks=0, truncate=False, maintain=True):
+	client_sock, server_sock = socket.socketpair(socket.AF_UNIX,
+		socket.SOCK_SEQPACKET)
+	loop = asyncio.get_running_loop()
+	log = []
+	errors = []
+	loop.set_exception_handler(lambda loop, context: errors.append(context))
+	start = time.monotonic()
+	loop.add_reader(server_sock.fileno(),
+		server(server_sock, log, drop_request and
+			(lambda now: drop_request(now - start)), naks, truncate))
+	with dhcp_client.DhcpClient(client_sock,
+		retransmit_initial=0.2, nak_delay_initial=NAK_DELAY) as client:
+		try:
+			lease = await client.bring_up()
+		except ValueError as e:
+			print('bring up failed: %s' % e)
+			lease = None
+		if lease is not None:
+			print('bring up: %.3fs' % (time.monotonic() - start))
+			print('client ip: %s (expected %s)' % (lease.client_ip.hex(),
+				CLIENT_IP.hex()))
+			print('router mac: %s (expected %s)' % (
+				lease.upstream_mac.hex(), ROUTER_MAC.hex()))
+		if lease is not None and maintain:
+			try:
+				await asyncio.wait_for(client.maintain(), LEASE_TIME * 1.5)
+			except asyncio.TimeoutError:
+				pass
+		final_lease = client.lease
+	loop.remove_reader(server_sock.fileno())
+	loop.set_exception_handler(None)
+	client_sock.close()
+	server_sock.close()
+	for t, msg, xid in log:
+		print('%.3f: %s' % (t - start, msg))
+	# the callbacks raised nothing, truncated frames included
+	assert(not errors), errors
+	return log, client.xid, lease, final_lease
+
+async def main():
+	print('renewal:')
+	log, xid, lease, final_lease = await run()
+	assert(final_lease is not lease)
+	# renewals time out between T1 and expiry, so the lease runs out
+	print('expiry:')
+	log, xid, lease, final_lease = await run(
+		lambda t: LEASE_TIME * 0.4 < t < LEASE_TIME * 1.1)
+	discovers = [(t, msg_xid) for t, msg, msg_xid in log
+		if msg == dhcp.OPT_TYPE_DISCOVER]
+	assert(discovers[-1][0] - discovers[0][0] >= LEASE_TIME * 0.9)
+	assert(all(msg_xid == xid for _, msg_xid in discovers))
+	assert(final_lease is not lease and
+		final_lease.start - lease.start >= LEASE_TIME)
+	print('rebound after expiry with the same xid')
+	print('naks:')
+	log, xid, lease, final_lease = await run(naks=2, truncate=True,
+		maintain=False)
+	assert(lease is not None and lease.client_ip == CLIENT_IP)
+	# each NAK is followed by a wait before the next DISCOVER, doubling
+	times = [t for t, msg, _ in log if msg in (dhcp.OPT_TYPE_DISCOVER,
+		dhcp.OPT_TYPE_REQUEST)]
+	# DISCOVER (dropped), DISCOVER, REQUEST (NAK), DISCOVER, REQUEST (NAK),
+	# DISCOVER, REQUEST
+	assert(len(times) == 7)
+	assert(times[3] - times[2] >= NAK_DELAY * 0.75)
+	assert(times[5] - times[4] >= 2 * NAK_DELAY * 0.75)
+	print('backed off after NAKs, skipping truncated offers')
+	log, xid, lease, final_lease = await run(
+		naks=dhcp_client.MAX_NAKS, maintain=False)
+	assert(lease is None)
+	requests = [msg for _, msg, _ in log if msg == dhcp.OPT_TYPE_REQUEST]
+	assert(len(requests) == dhcp_client.MAX_NAKS)
+	print('gave up after %d NAKs' % dhcp_client.MAX_NAKS)
+
+asyncio.run(main())
@@ -0,0 +1,45 @@
+import sys
+import time
+sys.path.append('../lib/')
+import ffcp_sim
+
+# checks that skipping repeated periods of the FFCP simulation gives the
+# same results as running every event, and prints how many simulated
+# seconds per minute each setting runs at
+DURATION = 2.0
+LONG_DURATION = 1000.0
+
+SETTINGS = [
+	{},
+	{'window_len': 14},
+	{'offered_rate': 12 * 32},
+	{'offered_rate': 12000, 'respect_almost_full': True},
+	{'loss': 0.0001},
+	{'loss': 0.001, 'host_fixes': True},
+	{'reorder': 0.001},
+]
+
+def rate(duration, elapsed):
+	return duration / elapsed * 60
+
+for params in SETTINGS:
+	start = time.perf_counter()
+	full = ffcp_sim.simulate(DURATION, fast_forward=False, **params)
+	elapsed_full = time.perf_counter() - start
+	start = time.perf_counter()
+	fast = ffcp_sim.simulate(DURATION, **params)
+	elapsed_fast = time.perf_counter() - start
+	skipped = fast.pop('fast_forward_s')
+	full.pop('fast_forward_s')
+	assert(fast == full), params
+	print('%s: %.0f sim-s/min, %.0f with fast forward (%.0f%% skipped)' % (
+		params, rate(DURATION, elapsed_full), rate(DURATION, elapsed_fast),
+		skipped / DURATION * 100))
+
+# a saturated link, for long enough to be dominated by skipped periods
+start = time.perf_counter()
+res = ffcp_sim.simulate(LONG_DURATION)
+elapsed = time.perf_counter() - start
+assert(res['goodput_pps'] > 15000)
+print('saturated, %.0f s: %.0f sim-s/min' % (LONG_DURATION,
+	rate(LONG_DURATION, elapsed)))
@@ -0,0 +1,42 @@
+import sys
+import random
+sys.path.append('../lib/')
+import eth
+import ffcp
+
+# streams FGP payloads through the host FFCP sender and receiver over an
+# in-process lossy link and checks that they are committed in order
+NUM_PAYLOADS = 2000
+LOSS_RATE = 0.05
+
+random.seed(0)
+payloads = [bytes([i % 32]) + i.to_bytes(2, 'big') * (eth.FGP_DATA_LEN // 2)
+	for i in range(NUM_PAYLOADS)]
+committed = []
+
+tx_link, rx_link = ffcp.LoopbackLink.pair(
+	drop=lambda frame: random.random() < LOSS_RATE)
+sender = ffcp.FfcpSender(tx_link, resend_timeout=0.001)
+receiver = ffcp.FfcpReceiver(rx_link, committed.append)
+
+# deliver frames to the receiver as soon as they are sent
+class DeliveringLink:
+	def send(self, frame):
+		tx_link.send(frame)
+		while True:
+			frame = rx_link.recv()
+			if frame is None:
+				break
+			receiver.on_frame(frame)
+
+	def recv(self):
+		return tx_link.recv()
+
+sender.link = DeliveringLink()
+ffcp.send_all(sender, payloads, timeout=60)
+
+print('sender:', sender.stats())
+print('receiver:', receiver.stats())
+# without a resyn, every payload is committed exactly once, in order
+print('committed: %d of %d' % (len(committed), NUM_PAYLOADS))
+print('in order: %s' % (committed == payloads))
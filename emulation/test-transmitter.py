@@ -0,0 +1,48 @@
+import sys
+import socket
+sys.path.append('../lib/')
+import eth
+import rawsock
+
+# sends a batch of FGP frames through one end of a veth pair and counts
+# what arrives at the other end; create the pair with
+#   ip link add veth0 type veth peer name veth1
+#   ip link set veth0 up && ip link set veth1 up
+# and run as root
+ETH_P_ALL = 3
+TX_INTERFACE = sys.argv[1] if len(sys.argv) > 1 else 'veth0'
+RX_INTERFACE = sys.argv[2] if len(sys.argv) > 2 else 'veth1'
+NUM_FRAMES = 1024
+# every frame is sent before any is read, so the receive buffer has to hold
+# all of them; each takes about twice its length in kernel accounting
+RCVBUF = NUM_FRAMES * 4096
+SO_RCVBUFFORCE = getattr(socket, 'SO_RCVBUFFORCE', 33)
+
+rx = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+# SO_RCVBUF is capped by net.core.rmem_max; as root, force it past that
+try:
+	rx.setsockopt(socket.SOL_SOCKET, SO_RCVBUFFORCE, RCVBUF)
+except PermissionError:
+	rx.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF)
+rx.bind((RX_INTERFACE, ETH_P_ALL))
+rx.settimeout(0.5)
+
+frames = [eth.gen_eth_fgp((i % 32) * 512, [i % 4096] * 512)
+	for i in range(NUM_FRAMES)]
+
+for use_sendmmsg in [True, False]:
+	with rawsock.Transmitter(TX_INTERFACE, strip_len=eth.CRC_LEN,
+		use_sendmmsg=use_sendmmsg) as tx:
+		tx.send_batch(frames)
+		print('sendmmsg' if tx.use_sendmmsg else 'send loop', tx.stats())
+	received = 0
+	try:
+		while True:
+			frame = rx.recv(4096)
+			if eth.get_ethertype(frame) == eth.ETHERTYPE_FGP:
+				received += 1
+	except socket.timeout:
+		pass
+	print('received: %d' % received)
+	print('expected: %d' % NUM_FRAMES)
+	assert(received == NUM_FRAMES)
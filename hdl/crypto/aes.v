@@ -877,91 +877,580 @@ module mixcolumns(input [127:0] in,
                 input decrypt, // flag, when set to 1 work in decrypt mode
                 output [127:0] out);
 
-        wire [7:0] bytes [15:0];
-        wire [7:0] dbytes [15:0];       // doubled bytes
-        wire [7:0] ddbytes [15:0];       // bytes * 4
-        wire [7:0] dddbytes [15:0];       // bytse * 8
-        wire [7:0] mixed_bytes_e [15:0];
-        wire [7:0] mixed_bytes_d [15:0];
-
-
-        genvar i;
-        generate
-            for (i = 0; i < 16; i=i+1) begin : gen_bytes
-                assign bytes[i] = in[i*8+7:i*8];
-                assign dbytes[i] = {bytes[i][6 : 0], 1'b0} ^
-                    (8'h1b & {8{bytes[i][7]}});
-                assign ddbytes[i] = {dbytes[i][6 : 0], 1'b0} ^
-                    (8'h1b & {8{dbytes[i][7]}});
-                assign dddbytes[i] = {ddbytes[i][6 : 0], 1'b0} ^
-                    (8'h1b & {8{ddbytes[i][7]}});
-            end
-        endgenerate
-
-
-       /*
-       For encryption, we left multiply each column by
-
-       2 3 1 1
-       1 2 3 1
-       1 1 2 3
-       3 1 1 2
-
-       in order to generate a new matrix. This means we can go column by column,
-       taking every fourth byte.
-
-       multiplication by 2 is equivalent to a left shift of 1,
-       multiplication by 3 is a left shift of 1 xored with the initial value.
-       using this, we can implement this transformation with no multipliers.
-
-       The inverse matrix (for decryption) is
-
-       0E 0B 0D 09
-       09 0E 0B 0D
-       0D 09 0E 0B
-       0B 0D 09 0E
-       */
-
-
-        genvar j;
-        generate
-            for (j = 0; j < 4; j=j+1) begin : gen_column_mix
-                assign mixed_bytes_d[j] = dbytes[j]^ddbytes[j]^dddbytes[j]^
-                                            bytes[j+4]^dbytes[j+4]^dddbytes[j+4]^
-                                            bytes[j+8]^ddbytes[j+8]^dddbytes[j+8]^
-                                            bytes[j+12]^dddbytes[j+12];
-                assign mixed_bytes_d[j+4] = bytes[j]^dddbytes[j]^
-                                            dbytes[j+4]^ddbytes[j+4]^dddbytes[j+4]^
-                                            bytes[j+8]^dbytes[j+8]^dddbytes[j+8]^
-                                            bytes[j+12]^ddbytes[j+12]^dddbytes[j+12];
-                assign mixed_bytes_d[j+8] = bytes[j]^ddbytes[j]^dddbytes[j]^
-                                            bytes[j+4]^dddbytes[j+4]^
-                                            dbytes[j+8]^ddbytes[j+8]^dddbytes[j+8]^
-                                            bytes[j+12]^dbytes[j+12]^dddbytes[j+12];
-                assign mixed_bytes_d[j+12] = bytes[j]^dbytes[j]^dddbytes[j]^
-                                            bytes[j+4]^ddbytes[j+4]^dddbytes[j+4]^
-                                            bytes[j+8]^dddbytes[j+8]^
-                                            dbytes[j+12]^ddbytes[j+12]^dddbytes[j+12];
-
-                assign mixed_bytes_e[j] = dbytes[j]^dbytes[j+4]^bytes[j+4]^
-                            bytes[j+8]^bytes[j+12];
-                assign mixed_bytes_e[j+4] = bytes[j]^dbytes[j+4]^dbytes[j+8]^
-                            bytes[j+8]^bytes[j+12];
-                assign mixed_bytes_e[j+8] = bytes[j]^bytes[j+4]^dbytes[j+8]^
-                            dbytes[j+12]^bytes[j+12];
-                assign mixed_bytes_e[j+12] = dbytes[j]^bytes[j]^bytes[j+4]^
-                            bytes[j+8]^dbytes[j+12];
-            end
-        endgenerate
-
-        assign out = decrypt ?
-            {mixed_bytes_d[15], mixed_bytes_d[14], mixed_bytes_d[13], mixed_bytes_d[12],
-            mixed_bytes_d[11], mixed_bytes_d[10], mixed_bytes_d[9], mixed_bytes_d[8],
-            mixed_bytes_d[7], mixed_bytes_d[6], mixed_bytes_d[5], mixed_bytes_d[4],
-            mixed_bytes_d[3], mixed_bytes_d[2], mixed_bytes_d[1], mixed_bytes_d[0]}
-            :
-            {mixed_bytes_e[15], mixed_bytes_e[14], mixed_bytes_e[13], mixed_bytes_e[12],
-            mixed_bytes_e[11], mixed_bytes_e[10], mixed_bytes_e[9], mixed_bytes_e[8],
-            mixed_bytes_e[7], mixed_bytes_e[6], mixed_bytes_e[5], mixed_bytes_e[4],
-            mixed_bytes_e[3], mixed_bytes_e[2], mixed_bytes_e[1], mixed_bytes_e[0]};
+    // generated by emulation/mul_to_shift.py, do not edit
+    // columns are bytes j, j+4, j+8, j+12 (bytes[i] = in[i*8+7:i*8]),
+    // left multiplied by
+    //   2 3 1 1        0E 0B 0D 09
+    //   1 2 3 1        09 0E 0B 0D
+    //   1 1 2 3        0D 09 0E 0B
+    //   3 1 1 2        0B 0D 09 0E
+    // for encryption and decryption; every output bit is the xor of
+    // the input bits it depends on, at most 19 of them, so the
+    // longest path is 5 levels of 2-input xors
+
+    wire [127:0] out_e, out_d;
+
+    assign out_e[0] = ((in[7] ^ in[32]) ^ in[39]) ^ (in[64] ^ in[96]);
+    assign out_e[1] = ((in[0] ^ in[7]) ^ (in[32] ^ in[33])) ^ ((in[39] ^ in[65])
+        ^ in[97]);
+    assign out_e[2] = ((in[1] ^ in[33]) ^ in[34]) ^ (in[66] ^ in[98]);
+    assign out_e[3] = ((in[2] ^ in[7]) ^ (in[34] ^ in[35])) ^ ((in[39] ^ in[67])
+        ^ in[99]);
+    assign out_e[4] = ((in[3] ^ in[7]) ^ (in[35] ^ in[36])) ^ ((in[39] ^ in[68])
+        ^ in[100]);
+    assign out_e[5] = ((in[4] ^ in[36]) ^ in[37]) ^ (in[69] ^ in[101]);
+    assign out_e[6] = ((in[5] ^ in[37]) ^ in[38]) ^ (in[70] ^ in[102]);
+    assign out_e[7] = ((in[6] ^ in[38]) ^ in[39]) ^ (in[71] ^ in[103]);
+    assign out_e[8] = ((in[15] ^ in[40]) ^ in[47]) ^ (in[72] ^ in[104]);
+    assign out_e[9] = ((in[8] ^ in[15]) ^ (in[40] ^ in[41])) ^ ((in[47] ^
+        in[73]) ^ in[105]);
+    assign out_e[10] = ((in[9] ^ in[41]) ^ in[42]) ^ (in[74] ^ in[106]);
+    assign out_e[11] = ((in[10] ^ in[15]) ^ (in[42] ^ in[43])) ^ ((in[47] ^
+        in[75]) ^ in[107]);
+    assign out_e[12] = ((in[11] ^ in[15]) ^ (in[43] ^ in[44])) ^ ((in[47] ^
+        in[76]) ^ in[108]);
+    assign out_e[13] = ((in[12] ^ in[44]) ^ in[45]) ^ (in[77] ^ in[109]);
+    assign out_e[14] = ((in[13] ^ in[45]) ^ in[46]) ^ (in[78] ^ in[110]);
+    assign out_e[15] = ((in[14] ^ in[46]) ^ in[47]) ^ (in[79] ^ in[111]);
+    assign out_e[16] = ((in[23] ^ in[48]) ^ in[55]) ^ (in[80] ^ in[112]);
+    assign out_e[17] = ((in[16] ^ in[23]) ^ (in[48] ^ in[49])) ^ ((in[55] ^
+        in[81]) ^ in[113]);
+    assign out_e[18] = ((in[17] ^ in[49]) ^ in[50]) ^ (in[82] ^ in[114]);
+    assign out_e[19] = ((in[18] ^ in[23]) ^ (in[50] ^ in[51])) ^ ((in[55] ^
+        in[83]) ^ in[115]);
+    assign out_e[20] = ((in[19] ^ in[23]) ^ (in[51] ^ in[52])) ^ ((in[55] ^
+        in[84]) ^ in[116]);
+    assign out_e[21] = ((in[20] ^ in[52]) ^ in[53]) ^ (in[85] ^ in[117]);
+    assign out_e[22] = ((in[21] ^ in[53]) ^ in[54]) ^ (in[86] ^ in[118]);
+    assign out_e[23] = ((in[22] ^ in[54]) ^ in[55]) ^ (in[87] ^ in[119]);
+    assign out_e[24] = ((in[31] ^ in[56]) ^ in[63]) ^ (in[88] ^ in[120]);
+    assign out_e[25] = ((in[24] ^ in[31]) ^ (in[56] ^ in[57])) ^ ((in[63] ^
+        in[89]) ^ in[121]);
+    assign out_e[26] = ((in[25] ^ in[57]) ^ in[58]) ^ (in[90] ^ in[122]);
+    assign out_e[27] = ((in[26] ^ in[31]) ^ (in[58] ^ in[59])) ^ ((in[63] ^
+        in[91]) ^ in[123]);
+    assign out_e[28] = ((in[27] ^ in[31]) ^ (in[59] ^ in[60])) ^ ((in[63] ^
+        in[92]) ^ in[124]);
+    assign out_e[29] = ((in[28] ^ in[60]) ^ in[61]) ^ (in[93] ^ in[125]);
+    assign out_e[30] = ((in[29] ^ in[61]) ^ in[62]) ^ (in[94] ^ in[126]);
+    assign out_e[31] = ((in[30] ^ in[62]) ^ in[63]) ^ (in[95] ^ in[127]);
+    assign out_e[32] = ((in[0] ^ in[39]) ^ in[64]) ^ (in[71] ^ in[96]);
+    assign out_e[33] = ((in[1] ^ in[32]) ^ (in[39] ^ in[64])) ^ ((in[65] ^
+        in[71]) ^ in[97]);
+    assign out_e[34] = ((in[2] ^ in[33]) ^ in[65]) ^ (in[66] ^ in[98]);
+    assign out_e[35] = ((in[3] ^ in[34]) ^ (in[39] ^ in[66])) ^ ((in[67] ^
+        in[71]) ^ in[99]);
+    assign out_e[36] = ((in[4] ^ in[35]) ^ (in[39] ^ in[67])) ^ ((in[68] ^
+        in[71]) ^ in[100]);
+    assign out_e[37] = ((in[5] ^ in[36]) ^ in[68]) ^ (in[69] ^ in[101]);
+    assign out_e[38] = ((in[6] ^ in[37]) ^ in[69]) ^ (in[70] ^ in[102]);
+    assign out_e[39] = ((in[7] ^ in[38]) ^ in[70]) ^ (in[71] ^ in[103]);
+    assign out_e[40] = ((in[8] ^ in[47]) ^ in[72]) ^ (in[79] ^ in[104]);
+    assign out_e[41] = ((in[9] ^ in[40]) ^ (in[47] ^ in[72])) ^ ((in[73] ^
+        in[79]) ^ in[105]);
+    assign out_e[42] = ((in[10] ^ in[41]) ^ in[73]) ^ (in[74] ^ in[106]);
+    assign out_e[43] = ((in[11] ^ in[42]) ^ (in[47] ^ in[74])) ^ ((in[75] ^
+        in[79]) ^ in[107]);
+    assign out_e[44] = ((in[12] ^ in[43]) ^ (in[47] ^ in[75])) ^ ((in[76] ^
+        in[79]) ^ in[108]);
+    assign out_e[45] = ((in[13] ^ in[44]) ^ in[76]) ^ (in[77] ^ in[109]);
+    assign out_e[46] = ((in[14] ^ in[45]) ^ in[77]) ^ (in[78] ^ in[110]);
+    assign out_e[47] = ((in[15] ^ in[46]) ^ in[78]) ^ (in[79] ^ in[111]);
+    assign out_e[48] = ((in[16] ^ in[55]) ^ in[80]) ^ (in[87] ^ in[112]);
+    assign out_e[49] = ((in[17] ^ in[48]) ^ (in[55] ^ in[80])) ^ ((in[81] ^
+        in[87]) ^ in[113]);
+    assign out_e[50] = ((in[18] ^ in[49]) ^ in[81]) ^ (in[82] ^ in[114]);
+    assign out_e[51] = ((in[19] ^ in[50]) ^ (in[55] ^ in[82])) ^ ((in[83] ^
+        in[87]) ^ in[115]);
+    assign out_e[52] = ((in[20] ^ in[51]) ^ (in[55] ^ in[83])) ^ ((in[84] ^
+        in[87]) ^ in[116]);
+    assign out_e[53] = ((in[21] ^ in[52]) ^ in[84]) ^ (in[85] ^ in[117]);
+    assign out_e[54] = ((in[22] ^ in[53]) ^ in[85]) ^ (in[86] ^ in[118]);
+    assign out_e[55] = ((in[23] ^ in[54]) ^ in[86]) ^ (in[87] ^ in[119]);
+    assign out_e[56] = ((in[24] ^ in[63]) ^ in[88]) ^ (in[95] ^ in[120]);
+    assign out_e[57] = ((in[25] ^ in[56]) ^ (in[63] ^ in[88])) ^ ((in[89] ^
+        in[95]) ^ in[121]);
+    assign out_e[58] = ((in[26] ^ in[57]) ^ in[89]) ^ (in[90] ^ in[122]);
+    assign out_e[59] = ((in[27] ^ in[58]) ^ (in[63] ^ in[90])) ^ ((in[91] ^
+        in[95]) ^ in[123]);
+    assign out_e[60] = ((in[28] ^ in[59]) ^ (in[63] ^ in[91])) ^ ((in[92] ^
+        in[95]) ^ in[124]);
+    assign out_e[61] = ((in[29] ^ in[60]) ^ in[92]) ^ (in[93] ^ in[125]);
+    assign out_e[62] = ((in[30] ^ in[61]) ^ in[93]) ^ (in[94] ^ in[126]);
+    assign out_e[63] = ((in[31] ^ in[62]) ^ in[94]) ^ (in[95] ^ in[127]);
+    assign out_e[64] = ((in[0] ^ in[32]) ^ in[71]) ^ (in[96] ^ in[103]);
+    assign out_e[65] = ((in[1] ^ in[33]) ^ (in[64] ^ in[71])) ^ ((in[96] ^
+        in[97]) ^ in[103]);
+    assign out_e[66] = ((in[2] ^ in[34]) ^ in[65]) ^ (in[97] ^ in[98]);
+    assign out_e[67] = ((in[3] ^ in[35]) ^ (in[66] ^ in[71])) ^ ((in[98] ^
+        in[99]) ^ in[103]);
+    assign out_e[68] = ((in[4] ^ in[36]) ^ (in[67] ^ in[71])) ^ ((in[99] ^
+        in[100]) ^ in[103]);
+    assign out_e[69] = ((in[5] ^ in[37]) ^ in[68]) ^ (in[100] ^ in[101]);
+    assign out_e[70] = ((in[6] ^ in[38]) ^ in[69]) ^ (in[101] ^ in[102]);
+    assign out_e[71] = ((in[7] ^ in[39]) ^ in[70]) ^ (in[102] ^ in[103]);
+    assign out_e[72] = ((in[8] ^ in[40]) ^ in[79]) ^ (in[104] ^ in[111]);
+    assign out_e[73] = ((in[9] ^ in[41]) ^ (in[72] ^ in[79])) ^ ((in[104] ^
+        in[105]) ^ in[111]);
+    assign out_e[74] = ((in[10] ^ in[42]) ^ in[73]) ^ (in[105] ^ in[106]);
+    assign out_e[75] = ((in[11] ^ in[43]) ^ (in[74] ^ in[79])) ^ ((in[106] ^
+        in[107]) ^ in[111]);
+    assign out_e[76] = ((in[12] ^ in[44]) ^ (in[75] ^ in[79])) ^ ((in[107] ^
+        in[108]) ^ in[111]);
+    assign out_e[77] = ((in[13] ^ in[45]) ^ in[76]) ^ (in[108] ^ in[109]);
+    assign out_e[78] = ((in[14] ^ in[46]) ^ in[77]) ^ (in[109] ^ in[110]);
+    assign out_e[79] = ((in[15] ^ in[47]) ^ in[78]) ^ (in[110] ^ in[111]);
+    assign out_e[80] = ((in[16] ^ in[48]) ^ in[87]) ^ (in[112] ^ in[119]);
+    assign out_e[81] = ((in[17] ^ in[49]) ^ (in[80] ^ in[87])) ^ ((in[112] ^
+        in[113]) ^ in[119]);
+    assign out_e[82] = ((in[18] ^ in[50]) ^ in[81]) ^ (in[113] ^ in[114]);
+    assign out_e[83] = ((in[19] ^ in[51]) ^ (in[82] ^ in[87])) ^ ((in[114] ^
+        in[115]) ^ in[119]);
+    assign out_e[84] = ((in[20] ^ in[52]) ^ (in[83] ^ in[87])) ^ ((in[115] ^
+        in[116]) ^ in[119]);
+    assign out_e[85] = ((in[21] ^ in[53]) ^ in[84]) ^ (in[116] ^ in[117]);
+    assign out_e[86] = ((in[22] ^ in[54]) ^ in[85]) ^ (in[117] ^ in[118]);
+    assign out_e[87] = ((in[23] ^ in[55]) ^ in[86]) ^ (in[118] ^ in[119]);
+    assign out_e[88] = ((in[24] ^ in[56]) ^ in[95]) ^ (in[120] ^ in[127]);
+    assign out_e[89] = ((in[25] ^ in[57]) ^ (in[88] ^ in[95])) ^ ((in[120] ^
+        in[121]) ^ in[127]);
+    assign out_e[90] = ((in[26] ^ in[58]) ^ in[89]) ^ (in[121] ^ in[122]);
+    assign out_e[91] = ((in[27] ^ in[59]) ^ (in[90] ^ in[95])) ^ ((in[122] ^
+        in[123]) ^ in[127]);
+    assign out_e[92] = ((in[28] ^ in[60]) ^ (in[91] ^ in[95])) ^ ((in[123] ^
+        in[124]) ^ in[127]);
+    assign out_e[93] = ((in[29] ^ in[61]) ^ in[92]) ^ (in[124] ^ in[125]);
+    assign out_e[94] = ((in[30] ^ in[62]) ^ in[93]) ^ (in[125] ^ in[126]);
+    assign out_e[95] = ((in[31] ^ in[63]) ^ in[94]) ^ (in[126] ^ in[127]);
+    assign out_e[96] = ((in[0] ^ in[7]) ^ in[32]) ^ (in[64] ^ in[103]);
+    assign out_e[97] = ((in[0] ^ in[1]) ^ (in[7] ^ in[33])) ^ ((in[65] ^ in[96])
+        ^ in[103]);
+    assign out_e[98] = ((in[1] ^ in[2]) ^ in[34]) ^ (in[66] ^ in[97]);
+    assign out_e[99] = ((in[2] ^ in[3]) ^ (in[7] ^ in[35])) ^ ((in[67] ^ in[98])
+        ^ in[103]);
+    assign out_e[100] = ((in[3] ^ in[4]) ^ (in[7] ^ in[36])) ^ ((in[68] ^
+        in[99]) ^ in[103]);
+    assign out_e[101] = ((in[4] ^ in[5]) ^ in[37]) ^ (in[69] ^ in[100]);
+    assign out_e[102] = ((in[5] ^ in[6]) ^ in[38]) ^ (in[70] ^ in[101]);
+    assign out_e[103] = ((in[6] ^ in[7]) ^ in[39]) ^ (in[71] ^ in[102]);
+    assign out_e[104] = ((in[8] ^ in[15]) ^ in[40]) ^ (in[72] ^ in[111]);
+    assign out_e[105] = ((in[8] ^ in[9]) ^ (in[15] ^ in[41])) ^ ((in[73] ^
+        in[104]) ^ in[111]);
+    assign out_e[106] = ((in[9] ^ in[10]) ^ in[42]) ^ (in[74] ^ in[105]);
+    assign out_e[107] = ((in[10] ^ in[11]) ^ (in[15] ^ in[43])) ^ ((in[75] ^
+        in[106]) ^ in[111]);
+    assign out_e[108] = ((in[11] ^ in[12]) ^ (in[15] ^ in[44])) ^ ((in[76] ^
+        in[107]) ^ in[111]);
+    assign out_e[109] = ((in[12] ^ in[13]) ^ in[45]) ^ (in[77] ^ in[108]);
+    assign out_e[110] = ((in[13] ^ in[14]) ^ in[46]) ^ (in[78] ^ in[109]);
+    assign out_e[111] = ((in[14] ^ in[15]) ^ in[47]) ^ (in[79] ^ in[110]);
+    assign out_e[112] = ((in[16] ^ in[23]) ^ in[48]) ^ (in[80] ^ in[119]);
+    assign out_e[113] = ((in[16] ^ in[17]) ^ (in[23] ^ in[49])) ^ ((in[81] ^
+        in[112]) ^ in[119]);
+    assign out_e[114] = ((in[17] ^ in[18]) ^ in[50]) ^ (in[82] ^ in[113]);
+    assign out_e[115] = ((in[18] ^ in[19]) ^ (in[23] ^ in[51])) ^ ((in[83] ^
+        in[114]) ^ in[119]);
+    assign out_e[116] = ((in[19] ^ in[20]) ^ (in[23] ^ in[52])) ^ ((in[84] ^
+        in[115]) ^ in[119]);
+    assign out_e[117] = ((in[20] ^ in[21]) ^ in[53]) ^ (in[85] ^ in[116]);
+    assign out_e[118] = ((in[21] ^ in[22]) ^ in[54]) ^ (in[86] ^ in[117]);
+    assign out_e[119] = ((in[22] ^ in[23]) ^ in[55]) ^ (in[87] ^ in[118]);
+    assign out_e[120] = ((in[24] ^ in[31]) ^ in[56]) ^ (in[88] ^ in[127]);
+    assign out_e[121] = ((in[24] ^ in[25]) ^ (in[31] ^ in[57])) ^ ((in[89] ^
+        in[120]) ^ in[127]);
+    assign out_e[122] = ((in[25] ^ in[26]) ^ in[58]) ^ (in[90] ^ in[121]);
+    assign out_e[123] = ((in[26] ^ in[27]) ^ (in[31] ^ in[59])) ^ ((in[91] ^
+        in[122]) ^ in[127]);
+    assign out_e[124] = ((in[27] ^ in[28]) ^ (in[31] ^ in[60])) ^ ((in[92] ^
+        in[123]) ^ in[127]);
+    assign out_e[125] = ((in[28] ^ in[29]) ^ in[61]) ^ (in[93] ^ in[124]);
+    assign out_e[126] = ((in[29] ^ in[30]) ^ in[62]) ^ (in[94] ^ in[125]);
+    assign out_e[127] = ((in[30] ^ in[31]) ^ in[63]) ^ (in[95] ^ in[126]);
+
+    assign out_d[0] = (((in[5] ^ in[6]) ^ in[7]) ^ ((in[32] ^ in[37]) ^ in[39]))
+        ^ (((in[64] ^ in[69]) ^ in[70]) ^ (in[96] ^ in[101]));
+    assign out_d[1] = (((in[0] ^ in[5]) ^ (in[32] ^ in[33])) ^ ((in[37] ^
+        in[38]) ^ in[39])) ^ (((in[65] ^ in[69]) ^ in[71]) ^ ((in[97] ^ in[101])
+        ^ in[102]));
+    assign out_d[2] = (((in[0] ^ in[1]) ^ (in[6] ^ in[33])) ^ ((in[34] ^ in[38])
+        ^ in[39])) ^ (((in[64] ^ in[66]) ^ in[70]) ^ ((in[98] ^ in[102]) ^
+        in[103]));
+    assign out_d[3] = ((((in[0] ^ in[1]) ^ in[2]) ^ (in[5] ^ in[6])) ^ (((in[32]
+        ^ in[34]) ^ in[35]) ^ (in[37] ^ in[64]))) ^ ((((in[65] ^ in[67]) ^
+        in[69]) ^ (in[70] ^ in[71])) ^ ((in[96] ^ in[99]) ^ (in[101] ^
+        in[103])));
+    assign out_d[4] = ((((in[1] ^ in[2]) ^ in[3]) ^ (in[5] ^ in[33])) ^
+        (((in[35] ^ in[36]) ^ in[37]) ^ (in[38] ^ in[39]))) ^ ((((in[65] ^
+        in[66]) ^ in[68]) ^ (in[69] ^ in[71])) ^ ((in[97] ^ in[100]) ^ (in[101]
+        ^ in[102])));
+    assign out_d[5] = ((((in[2] ^ in[3]) ^ in[4]) ^ (in[6] ^ in[34])) ^ ((in[36]
+        ^ in[37]) ^ (in[38] ^ in[39]))) ^ (((in[66] ^ in[67]) ^ (in[69] ^
+        in[70])) ^ ((in[98] ^ in[101]) ^ (in[102] ^ in[103])));
+    assign out_d[6] = (((in[3] ^ in[4]) ^ (in[5] ^ in[7])) ^ ((in[35] ^ in[37])
+        ^ (in[38] ^ in[39]))) ^ (((in[67] ^ in[68]) ^ (in[70] ^ in[71])) ^
+        ((in[99] ^ in[102]) ^ in[103]));
+    assign out_d[7] = (((in[4] ^ in[5]) ^ in[6]) ^ ((in[36] ^ in[38]) ^ in[39]))
+        ^ (((in[68] ^ in[69]) ^ in[71]) ^ (in[100] ^ in[103]));
+    assign out_d[8] = (((in[13] ^ in[14]) ^ in[15]) ^ ((in[40] ^ in[45]) ^
+        in[47])) ^ (((in[72] ^ in[77]) ^ in[78]) ^ (in[104] ^ in[109]));
+    assign out_d[9] = (((in[8] ^ in[13]) ^ (in[40] ^ in[41])) ^ ((in[45] ^
+        in[46]) ^ in[47])) ^ (((in[73] ^ in[77]) ^ in[79]) ^ ((in[105] ^
+        in[109]) ^ in[110]));
+    assign out_d[10] = (((in[8] ^ in[9]) ^ (in[14] ^ in[41])) ^ ((in[42] ^
+        in[46]) ^ in[47])) ^ (((in[72] ^ in[74]) ^ in[78]) ^ ((in[106] ^
+        in[110]) ^ in[111]));
+    assign out_d[11] = ((((in[8] ^ in[9]) ^ in[10]) ^ (in[13] ^ in[14])) ^
+        (((in[40] ^ in[42]) ^ in[43]) ^ (in[45] ^ in[72]))) ^ ((((in[73] ^
+        in[75]) ^ in[77]) ^ (in[78] ^ in[79])) ^ ((in[104] ^ in[107]) ^ (in[109]
+        ^ in[111])));
+    assign out_d[12] = ((((in[9] ^ in[10]) ^ in[11]) ^ (in[13] ^ in[41])) ^
+        (((in[43] ^ in[44]) ^ in[45]) ^ (in[46] ^ in[47]))) ^ ((((in[73] ^
+        in[74]) ^ in[76]) ^ (in[77] ^ in[79])) ^ ((in[105] ^ in[108]) ^ (in[109]
+        ^ in[110])));
+    assign out_d[13] = ((((in[10] ^ in[11]) ^ in[12]) ^ (in[14] ^ in[42])) ^
+        ((in[44] ^ in[45]) ^ (in[46] ^ in[47]))) ^ (((in[74] ^ in[75]) ^ (in[77]
+        ^ in[78])) ^ ((in[106] ^ in[109]) ^ (in[110] ^ in[111])));
+    assign out_d[14] = (((in[11] ^ in[12]) ^ (in[13] ^ in[15])) ^ ((in[43] ^
+        in[45]) ^ (in[46] ^ in[47]))) ^ (((in[75] ^ in[76]) ^ (in[78] ^ in[79]))
+        ^ ((in[107] ^ in[110]) ^ in[111]));
+    assign out_d[15] = (((in[12] ^ in[13]) ^ in[14]) ^ ((in[44] ^ in[46]) ^
+        in[47])) ^ (((in[76] ^ in[77]) ^ in[79]) ^ (in[108] ^ in[111]));
+    assign out_d[16] = (((in[21] ^ in[22]) ^ in[23]) ^ ((in[48] ^ in[53]) ^
+        in[55])) ^ (((in[80] ^ in[85]) ^ in[86]) ^ (in[112] ^ in[117]));
+    assign out_d[17] = (((in[16] ^ in[21]) ^ (in[48] ^ in[49])) ^ ((in[53] ^
+        in[54]) ^ in[55])) ^ (((in[81] ^ in[85]) ^ in[87]) ^ ((in[113] ^
+        in[117]) ^ in[118]));
+    assign out_d[18] = (((in[16] ^ in[17]) ^ (in[22] ^ in[49])) ^ ((in[50] ^
+        in[54]) ^ in[55])) ^ (((in[80] ^ in[82]) ^ in[86]) ^ ((in[114] ^
+        in[118]) ^ in[119]));
+    assign out_d[19] = ((((in[16] ^ in[17]) ^ in[18]) ^ (in[21] ^ in[22])) ^
+        (((in[48] ^ in[50]) ^ in[51]) ^ (in[53] ^ in[80]))) ^ ((((in[81] ^
+        in[83]) ^ in[85]) ^ (in[86] ^ in[87])) ^ ((in[112] ^ in[115]) ^ (in[117]
+        ^ in[119])));
+    assign out_d[20] = ((((in[17] ^ in[18]) ^ in[19]) ^ (in[21] ^ in[49])) ^
+        (((in[51] ^ in[52]) ^ in[53]) ^ (in[54] ^ in[55]))) ^ ((((in[81] ^
+        in[82]) ^ in[84]) ^ (in[85] ^ in[87])) ^ ((in[113] ^ in[116]) ^ (in[117]
+        ^ in[118])));
+    assign out_d[21] = ((((in[18] ^ in[19]) ^ in[20]) ^ (in[22] ^ in[50])) ^
+        ((in[52] ^ in[53]) ^ (in[54] ^ in[55]))) ^ (((in[82] ^ in[83]) ^ (in[85]
+        ^ in[86])) ^ ((in[114] ^ in[117]) ^ (in[118] ^ in[119])));
+    assign out_d[22] = (((in[19] ^ in[20]) ^ (in[21] ^ in[23])) ^ ((in[51] ^
+        in[53]) ^ (in[54] ^ in[55]))) ^ (((in[83] ^ in[84]) ^ (in[86] ^ in[87]))
+        ^ ((in[115] ^ in[118]) ^ in[119]));
+    assign out_d[23] = (((in[20] ^ in[21]) ^ in[22]) ^ ((in[52] ^ in[54]) ^
+        in[55])) ^ (((in[84] ^ in[85]) ^ in[87]) ^ (in[116] ^ in[119]));
+    assign out_d[24] = (((in[29] ^ in[30]) ^ in[31]) ^ ((in[56] ^ in[61]) ^
+        in[63])) ^ (((in[88] ^ in[93]) ^ in[94]) ^ (in[120] ^ in[125]));
+    assign out_d[25] = (((in[24] ^ in[29]) ^ (in[56] ^ in[57])) ^ ((in[61] ^
+        in[62]) ^ in[63])) ^ (((in[89] ^ in[93]) ^ in[95]) ^ ((in[121] ^
+        in[125]) ^ in[126]));
+    assign out_d[26] = (((in[24] ^ in[25]) ^ (in[30] ^ in[57])) ^ ((in[58] ^
+        in[62]) ^ in[63])) ^ (((in[88] ^ in[90]) ^ in[94]) ^ ((in[122] ^
+        in[126]) ^ in[127]));
+    assign out_d[27] = ((((in[24] ^ in[25]) ^ in[26]) ^ (in[29] ^ in[30])) ^
+        (((in[56] ^ in[58]) ^ in[59]) ^ (in[61] ^ in[88]))) ^ ((((in[89] ^
+        in[91]) ^ in[93]) ^ (in[94] ^ in[95])) ^ ((in[120] ^ in[123]) ^ (in[125]
+        ^ in[127])));
+    assign out_d[28] = ((((in[25] ^ in[26]) ^ in[27]) ^ (in[29] ^ in[57])) ^
+        (((in[59] ^ in[60]) ^ in[61]) ^ (in[62] ^ in[63]))) ^ ((((in[89] ^
+        in[90]) ^ in[92]) ^ (in[93] ^ in[95])) ^ ((in[121] ^ in[124]) ^ (in[125]
+        ^ in[126])));
+    assign out_d[29] = ((((in[26] ^ in[27]) ^ in[28]) ^ (in[30] ^ in[58])) ^
+        ((in[60] ^ in[61]) ^ (in[62] ^ in[63]))) ^ (((in[90] ^ in[91]) ^ (in[93]
+        ^ in[94])) ^ ((in[122] ^ in[125]) ^ (in[126] ^ in[127])));
+    assign out_d[30] = (((in[27] ^ in[28]) ^ (in[29] ^ in[31])) ^ ((in[59] ^
+        in[61]) ^ (in[62] ^ in[63]))) ^ (((in[91] ^ in[92]) ^ (in[94] ^ in[95]))
+        ^ ((in[123] ^ in[126]) ^ in[127]));
+    assign out_d[31] = (((in[28] ^ in[29]) ^ in[30]) ^ ((in[60] ^ in[62]) ^
+        in[63])) ^ (((in[92] ^ in[93]) ^ in[95]) ^ (in[124] ^ in[127]));
+    assign out_d[32] = (((in[0] ^ in[5]) ^ in[37]) ^ ((in[38] ^ in[39]) ^
+        in[64])) ^ (((in[69] ^ in[71]) ^ in[96]) ^ (in[101] ^ in[102]));
+    assign out_d[33] = (((in[1] ^ in[5]) ^ (in[6] ^ in[32])) ^ ((in[37] ^
+        in[64]) ^ in[65])) ^ (((in[69] ^ in[70]) ^ in[71]) ^ ((in[97] ^ in[101])
+        ^ in[103]));
+    assign out_d[34] = (((in[2] ^ in[6]) ^ (in[7] ^ in[32])) ^ ((in[33] ^
+        in[38]) ^ in[65])) ^ (((in[66] ^ in[70]) ^ in[71]) ^ ((in[96] ^ in[98])
+        ^ in[102]));
+    assign out_d[35] = ((((in[0] ^ in[3]) ^ in[5]) ^ (in[7] ^ in[32])) ^
+        (((in[33] ^ in[34]) ^ in[37]) ^ (in[38] ^ in[64]))) ^ ((((in[66] ^
+        in[67]) ^ in[69]) ^ (in[96] ^ in[97])) ^ ((in[99] ^ in[101]) ^ (in[102]
+        ^ in[103])));
+    assign out_d[36] = ((((in[1] ^ in[4]) ^ in[5]) ^ (in[6] ^ in[33])) ^
+        (((in[34] ^ in[35]) ^ in[37]) ^ (in[65] ^ in[67]))) ^ ((((in[68] ^
+        in[69]) ^ in[70]) ^ (in[71] ^ in[97])) ^ ((in[98] ^ in[100]) ^ (in[101]
+        ^ in[103])));
+    assign out_d[37] = ((((in[2] ^ in[5]) ^ in[6]) ^ (in[7] ^ in[34])) ^
+        ((in[35] ^ in[36]) ^ (in[38] ^ in[66]))) ^ (((in[68] ^ in[69]) ^ (in[70]
+        ^ in[71])) ^ ((in[98] ^ in[99]) ^ (in[101] ^ in[102])));
+    assign out_d[38] = (((in[3] ^ in[6]) ^ (in[7] ^ in[35])) ^ ((in[36] ^
+        in[37]) ^ (in[39] ^ in[67]))) ^ (((in[69] ^ in[70]) ^ (in[71] ^ in[99]))
+        ^ ((in[100] ^ in[102]) ^ in[103]));
+    assign out_d[39] = (((in[4] ^ in[7]) ^ in[36]) ^ ((in[37] ^ in[38]) ^
+        in[68])) ^ (((in[70] ^ in[71]) ^ in[100]) ^ (in[101] ^ in[103]));
+    assign out_d[40] = (((in[8] ^ in[13]) ^ in[45]) ^ ((in[46] ^ in[47]) ^
+        in[72])) ^ (((in[77] ^ in[79]) ^ in[104]) ^ (in[109] ^ in[110]));
+    assign out_d[41] = (((in[9] ^ in[13]) ^ (in[14] ^ in[40])) ^ ((in[45] ^
+        in[72]) ^ in[73])) ^ (((in[77] ^ in[78]) ^ in[79]) ^ ((in[105] ^
+        in[109]) ^ in[111]));
+    assign out_d[42] = (((in[10] ^ in[14]) ^ (in[15] ^ in[40])) ^ ((in[41] ^
+        in[46]) ^ in[73])) ^ (((in[74] ^ in[78]) ^ in[79]) ^ ((in[104] ^
+        in[106]) ^ in[110]));
+    assign out_d[43] = ((((in[8] ^ in[11]) ^ in[13]) ^ (in[15] ^ in[40])) ^
+        (((in[41] ^ in[42]) ^ in[45]) ^ (in[46] ^ in[72]))) ^ ((((in[74] ^
+        in[75]) ^ in[77]) ^ (in[104] ^ in[105])) ^ ((in[107] ^ in[109]) ^
+        (in[110] ^ in[111])));
+    assign out_d[44] = ((((in[9] ^ in[12]) ^ in[13]) ^ (in[14] ^ in[41])) ^
+        (((in[42] ^ in[43]) ^ in[45]) ^ (in[73] ^ in[75]))) ^ ((((in[76] ^
+        in[77]) ^ in[78]) ^ (in[79] ^ in[105])) ^ ((in[106] ^ in[108]) ^
+        (in[109] ^ in[111])));
+    assign out_d[45] = ((((in[10] ^ in[13]) ^ in[14]) ^ (in[15] ^ in[42])) ^
+        ((in[43] ^ in[44]) ^ (in[46] ^ in[74]))) ^ (((in[76] ^ in[77]) ^ (in[78]
+        ^ in[79])) ^ ((in[106] ^ in[107]) ^ (in[109] ^ in[110])));
+    assign out_d[46] = (((in[11] ^ in[14]) ^ (in[15] ^ in[43])) ^ ((in[44] ^
+        in[45]) ^ (in[47] ^ in[75]))) ^ (((in[77] ^ in[78]) ^ (in[79] ^
+        in[107])) ^ ((in[108] ^ in[110]) ^ in[111]));
+    assign out_d[47] = (((in[12] ^ in[15]) ^ in[44]) ^ ((in[45] ^ in[46]) ^
+        in[76])) ^ (((in[78] ^ in[79]) ^ in[108]) ^ (in[109] ^ in[111]));
+    assign out_d[48] = (((in[16] ^ in[21]) ^ in[53]) ^ ((in[54] ^ in[55]) ^
+        in[80])) ^ (((in[85] ^ in[87]) ^ in[112]) ^ (in[117] ^ in[118]));
+    assign out_d[49] = (((in[17] ^ in[21]) ^ (in[22] ^ in[48])) ^ ((in[53] ^
+        in[80]) ^ in[81])) ^ (((in[85] ^ in[86]) ^ in[87]) ^ ((in[113] ^
+        in[117]) ^ in[119]));
+    assign out_d[50] = (((in[18] ^ in[22]) ^ (in[23] ^ in[48])) ^ ((in[49] ^
+        in[54]) ^ in[81])) ^ (((in[82] ^ in[86]) ^ in[87]) ^ ((in[112] ^
+        in[114]) ^ in[118]));
+    assign out_d[51] = ((((in[16] ^ in[19]) ^ in[21]) ^ (in[23] ^ in[48])) ^
+        (((in[49] ^ in[50]) ^ in[53]) ^ (in[54] ^ in[80]))) ^ ((((in[82] ^
+        in[83]) ^ in[85]) ^ (in[112] ^ in[113])) ^ ((in[115] ^ in[117]) ^
+        (in[118] ^ in[119])));
+    assign out_d[52] = ((((in[17] ^ in[20]) ^ in[21]) ^ (in[22] ^ in[49])) ^
+        (((in[50] ^ in[51]) ^ in[53]) ^ (in[81] ^ in[83]))) ^ ((((in[84] ^
+        in[85]) ^ in[86]) ^ (in[87] ^ in[113])) ^ ((in[114] ^ in[116]) ^
+        (in[117] ^ in[119])));
+    assign out_d[53] = ((((in[18] ^ in[21]) ^ in[22]) ^ (in[23] ^ in[50])) ^
+        ((in[51] ^ in[52]) ^ (in[54] ^ in[82]))) ^ (((in[84] ^ in[85]) ^ (in[86]
+        ^ in[87])) ^ ((in[114] ^ in[115]) ^ (in[117] ^ in[118])));
+    assign out_d[54] = (((in[19] ^ in[22]) ^ (in[23] ^ in[51])) ^ ((in[52] ^
+        in[53]) ^ (in[55] ^ in[83]))) ^ (((in[85] ^ in[86]) ^ (in[87] ^
+        in[115])) ^ ((in[116] ^ in[118]) ^ in[119]));
+    assign out_d[55] = (((in[20] ^ in[23]) ^ in[52]) ^ ((in[53] ^ in[54]) ^
+        in[84])) ^ (((in[86] ^ in[87]) ^ in[116]) ^ (in[117] ^ in[119]));
+    assign out_d[56] = (((in[24] ^ in[29]) ^ in[61]) ^ ((in[62] ^ in[63]) ^
+        in[88])) ^ (((in[93] ^ in[95]) ^ in[120]) ^ (in[125] ^ in[126]));
+    assign out_d[57] = (((in[25] ^ in[29]) ^ (in[30] ^ in[56])) ^ ((in[61] ^
+        in[88]) ^ in[89])) ^ (((in[93] ^ in[94]) ^ in[95]) ^ ((in[121] ^
+        in[125]) ^ in[127]));
+    assign out_d[58] = (((in[26] ^ in[30]) ^ (in[31] ^ in[56])) ^ ((in[57] ^
+        in[62]) ^ in[89])) ^ (((in[90] ^ in[94]) ^ in[95]) ^ ((in[120] ^
+        in[122]) ^ in[126]));
+    assign out_d[59] = ((((in[24] ^ in[27]) ^ in[29]) ^ (in[31] ^ in[56])) ^
+        (((in[57] ^ in[58]) ^ in[61]) ^ (in[62] ^ in[88]))) ^ ((((in[90] ^
+        in[91]) ^ in[93]) ^ (in[120] ^ in[121])) ^ ((in[123] ^ in[125]) ^
+        (in[126] ^ in[127])));
+    assign out_d[60] = ((((in[25] ^ in[28]) ^ in[29]) ^ (in[30] ^ in[57])) ^
+        (((in[58] ^ in[59]) ^ in[61]) ^ (in[89] ^ in[91]))) ^ ((((in[92] ^
+        in[93]) ^ in[94]) ^ (in[95] ^ in[121])) ^ ((in[122] ^ in[124]) ^
+        (in[125] ^ in[127])));
+    assign out_d[61] = ((((in[26] ^ in[29]) ^ in[30]) ^ (in[31] ^ in[58])) ^
+        ((in[59] ^ in[60]) ^ (in[62] ^ in[90]))) ^ (((in[92] ^ in[93]) ^ (in[94]
+        ^ in[95])) ^ ((in[122] ^ in[123]) ^ (in[125] ^ in[126])));
+    assign out_d[62] = (((in[27] ^ in[30]) ^ (in[31] ^ in[59])) ^ ((in[60] ^
+        in[61]) ^ (in[63] ^ in[91]))) ^ (((in[93] ^ in[94]) ^ (in[95] ^
+        in[123])) ^ ((in[124] ^ in[126]) ^ in[127]));
+    assign out_d[63] = (((in[28] ^ in[31]) ^ in[60]) ^ ((in[61] ^ in[62]) ^
+        in[92])) ^ (((in[94] ^ in[95]) ^ in[124]) ^ (in[125] ^ in[127]));
+    assign out_d[64] = (((in[0] ^ in[5]) ^ in[6]) ^ ((in[32] ^ in[37]) ^
+        in[69])) ^ (((in[70] ^ in[71]) ^ in[96]) ^ (in[101] ^ in[103]));
+    assign out_d[65] = (((in[1] ^ in[5]) ^ (in[7] ^ in[33])) ^ ((in[37] ^
+        in[38]) ^ in[64])) ^ (((in[69] ^ in[96]) ^ in[97]) ^ ((in[101] ^
+        in[102]) ^ in[103]));
+    assign out_d[66] = (((in[0] ^ in[2]) ^ (in[6] ^ in[34])) ^ ((in[38] ^
+        in[39]) ^ in[64])) ^ (((in[65] ^ in[70]) ^ in[97]) ^ ((in[98] ^ in[102])
+        ^ in[103]));
+    assign out_d[67] = ((((in[0] ^ in[1]) ^ in[3]) ^ (in[5] ^ in[6])) ^ (((in[7]
+        ^ in[32]) ^ in[35]) ^ (in[37] ^ in[39]))) ^ ((((in[64] ^ in[65]) ^
+        in[66]) ^ (in[69] ^ in[70])) ^ ((in[96] ^ in[98]) ^ (in[99] ^
+        in[101])));
+    assign out_d[68] = ((((in[1] ^ in[2]) ^ in[4]) ^ (in[5] ^ in[7])) ^
+        (((in[33] ^ in[36]) ^ in[37]) ^ (in[38] ^ in[65]))) ^ ((((in[66] ^
+        in[67]) ^ in[69]) ^ (in[97] ^ in[99])) ^ ((in[100] ^ in[101]) ^ (in[102]
+        ^ in[103])));
+    assign out_d[69] = ((((in[2] ^ in[3]) ^ in[5]) ^ (in[6] ^ in[34])) ^
+        ((in[37] ^ in[38]) ^ (in[39] ^ in[66]))) ^ (((in[67] ^ in[68]) ^ (in[70]
+        ^ in[98])) ^ ((in[100] ^ in[101]) ^ (in[102] ^ in[103])));
+    assign out_d[70] = (((in[3] ^ in[4]) ^ (in[6] ^ in[7])) ^ ((in[35] ^ in[38])
+        ^ (in[39] ^ in[67]))) ^ (((in[68] ^ in[69]) ^ (in[71] ^ in[99])) ^
+        ((in[101] ^ in[102]) ^ in[103]));
+    assign out_d[71] = (((in[4] ^ in[5]) ^ in[7]) ^ ((in[36] ^ in[39]) ^
+        in[68])) ^ (((in[69] ^ in[70]) ^ in[100]) ^ (in[102] ^ in[103]));
+    assign out_d[72] = (((in[8] ^ in[13]) ^ in[14]) ^ ((in[40] ^ in[45]) ^
+        in[77])) ^ (((in[78] ^ in[79]) ^ in[104]) ^ (in[109] ^ in[111]));
+    assign out_d[73] = (((in[9] ^ in[13]) ^ (in[15] ^ in[41])) ^ ((in[45] ^
+        in[46]) ^ in[72])) ^ (((in[77] ^ in[104]) ^ in[105]) ^ ((in[109] ^
+        in[110]) ^ in[111]));
+    assign out_d[74] = (((in[8] ^ in[10]) ^ (in[14] ^ in[42])) ^ ((in[46] ^
+        in[47]) ^ in[72])) ^ (((in[73] ^ in[78]) ^ in[105]) ^ ((in[106] ^
+        in[110]) ^ in[111]));
+    assign out_d[75] = ((((in[8] ^ in[9]) ^ in[11]) ^ (in[13] ^ in[14])) ^
+        (((in[15] ^ in[40]) ^ in[43]) ^ (in[45] ^ in[47]))) ^ ((((in[72] ^
+        in[73]) ^ in[74]) ^ (in[77] ^ in[78])) ^ ((in[104] ^ in[106]) ^ (in[107]
+        ^ in[109])));
+    assign out_d[76] = ((((in[9] ^ in[10]) ^ in[12]) ^ (in[13] ^ in[15])) ^
+        (((in[41] ^ in[44]) ^ in[45]) ^ (in[46] ^ in[73]))) ^ ((((in[74] ^
+        in[75]) ^ in[77]) ^ (in[105] ^ in[107])) ^ ((in[108] ^ in[109]) ^
+        (in[110] ^ in[111])));
+    assign out_d[77] = ((((in[10] ^ in[11]) ^ in[13]) ^ (in[14] ^ in[42])) ^
+        ((in[45] ^ in[46]) ^ (in[47] ^ in[74]))) ^ (((in[75] ^ in[76]) ^ (in[78]
+        ^ in[106])) ^ ((in[108] ^ in[109]) ^ (in[110] ^ in[111])));
+    assign out_d[78] = (((in[11] ^ in[12]) ^ (in[14] ^ in[15])) ^ ((in[43] ^
+        in[46]) ^ (in[47] ^ in[75]))) ^ (((in[76] ^ in[77]) ^ (in[79] ^
+        in[107])) ^ ((in[109] ^ in[110]) ^ in[111]));
+    assign out_d[79] = (((in[12] ^ in[13]) ^ in[15]) ^ ((in[44] ^ in[47]) ^
+        in[76])) ^ (((in[77] ^ in[78]) ^ in[108]) ^ (in[110] ^ in[111]));
+    assign out_d[80] = (((in[16] ^ in[21]) ^ in[22]) ^ ((in[48] ^ in[53]) ^
+        in[85])) ^ (((in[86] ^ in[87]) ^ in[112]) ^ (in[117] ^ in[119]));
+    assign out_d[81] = (((in[17] ^ in[21]) ^ (in[23] ^ in[49])) ^ ((in[53] ^
+        in[54]) ^ in[80])) ^ (((in[85] ^ in[112]) ^ in[113]) ^ ((in[117] ^
+        in[118]) ^ in[119]));
+    assign out_d[82] = (((in[16] ^ in[18]) ^ (in[22] ^ in[50])) ^ ((in[54] ^
+        in[55]) ^ in[80])) ^ (((in[81] ^ in[86]) ^ in[113]) ^ ((in[114] ^
+        in[118]) ^ in[119]));
+    assign out_d[83] = ((((in[16] ^ in[17]) ^ in[19]) ^ (in[21] ^ in[22])) ^
+        (((in[23] ^ in[48]) ^ in[51]) ^ (in[53] ^ in[55]))) ^ ((((in[80] ^
+        in[81]) ^ in[82]) ^ (in[85] ^ in[86])) ^ ((in[112] ^ in[114]) ^ (in[115]
+        ^ in[117])));
+    assign out_d[84] = ((((in[17] ^ in[18]) ^ in[20]) ^ (in[21] ^ in[23])) ^
+        (((in[49] ^ in[52]) ^ in[53]) ^ (in[54] ^ in[81]))) ^ ((((in[82] ^
+        in[83]) ^ in[85]) ^ (in[113] ^ in[115])) ^ ((in[116] ^ in[117]) ^
+        (in[118] ^ in[119])));
+    assign out_d[85] = ((((in[18] ^ in[19]) ^ in[21]) ^ (in[22] ^ in[50])) ^
+        ((in[53] ^ in[54]) ^ (in[55] ^ in[82]))) ^ (((in[83] ^ in[84]) ^ (in[86]
+        ^ in[114])) ^ ((in[116] ^ in[117]) ^ (in[118] ^ in[119])));
+    assign out_d[86] = (((in[19] ^ in[20]) ^ (in[22] ^ in[23])) ^ ((in[51] ^
+        in[54]) ^ (in[55] ^ in[83]))) ^ (((in[84] ^ in[85]) ^ (in[87] ^
+        in[115])) ^ ((in[117] ^ in[118]) ^ in[119]));
+    assign out_d[87] = (((in[20] ^ in[21]) ^ in[23]) ^ ((in[52] ^ in[55]) ^
+        in[84])) ^ (((in[85] ^ in[86]) ^ in[116]) ^ (in[118] ^ in[119]));
+    assign out_d[88] = (((in[24] ^ in[29]) ^ in[30]) ^ ((in[56] ^ in[61]) ^
+        in[93])) ^ (((in[94] ^ in[95]) ^ in[120]) ^ (in[125] ^ in[127]));
+    assign out_d[89] = (((in[25] ^ in[29]) ^ (in[31] ^ in[57])) ^ ((in[61] ^
+        in[62]) ^ in[88])) ^ (((in[93] ^ in[120]) ^ in[121]) ^ ((in[125] ^
+        in[126]) ^ in[127]));
+    assign out_d[90] = (((in[24] ^ in[26]) ^ (in[30] ^ in[58])) ^ ((in[62] ^
+        in[63]) ^ in[88])) ^ (((in[89] ^ in[94]) ^ in[121]) ^ ((in[122] ^
+        in[126]) ^ in[127]));
+    assign out_d[91] = ((((in[24] ^ in[25]) ^ in[27]) ^ (in[29] ^ in[30])) ^
+        (((in[31] ^ in[56]) ^ in[59]) ^ (in[61] ^ in[63]))) ^ ((((in[88] ^
+        in[89]) ^ in[90]) ^ (in[93] ^ in[94])) ^ ((in[120] ^ in[122]) ^ (in[123]
+        ^ in[125])));
+    assign out_d[92] = ((((in[25] ^ in[26]) ^ in[28]) ^ (in[29] ^ in[31])) ^
+        (((in[57] ^ in[60]) ^ in[61]) ^ (in[62] ^ in[89]))) ^ ((((in[90] ^
+        in[91]) ^ in[93]) ^ (in[121] ^ in[123])) ^ ((in[124] ^ in[125]) ^
+        (in[126] ^ in[127])));
+    assign out_d[93] = ((((in[26] ^ in[27]) ^ in[29]) ^ (in[30] ^ in[58])) ^
+        ((in[61] ^ in[62]) ^ (in[63] ^ in[90]))) ^ (((in[91] ^ in[92]) ^ (in[94]
+        ^ in[122])) ^ ((in[124] ^ in[125]) ^ (in[126] ^ in[127])));
+    assign out_d[94] = (((in[27] ^ in[28]) ^ (in[30] ^ in[31])) ^ ((in[59] ^
+        in[62]) ^ (in[63] ^ in[91]))) ^ (((in[92] ^ in[93]) ^ (in[95] ^
+        in[123])) ^ ((in[125] ^ in[126]) ^ in[127]));
+    assign out_d[95] = (((in[28] ^ in[29]) ^ in[31]) ^ ((in[60] ^ in[63]) ^
+        in[92])) ^ (((in[93] ^ in[94]) ^ in[124]) ^ (in[126] ^ in[127]));
+    assign out_d[96] = (((in[0] ^ in[5]) ^ in[7]) ^ ((in[32] ^ in[37]) ^
+        in[38])) ^ (((in[64] ^ in[69]) ^ in[101]) ^ (in[102] ^ in[103]));
+    assign out_d[97] = (((in[0] ^ in[1]) ^ (in[5] ^ in[6])) ^ ((in[7] ^ in[33])
+        ^ in[37])) ^ (((in[39] ^ in[65]) ^ in[69]) ^ ((in[70] ^ in[96]) ^
+        in[101]));
+    assign out_d[98] = (((in[1] ^ in[2]) ^ (in[6] ^ in[7])) ^ ((in[32] ^ in[34])
+        ^ in[38])) ^ (((in[66] ^ in[70]) ^ in[71]) ^ ((in[96] ^ in[97]) ^
+        in[102]));
+    assign out_d[99] = ((((in[0] ^ in[2]) ^ in[3]) ^ (in[5] ^ in[32])) ^
+        (((in[33] ^ in[35]) ^ in[37]) ^ (in[38] ^ in[39]))) ^ ((((in[64] ^
+        in[67]) ^ in[69]) ^ (in[71] ^ in[96])) ^ ((in[97] ^ in[98]) ^ (in[101] ^
+        in[102])));
+    assign out_d[100] = ((((in[1] ^ in[3]) ^ in[4]) ^ (in[5] ^ in[6])) ^
+        (((in[7] ^ in[33]) ^ in[34]) ^ (in[36] ^ in[37]))) ^ ((((in[39] ^
+        in[65]) ^ in[68]) ^ (in[69] ^ in[70])) ^ ((in[97] ^ in[98]) ^ (in[99] ^
+        in[101])));
+    assign out_d[101] = ((((in[2] ^ in[4]) ^ in[5]) ^ (in[6] ^ in[7])) ^
+        ((in[34] ^ in[35]) ^ (in[37] ^ in[38]))) ^ (((in[66] ^ in[69]) ^ (in[70]
+        ^ in[71])) ^ ((in[98] ^ in[99]) ^ (in[100] ^ in[102])));
+    assign out_d[102] = (((in[3] ^ in[5]) ^ (in[6] ^ in[7])) ^ ((in[35] ^
+        in[36]) ^ (in[38] ^ in[39]))) ^ (((in[67] ^ in[70]) ^ (in[71] ^ in[99]))
+        ^ ((in[100] ^ in[101]) ^ in[103]));
+    assign out_d[103] = (((in[4] ^ in[6]) ^ in[7]) ^ ((in[36] ^ in[37]) ^
+        in[39])) ^ (((in[68] ^ in[71]) ^ in[100]) ^ (in[101] ^ in[102]));
+    assign out_d[104] = (((in[8] ^ in[13]) ^ in[15]) ^ ((in[40] ^ in[45]) ^
+        in[46])) ^ (((in[72] ^ in[77]) ^ in[109]) ^ (in[110] ^ in[111]));
+    assign out_d[105] = (((in[8] ^ in[9]) ^ (in[13] ^ in[14])) ^ ((in[15] ^
+        in[41]) ^ in[45])) ^ (((in[47] ^ in[73]) ^ in[77]) ^ ((in[78] ^ in[104])
+        ^ in[109]));
+    assign out_d[106] = (((in[9] ^ in[10]) ^ (in[14] ^ in[15])) ^ ((in[40] ^
+        in[42]) ^ in[46])) ^ (((in[74] ^ in[78]) ^ in[79]) ^ ((in[104] ^
+        in[105]) ^ in[110]));
+    assign out_d[107] = ((((in[8] ^ in[10]) ^ in[11]) ^ (in[13] ^ in[40])) ^
+        (((in[41] ^ in[43]) ^ in[45]) ^ (in[46] ^ in[47]))) ^ ((((in[72] ^
+        in[75]) ^ in[77]) ^ (in[79] ^ in[104])) ^ ((in[105] ^ in[106]) ^
+        (in[109] ^ in[110])));
+    assign out_d[108] = ((((in[9] ^ in[11]) ^ in[12]) ^ (in[13] ^ in[14])) ^
+        (((in[15] ^ in[41]) ^ in[42]) ^ (in[44] ^ in[45]))) ^ ((((in[47] ^
+        in[73]) ^ in[76]) ^ (in[77] ^ in[78])) ^ ((in[105] ^ in[106]) ^ (in[107]
+        ^ in[109])));
+    assign out_d[109] = ((((in[10] ^ in[12]) ^ in[13]) ^ (in[14] ^ in[15])) ^
+        ((in[42] ^ in[43]) ^ (in[45] ^ in[46]))) ^ (((in[74] ^ in[77]) ^ (in[78]
+        ^ in[79])) ^ ((in[106] ^ in[107]) ^ (in[108] ^ in[110])));
+    assign out_d[110] = (((in[11] ^ in[13]) ^ (in[14] ^ in[15])) ^ ((in[43] ^
+        in[44]) ^ (in[46] ^ in[47]))) ^ (((in[75] ^ in[78]) ^ (in[79] ^
+        in[107])) ^ ((in[108] ^ in[109]) ^ in[111]));
+    assign out_d[111] = (((in[12] ^ in[14]) ^ in[15]) ^ ((in[44] ^ in[45]) ^
+        in[47])) ^ (((in[76] ^ in[79]) ^ in[108]) ^ (in[109] ^ in[110]));
+    assign out_d[112] = (((in[16] ^ in[21]) ^ in[23]) ^ ((in[48] ^ in[53]) ^
+        in[54])) ^ (((in[80] ^ in[85]) ^ in[117]) ^ (in[118] ^ in[119]));
+    assign out_d[113] = (((in[16] ^ in[17]) ^ (in[21] ^ in[22])) ^ ((in[23] ^
+        in[49]) ^ in[53])) ^ (((in[55] ^ in[81]) ^ in[85]) ^ ((in[86] ^ in[112])
+        ^ in[117]));
+    assign out_d[114] = (((in[17] ^ in[18]) ^ (in[22] ^ in[23])) ^ ((in[48] ^
+        in[50]) ^ in[54])) ^ (((in[82] ^ in[86]) ^ in[87]) ^ ((in[112] ^
+        in[113]) ^ in[118]));
+    assign out_d[115] = ((((in[16] ^ in[18]) ^ in[19]) ^ (in[21] ^ in[48])) ^
+        (((in[49] ^ in[51]) ^ in[53]) ^ (in[54] ^ in[55]))) ^ ((((in[80] ^
+        in[83]) ^ in[85]) ^ (in[87] ^ in[112])) ^ ((in[113] ^ in[114]) ^
+        (in[117] ^ in[118])));
+    assign out_d[116] = ((((in[17] ^ in[19]) ^ in[20]) ^ (in[21] ^ in[22])) ^
+        (((in[23] ^ in[49]) ^ in[50]) ^ (in[52] ^ in[53]))) ^ ((((in[55] ^
+        in[81]) ^ in[84]) ^ (in[85] ^ in[86])) ^ ((in[113] ^ in[114]) ^ (in[115]
+        ^ in[117])));
+    assign out_d[117] = ((((in[18] ^ in[20]) ^ in[21]) ^ (in[22] ^ in[23])) ^
+        ((in[50] ^ in[51]) ^ (in[53] ^ in[54]))) ^ (((in[82] ^ in[85]) ^ (in[86]
+        ^ in[87])) ^ ((in[114] ^ in[115]) ^ (in[116] ^ in[118])));
+    assign out_d[118] = (((in[19] ^ in[21]) ^ (in[22] ^ in[23])) ^ ((in[51] ^
+        in[52]) ^ (in[54] ^ in[55]))) ^ (((in[83] ^ in[86]) ^ (in[87] ^
+        in[115])) ^ ((in[116] ^ in[117]) ^ in[119]));
+    assign out_d[119] = (((in[20] ^ in[22]) ^ in[23]) ^ ((in[52] ^ in[53]) ^
+        in[55])) ^ (((in[84] ^ in[87]) ^ in[116]) ^ (in[117] ^ in[118]));
+    assign out_d[120] = (((in[24] ^ in[29]) ^ in[31]) ^ ((in[56] ^ in[61]) ^
+        in[62])) ^ (((in[88] ^ in[93]) ^ in[125]) ^ (in[126] ^ in[127]));
+    assign out_d[121] = (((in[24] ^ in[25]) ^ (in[29] ^ in[30])) ^ ((in[31] ^
+        in[57]) ^ in[61])) ^ (((in[63] ^ in[89]) ^ in[93]) ^ ((in[94] ^ in[120])
+        ^ in[125]));
+    assign out_d[122] = (((in[25] ^ in[26]) ^ (in[30] ^ in[31])) ^ ((in[56] ^
+        in[58]) ^ in[62])) ^ (((in[90] ^ in[94]) ^ in[95]) ^ ((in[120] ^
+        in[121]) ^ in[126]));
+    assign out_d[123] = ((((in[24] ^ in[26]) ^ in[27]) ^ (in[29] ^ in[56])) ^
+        (((in[57] ^ in[59]) ^ in[61]) ^ (in[62] ^ in[63]))) ^ ((((in[88] ^
+        in[91]) ^ in[93]) ^ (in[95] ^ in[120])) ^ ((in[121] ^ in[122]) ^
+        (in[125] ^ in[126])));
+    assign out_d[124] = ((((in[25] ^ in[27]) ^ in[28]) ^ (in[29] ^ in[30])) ^
+        (((in[31] ^ in[57]) ^ in[58]) ^ (in[60] ^ in[61]))) ^ ((((in[63] ^
+        in[89]) ^ in[92]) ^ (in[93] ^ in[94])) ^ ((in[121] ^ in[122]) ^ (in[123]
+        ^ in[125])));
+    assign out_d[125] = ((((in[26] ^ in[28]) ^ in[29]) ^ (in[30] ^ in[31])) ^
+        ((in[58] ^ in[59]) ^ (in[61] ^ in[62]))) ^ (((in[90] ^ in[93]) ^ (in[94]
+        ^ in[95])) ^ ((in[122] ^ in[123]) ^ (in[124] ^ in[126])));
+    assign out_d[126] = (((in[27] ^ in[29]) ^ (in[30] ^ in[31])) ^ ((in[59] ^
+        in[60]) ^ (in[62] ^ in[63]))) ^ (((in[91] ^ in[94]) ^ (in[95] ^
+        in[123])) ^ ((in[124] ^ in[125]) ^ in[127]));
+    assign out_d[127] = (((in[28] ^ in[30]) ^ in[31]) ^ ((in[60] ^ in[61]) ^
+        in[63])) ^ (((in[92] ^ in[95]) ^ in[124]) ^ (in[125] ^ in[126]));
+
+    assign out = decrypt ? out_d : out_e;
 endmodule
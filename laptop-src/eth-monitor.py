@@ -0,0 +1,59 @@
+import sys
+import time
+sys.path.append('../lib/')
+import eth
+import rawsock
+
+# watches FGP and FFCP traffic on the wire through the mmap receive ring
+# and reports per-second counts, the last FFCP ack index and ring drops
+REPORT_PERIOD = 1.0
+ETHERTYPE_OFF = 2 * eth.MAC_LEN
+
+interface = sys.argv[1] if len(sys.argv) > 1 else rawsock.DEFAULT_INTERFACE
+fgp_type = int.from_bytes(eth.ETHERTYPE_FGP, 'big')
+ffcp_type = int.from_bytes(eth.ETHERTYPE_FFCP, 'big')
+
+counts = {'fgp': 0, 'ffcp msg': 0, 'ffcp ack': 0, 'ffcp syn': 0, 'other': 0}
+last_ack = None
+last_report = time.time()
+
+def count(frame):
+	global last_ack
+	if len(frame) <= eth.HEADER_LEN:
+		return
+	eth_type = (frame[ETHERTYPE_OFF] << 8) | frame[ETHERTYPE_OFF+1]
+	if eth_type == fgp_type:
+		counts['fgp'] += 1
+	elif eth_type == ffcp_type:
+		metadata = frame[eth.HEADER_LEN]
+		ffcp_type_field = metadata >> eth.FFCP_INDEX_LEN
+		if ffcp_type_field == eth.FFCP_TYPE_ACK:
+			counts['ffcp ack'] += 1
+			last_ack = metadata & ((1 << eth.FFCP_INDEX_LEN) - 1)
+		elif ffcp_type_field == eth.FFCP_TYPE_SYN:
+			counts['ffcp syn'] += 1
+		else:
+			counts['ffcp msg'] += 1
+	else:
+		counts['other'] += 1
+
+def maybe_report(rx):
+	global last_report
+	now = time.time()
+	if now - last_report < REPORT_PERIOD:
+		return
+	stats = rx.stats()
+	print(' '.join('%s: %d' % item for item in counts.items()) +
+		' last ack: %s ring drops: %d' % (last_ack, stats['ring_drops']))
+	for key in counts:
+		counts[key] = 0
+	last_report = now
+
+with rawsock.Receiver(interface) as rx:
+	# frames() returns after a period without traffic, so the counts
+	# (zero on a quiet link) are still reported every period
+	while True:
+		for frame in rx.frames(timeout=int(REPORT_PERIOD * 1000)):
+			count(frame)
+			maybe_report(rx)
+		maybe_report(rx)
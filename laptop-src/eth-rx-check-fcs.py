@@ -0,0 +1,46 @@
+import sys
+import socket
+import time
+sys.path.append('../lib/')
+import eth
+import fcs_check
+
+# run eth-rx-bad-packets.sh first so that frames keep their FCS and
+# bad frames are not dropped by the NIC
+ETH_P_ALL = 3
+INTERFACE = 'enp2s0'
+BUF_SIZE = 4096
+REPORT_PERIOD = 1.0
+
+sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, socket.htons(ETH_P_ALL))
+sock.bind((INTERFACE, ETH_P_ALL))
+sock.settimeout(REPORT_PERIOD)
+
+batch = fcs_check.FrameBatch()
+recv_buf = bytearray(BUF_SIZE)
+last_report = time.time()
+
+def report(batch):
+	res = batch.check()
+	secs, good_cnt, bad_cnt = res['rates']
+	for sec, good, bad in zip(secs, good_cnt, bad_cnt):
+		print('%d: %d good, %d bad' % (sec, good, bad))
+	for i, loc in res['errors'].items():
+		frame = batch.buf[batch.offsets[i]:batch.offsets[i+1]]
+		print('  bad frame (ethertype %s, %d bytes): %s' % (
+			eth.get_ethertype(frame).hex(), len(frame),
+			'multiple bit errors' if loc is None else
+			'bit %d of byte %d' % (loc[1], loc[0])))
+
+while True:
+	try:
+		n = sock.recv_into(recv_buf)
+		batch.append(memoryview(recv_buf)[:n], time.time())
+	except socket.timeout:
+		pass
+	now = time.time()
+	if batch.full() or now - last_report >= REPORT_PERIOD:
+		if batch.num_frames > 0:
+			report(batch)
+		batch.clear()
+		last_report = now
@@ -1,14 +1,28 @@
 import os
 import sys
-from time import sleep
 sys.path.append('../lib/')
 import eth
-import image_bytes
+import frame_cache
+import fgp_delta
+import pacer
 
 STOP_EARLY = False
+# only send the blocks that changed since the previous frame
+DELTA = True
 image_dir = 'images/nyan/'
 IMAGE_WIDTH = 128
 IMAGE_HEIGHT = 128
+# FGP packets per second; bursts are limited to what the receiving FPGA's
+# packet buffer queue can absorb
+PACKET_RATE = 100
+
+cache = frame_cache.FrameCache(IMAGE_WIDTH, IMAGE_HEIGHT)
+delta = fgp_delta.DeltaEncoder(refresh_period=(24 if DELTA else 1))
+# the NIC appends the crc, so don't compute it
+template = eth.FgpTemplate(with_crc=False)
+tx = eth.get_transmitter(strip_len=0)
+packet_pacer = pacer.Pacer(frames_per_sec=PACKET_RATE,
+	burst_frames=eth.PB_QUEUE_ALMOST_FULL_THRES)
 
 # Only cycle a few times for testing
 cnt = 0
@@ -16,12 +30,11 @@ images = sorted(os.listdir(image_dir))
 while True:
 	if STOP_EARLY and cnt == 5:
 		break
-	print(cnt)
+	print(cnt, cache.stats(), delta.stats(), packet_pacer.report())
 	for fin_name in images:
-		im = image_bytes.image_to_colors(
-			os.path.join(image_dir, fin_name),
-			IMAGE_WIDTH, IMAGE_HEIGHT)
-		for i in range(len(im)//512):
-			eth.sendeth(eth.gen_eth_fgp(i*512, im[i*512:(i+1)*512]))
-			sleep(0.01)
+		payloads = cache.get(os.path.join(image_dir, fin_name))
+		for payload in delta.changed(payloads):
+			frame = template.fill_payload(payload)
+			packet_pacer.wait(len(frame))
+			tx.send(frame)
 	cnt = cnt + 1
@@ -1,14 +1,40 @@
 import sys
 sys.path.append('../lib/')
 import fpga_serial
+import serial_rx
+
+# 'dump' for the BTNC memory dump, 'fgp' or 'ffcp' for packet streams
+RECORD_KIND = 'dump'
+USE_MMAP = False
+# bytes per read; a read returns early after READ_TIMEOUT, so at 12mbaud
+# this wakes up about 20 times per second instead of spinning
+READ_SIZE = 1 << 16
+READ_TIMEOUT = 0.05
 
 def listen(ser):
-	with open('dump.log', 'wb') as f:
-		while True:
-			data = ser.read(128)
-			if len(data) > 0:
-				print('received %d bits' % len(data))
-				f.write(data)
-				f.flush()
+	ser.timeout = READ_TIMEOUT
+	parser = serial_rx.RecordParser(RECORD_KIND)
+	reporter = serial_rx.RateReporter()
+	with serial_rx.BatchWriter('dump.log', use_mmap=USE_MMAP) as writer:
+		try:
+			while True:
+				data = ser.read(READ_SIZE)
+				if data:
+					writer.write(data)
+					parser.feed(data)
+					for _ in parser.records():
+						pass
+				stats = parser.stats()
+				rates = reporter.update({
+					'bytes': writer.bytes_written,
+					'records': stats['records'],
+					'frames': stats['frames'],
+				})
+				if rates is not None:
+					print('%.0f bytes/s, %.1f records/s, %.1f frames/s' % (
+						rates['bytes'], rates['records'], rates['frames']),
+						stats)
+		except KeyboardInterrupt:
+			pass
 
 fpga_serial.do_serial(listen)
@@ -0,0 +1,420 @@
+import functools
+import struct
+import gf256
+
+# AES with 32-bit T-tables, which combine SubBytes, ShiftRows and
+# MixColumns into four table lookups per column and round (see FIPS-197
+# section 5 and the "Rijndael" reference implementation)
+# the state is held as four big-endian column words, so block bytes 0-3 are
+# column 0 as in FIPS-197; emulation/aes.py (SlowAES) is the reference
+
+BLOCK_LEN = 16
+KEY_LENS = (16, 24, 32)
+
+BLOCK_STRUCT = struct.Struct('>4I')
+# the FPGA key changes with SW[15:8], so this covers all of them
+KEY_CACHE_SIZE = 256
+
+xtime = gf256.xtime
+mul = gf256.mul
+
+def rotl8(x, n):
+	return ((x << n) | (x >> (8 - n))) & 0xff
+
+def _gen_sbox():
+	sbox = [0] * 256
+	# p runs through all nonzero elements as powers of 3, and q through
+	# their inverses
+	p = q = 1
+	while True:
+		p = p ^ xtime(p)
+		q ^= q << 1
+		q ^= q << 2
+		q ^= q << 4
+		q &= 0xff
+		if q & 0x80:
+			q ^= 0x09
+		sbox[p] = (q ^ rotl8(q, 1) ^ rotl8(q, 2) ^ rotl8(q, 3) ^
+			rotl8(q, 4) ^ 0x63)
+		if p == 1:
+			break
+	sbox[0] = 0x63
+	return sbox
+
+SBOX = _gen_sbox()
+INV_SBOX = [0] * 256
+for i, s in enumerate(SBOX):
+	INV_SBOX[s] = i
+
+def ror32(x, n):
+	return ((x >> n) | (x << (32 - n))) & 0xffffffff
+
+# TE0[x] is the column (2s, s, s, 3s) for s = SBOX[x], and TE1-TE3 are its
+# rotations for the other rows; TD0-TD3 are the same for the inverse cipher
+# with (14r, 9r, 13r, 11r) for r = INV_SBOX[x]
+def _gen_tables(box, mults):
+	t0 = []
+	for x in range(256):
+		s = box[x]
+		t0.append((mul(s, mults[0]) << 24) | (mul(s, mults[1]) << 16) |
+			(mul(s, mults[2]) << 8) | mul(s, mults[3]))
+	return (t0, [ror32(w, 8) for w in t0], [ror32(w, 16) for w in t0],
+		[ror32(w, 24) for w in t0])
+
+TE0, TE1, TE2, TE3 = _gen_tables(SBOX, (2, 1, 1, 3))
+TD0, TD1, TD2, TD3 = _gen_tables(INV_SBOX, (14, 9, 13, 11))
+
+RCON = [1]
+while len(RCON) < 10:
+	RCON.append(xtime(RCON[-1]))
+
+def sub_word(w):
+	return ((SBOX[w >> 24] << 24) | (SBOX[(w >> 16) & 0xff] << 16) |
+		(SBOX[(w >> 8) & 0xff] << 8) | SBOX[w & 0xff])
+
+def inv_mix_word(w):
+	# TD tables include INV_SBOX, so undo it with SBOX first
+	return (TD0[SBOX[w >> 24]] ^ TD1[SBOX[(w >> 16) & 0xff]] ^
+		TD2[SBOX[(w >> 8) & 0xff]] ^ TD3[SBOX[w & 0xff]])
+
+# returns (encryption round keys, decryption round keys) as lists of words;
+# the decryption keys are in the order they are used, with InvMixColumns
+# applied to the inner rounds (the "equivalent inverse cipher")
+def expand_key(key):
+	key = bytes(key)
+	if len(key) not in KEY_LENS:
+		raise ValueError('invalid key length %d' % len(key))
+	nk = len(key) // 4
+	rounds = nk + 6
+	w = list(struct.unpack('>%dI' % nk, key))
+	for i in range(nk, 4 * (rounds + 1)):
+		t = w[i-1]
+		if i % nk == 0:
+			t = sub_word(ror32(t, 24)) ^ (RCON[i // nk - 1] << 24)
+		elif nk > 6 and i % nk == 4:
+			t = sub_word(t)
+		w.append(w[i-nk] ^ t)
+	dk = []
+	for r in range(rounds, -1, -1):
+		words = w[4*r:4*r+4]
+		if 0 < r < rounds:
+			words = [inv_mix_word(x) for x in words]
+		dk += words
+	return w, dk
+
+# the tables are bound as default arguments so they are looked up as locals
+def encrypt_words(rk, s0, s1, s2, s3, TE0=TE0, TE1=TE1, TE2=TE2, TE3=TE3,
+	SBOX=SBOX):
+	s0 ^= rk[0]
+	s1 ^= rk[1]
+	s2 ^= rk[2]
+	s3 ^= rk[3]
+	for k in range(4, len(rk) - 4, 4):
+		t0 = (TE0[s0 >> 24] ^ TE1[(s1 >> 16) & 0xff] ^
+			TE2[(s2 >> 8) & 0xff] ^ TE3[s3 & 0xff] ^ rk[k])
+		t1 = (TE0[s1 >> 24] ^ TE1[(s2 >> 16) & 0xff] ^
+			TE2[(s3 >> 8) & 0xff] ^ TE3[s0 & 0xff] ^ rk[k+1])
+		t2 = (TE0[s2 >> 24] ^ TE1[(s3 >> 16) & 0xff] ^
+			TE2[(s0 >> 8) & 0xff] ^ TE3[s1 & 0xff] ^ rk[k+2])
+		s3 = (TE0[s3 >> 24] ^ TE1[(s0 >> 16) & 0xff] ^
+			TE2[(s1 >> 8) & 0xff] ^ TE3[s2 & 0xff] ^ rk[k+3])
+		s0, s1, s2 = t0, t1, t2
+	# final round has no MixColumns
+	k = len(rk) - 4
+	sb = SBOX
+	return (
+		((sb[s0 >> 24] << 24) | (sb[(s1 >> 16) & 0xff] << 16) |
+			(sb[(s2 >> 8) & 0xff] << 8) | sb[s3 & 0xff]) ^ rk[k],
+		((sb[s1 >> 24] << 24) | (sb[(s2 >> 16) & 0xff] << 16) |
+			(sb[(s3 >> 8) & 0xff] << 8) | sb[s0 & 0xff]) ^ rk[k+1],
+		((sb[s2 >> 24] << 24) | (sb[(s3 >> 16) & 0xff] << 16) |
+			(sb[(s0 >> 8) & 0xff] << 8) | sb[s1 & 0xff]) ^ rk[k+2],
+		((sb[s3 >> 24] << 24) | (sb[(s0 >> 16) & 0xff] << 16) |
+			(sb[(s1 >> 8) & 0xff] << 8) | sb[s2 & 0xff]) ^ rk[k+3])
+
+def decrypt_words(dk, s0, s1, s2, s3, TD0=TD0, TD1=TD1, TD2=TD2, TD3=TD3,
+	INV_SBOX=INV_SBOX):
+	s0 ^= dk[0]
+	s1 ^= dk[1]
+	s2 ^= dk[2]
+	s3 ^= dk[3]
+	for k in range(4, len(dk) - 4, 4):
+		t0 = (TD0[s0 >> 24] ^ TD1[(s3 >> 16) & 0xff] ^
+			TD2[(s2 >> 8) & 0xff] ^ TD3[s1 & 0xff] ^ dk[k])
+		t1 = (TD0[s1 >> 24] ^ TD1[(s0 >> 16) & 0xff] ^
+			TD2[(s3 >> 8) & 0xff] ^ TD3[s2 & 0xff] ^ dk[k+1])
+		t2 = (TD0[s2 >> 24] ^ TD1[(s1 >> 16) & 0xff] ^
+			TD2[(s0 >> 8) & 0xff] ^ TD3[s3 & 0xff] ^ dk[k+2])
+		s3 = (TD0[s3 >> 24] ^ TD1[(s2 >> 16) & 0xff] ^
+			TD2[(s1 >> 8) & 0xff] ^ TD3[s0 & 0xff] ^ dk[k+3])
+		s0, s1, s2 = t0, t1, t2
+	k = len(dk) - 4
+	ib = INV_SBOX
+	return (
+		((ib[s0 >> 24] << 24) | (ib[(s3 >> 16) & 0xff] << 16) |
+			(ib[(s2 >> 8) & 0xff] << 8) | ib[s1 & 0xff]) ^ dk[k],
+		((ib[s1 >> 24] << 24) | (ib[(s0 >> 16) & 0xff] << 16) |
+			(ib[(s3 >> 8) & 0xff] << 8) | ib[s2 & 0xff]) ^ dk[k+1],
+		((ib[s2 >> 24] << 24) | (ib[(s1 >> 16) & 0xff] << 16) |
+			(ib[(s0 >> 8) & 0xff] << 8) | ib[s3 & 0xff]) ^ dk[k+2],
+		((ib[s3 >> 24] << 24) | (ib[(s2 >> 16) & 0xff] << 16) |
+			(ib[(s1 >> 8) & 0xff] << 8) | ib[s0 & 0xff]) ^ dk[k+3])
+
+def encrypt_block(rk, block):
+	return BLOCK_STRUCT.pack(*encrypt_words(rk, *BLOCK_STRUCT.unpack(block)))
+
+def decrypt_block(dk, block):
+	return BLOCK_STRUCT.pack(*decrypt_words(dk, *BLOCK_STRUCT.unpack(block)))
+
+# 128-bit ints, with block byte 0 as the most significant byte (the same
+# order as a [127:0] vector in hdl/crypto/aes.v)
+def encrypt_int(rk, x):
+	return int.from_bytes(encrypt_block(rk, x.to_bytes(BLOCK_LEN, 'big')),
+		'big')
+
+def decrypt_int(dk, x):
+	return int.from_bytes(decrypt_block(dk, x.to_bytes(BLOCK_LEN, 'big')),
+		'big')
+
+def encrypt(key, block):
+	return encrypt_block(key_schedule(bytes(key))[0], block)
+
+def decrypt(key, block):
+	return decrypt_block(key_schedule(bytes(key))[1], block)
+
+@functools.lru_cache(maxsize=KEY_CACHE_SIZE)
+def key_schedule(key):
+	return expand_key(key)
+
+# the modes take bytes, bytearray or memoryview input; output goes to out
+# (a new bytearray if None), which may be the input itself to work in place
+
+class Ecb:
+	def __init__(self, cipher):
+		self.cipher = cipher
+
+	def _process(self, data, out, fn, rk):
+		n = check_blocks(data)
+		out = bytearray(n) if out is None else out
+		unpack_from = BLOCK_STRUCT.unpack_from
+		pack_into = BLOCK_STRUCT.pack_into
+		for off in range(0, n, BLOCK_LEN):
+			pack_into(out, off, *fn(rk, *unpack_from(data, off)))
+		return out
+
+	def encrypt(self, data, out=None):
+		return self._process(data, out, encrypt_words, self.cipher.rk)
+
+	def decrypt(self, data, out=None):
+		return self._process(data, out, decrypt_words, self.cipher.dk)
+
+# the iv is carried over between calls, so a message can be processed in
+# pieces (of whole blocks)
+class Cbc:
+	def __init__(self, cipher, iv):
+		self.cipher = cipher
+		self.iv = BLOCK_STRUCT.unpack(iv)
+
+	def encrypt(self, data, out=None):
+		n = check_blocks(data)
+		out = bytearray(n) if out is None else out
+		rk = self.cipher.rk
+		unpack_from = BLOCK_STRUCT.unpack_from
+		pack_into = BLOCK_STRUCT.pack_into
+		c0, c1, c2, c3 = self.iv
+		for off in range(0, n, BLOCK_LEN):
+			p0, p1, p2, p3 = unpack_from(data, off)
+			c0, c1, c2, c3 = encrypt_words(rk, p0 ^ c0, p1 ^ c1, p2 ^ c2,
+				p3 ^ c3)
+			pack_into(out, off, c0, c1, c2, c3)
+		self.iv = (c0, c1, c2, c3)
+		return out
+
+	def decrypt(self, data, out=None):
+		n = check_blocks(data)
+		out = bytearray(n) if out is None else out
+		dk = self.cipher.dk
+		unpack_from = BLOCK_STRUCT.unpack_from
+		pack_into = BLOCK_STRUCT.pack_into
+		v0, v1, v2, v3 = self.iv
+		for off in range(0, n, BLOCK_LEN):
+			# read the ciphertext before it is overwritten in place
+			c0, c1, c2, c3 = unpack_from(data, off)
+			p0, p1, p2, p3 = decrypt_words(dk, c0, c1, c2, c3)
+			pack_into(out, off, p0 ^ v0, p1 ^ v1, p2 ^ v2, p3 ^ v3)
+			v0, v1, v2, v3 = c0, c1, c2, c3
+		self.iv = (v0, v1, v2, v3)
+		return out
+
+# CFB (with 128-bit feedback) and OFB turn AES into a stream cipher, so
+# the data doesn't have to be whole blocks; the position in the current
+# keystream block is carried over between calls
+class Cfb:
+	def __init__(self, cipher, iv):
+		self.cipher = cipher
+		self.keystream = cipher.encrypt_block(iv)
+		self.feedback = bytearray(BLOCK_LEN)
+		self.pos = 0
+
+	def _process(self, data, out, decrypt):
+		n = len(data)
+		out = bytearray(n) if out is None else out
+		data = memoryview(data).cast('B')
+		encrypt_block = self.cipher.encrypt_block
+		i = 0
+		while i < n:
+			if self.pos == 0 and n - i >= BLOCK_LEN:
+				block = bytes(data[i:i+BLOCK_LEN])
+				res = (int.from_bytes(block, 'big') ^
+					int.from_bytes(self.keystream, 'big')).to_bytes(
+						BLOCK_LEN, 'big')
+				out[i:i+BLOCK_LEN] = res
+				self.keystream = encrypt_block(block if decrypt else res)
+				i += BLOCK_LEN
+				continue
+			b = data[i]
+			res = b ^ self.keystream[self.pos]
+			out[i] = res
+			self.feedback[self.pos] = b if decrypt else res
+			self.pos += 1
+			i += 1
+			if self.pos == BLOCK_LEN:
+				self.keystream = encrypt_block(self.feedback)
+				self.pos = 0
+		return out
+
+	def encrypt(self, data, out=None):
+		return self._process(data, out, False)
+
+	def decrypt(self, data, out=None):
+		return self._process(data, out, True)
+
+class Ofb:
+	def __init__(self, cipher, iv):
+		self.cipher = cipher
+		self.keystream = cipher.encrypt_block(iv)
+		self.pos = 0
+
+	def encrypt(self, data, out=None):
+		n = len(data)
+		out = bytearray(n) if out is None else out
+		data = memoryview(data).cast('B')
+		encrypt_block = self.cipher.encrypt_block
+		i = 0
+		while i < n:
+			if self.pos == 0 and n - i >= BLOCK_LEN:
+				out[i:i+BLOCK_LEN] = (int.from_bytes(data[i:i+BLOCK_LEN],
+					'big') ^ int.from_bytes(self.keystream, 'big')).to_bytes(
+						BLOCK_LEN, 'big')
+				i += BLOCK_LEN
+			else:
+				out[i] = data[i] ^ self.keystream[self.pos]
+				self.pos += 1
+				i += 1
+				if self.pos < BLOCK_LEN:
+					continue
+				self.pos = 0
+			self.keystream = encrypt_block(self.keystream)
+		return out
+
+	decrypt = encrypt
+
+# counter mode: the keystream is the encryption of successive counter
+# blocks (iv, iv + 1, ... as 128-bit big-endian integers), so every block
+# can be computed independently and ahead of time
+class Ctr:
+	def __init__(self, cipher, iv):
+		self.cipher = cipher
+		self.counter = int.from_bytes(iv, 'big')
+		self.keystream = b''
+		self.pos = 0
+
+	def next_keystream(self):
+		self.keystream = self.cipher.encrypt_block(
+			self.counter.to_bytes(BLOCK_LEN, 'big'))
+		self.counter = (self.counter + 1) & ((1 << 128) - 1)
+		self.pos = 0
+
+	def encrypt(self, data, out=None):
+		n = len(data)
+		out = bytearray(n) if out is None else out
+		data = memoryview(data).cast('B')
+		i = 0
+		while i < n:
+			if self.pos == len(self.keystream):
+				self.next_keystream()
+			k = min(n - i, len(self.keystream) - self.pos)
+			out[i:i+k] = (int.from_bytes(data[i:i+k], 'big') ^
+				int.from_bytes(self.keystream[self.pos:self.pos+k],
+					'big')).to_bytes(k, 'big')
+			self.pos += k
+			i += k
+		return out
+
+	decrypt = encrypt
+
+def check_blocks(data):
+	n = len(data)
+	if n % BLOCK_LEN:
+		raise ValueError('data length %d is not a multiple of %d' % (
+			n, BLOCK_LEN))
+	return n
+
+def zero_pad(data):
+	return bytes(data) + bytes(-len(data) % BLOCK_LEN)
+
+def pkcs7_pad(data):
+	n = BLOCK_LEN - len(data) % BLOCK_LEN
+	return bytes(data) + bytes([n]) * n
+
+def pkcs7_unpad(data):
+	n = data[-1] if len(data) else 0
+	if not 0 < n <= BLOCK_LEN or len(data) % BLOCK_LEN:
+		raise ValueError('bad PKCS7 padding')
+	return data[:-n]
+
+# runs process (e.g. Cbc(...).encrypt) over an iterable of chunks, yielding
+# the output for each; for the block modes (whole_blocks) a partial block
+# is held back until the next chunk completes it
+def stream(process, chunks, whole_blocks=False):
+	rem = b''
+	for chunk in chunks:
+		if not whole_blocks:
+			yield process(chunk)
+			continue
+		if rem:
+			chunk = rem + bytes(chunk)
+		n = len(chunk) - len(chunk) % BLOCK_LEN
+		rem = bytes(chunk[n:])
+		if n:
+			yield process(memoryview(chunk)[:n])
+	if rem:
+		raise ValueError('stream ended with a partial block')
+
+# AES with a fixed key; the key schedule is only computed once per key
+class Cipher:
+	def __init__(self, key):
+		self.key = bytes(key)
+		self.rk, self.dk = key_schedule(self.key)
+		self.rounds = len(self.rk) // 4 - 1
+
+	def encrypt_block(self, block):
+		return encrypt_block(self.rk, block)
+
+	def decrypt_block(self, block):
+		return decrypt_block(self.dk, block)
+
+	def ecb(self):
+		return Ecb(self)
+
+	def cbc(self, iv):
+		return Cbc(self, iv)
+
+	def cfb(self, iv):
+		return Cfb(self, iv)
+
+	def ofb(self, iv):
+		return Ofb(self, iv)
+
+	def ctr(self, iv):
+		return Ctr(self, iv)
@@ -0,0 +1,192 @@
+import functools
+import aes_fast
+import gf256
+
+# bit-accurate model of the AES in hdl/crypto/aes.v
+# blocks are 128-bit ints numbered like the verilog vectors (bit 0 is
+# in[0]); the hardware differs from FIPS-197 in ways that change the
+# ciphertext, so aes_fast can't stand in for it:
+# - keygen xors rcon (a 128-bit constant at bit 32) into a 32-bit word, so
+#   rcon truncates to 0, and takes its RotWord bytes from bits [87:56]
+# - shiftrows numbers bytes from the top (bytes[0] = in[127:120]) and
+#   rotates groups of 4 consecutive bytes, while mixcolumns numbers them
+#   from the bottom (bytes[0] = in[7:0]) and mixes every fourth byte
+# decryption is still the exact inverse of encryption
+# the *_ref functions transliterate the verilog modules one to one; the
+# block functions use 128-bit tables built from them
+
+KEY = 0x4b424410770aee13094dd0da12177bb0
+ROUNDS = 10
+MASK32 = 0xffffffff
+
+SR_ENC = (0, 1, 2, 3, 5, 6, 7, 4, 10, 11, 8, 9, 15, 12, 13, 14)
+SR_DEC = (0, 1, 2, 3, 7, 4, 5, 6, 10, 11, 8, 9, 13, 14, 15, 12)
+MC_ENC = (2, 3, 1, 1)
+MC_DEC = (14, 11, 13, 9)
+
+# main.v: aes_key = {KEY[8+:120], swkey}
+def fpga_key(swkey):
+	assert(0 <= swkey < 256)
+	return (KEY & ~0xff) | swkey
+
+def subbytes_ref(x, decrypt=False):
+	box = aes_fast.INV_SBOX if decrypt else aes_fast.SBOX
+	return int.from_bytes(bytes(box[b] for b in x.to_bytes(16, 'big')), 'big')
+
+def shiftrows_ref(x, decrypt=False):
+	# bytes[15-i] = in[i*8+7:i*8], out = {bytes[order[0]], ...}
+	b = x.to_bytes(16, 'big')
+	return int.from_bytes(bytes(b[i] for i in
+		(SR_DEC if decrypt else SR_ENC)), 'big')
+
+def mixcolumns_ref(x, decrypt=False):
+	# bytes[i] = in[i*8+7:i*8], out = {mixed[15], ..., mixed[0]}
+	b = x.to_bytes(16, 'little')
+	m = MC_DEC if decrypt else MC_ENC
+	mixed = [0] * 16
+	for j in range(4):
+		col = [b[j], b[j+4], b[j+8], b[j+12]]
+		for r in range(4):
+			v = 0
+			for c in range(4):
+				v ^= gf256.mul(col[c], m[(c - r) % 4])
+			mixed[j+4*r] = v
+	return int.from_bytes(bytes(mixed), 'little')
+
+def keygen_ref(key):
+	keyout = [key]
+	w0, w1, w2, w3 = [(key >> s) & MASK32 for s in (96, 64, 32, 0)]
+	for round_num in range(1, ROUNDS + 1):
+		prev = keyout[round_num-1]
+		temp0, temp1, temp2, temp3 = [aes_fast.SBOX[(prev >> s) & 0xff]
+			for s in (56, 64, 72, 80)]
+		temp = (temp1 << 24) | (temp2 << 16) | (temp3 << 8) | temp0
+		# w0^temp^rcon is truncated to 32 bits, which drops rcon
+		w0 = w0 ^ temp
+		w1 = w0 ^ w1
+		w2 = w1 ^ w2
+		w3 = w2 ^ w3
+		keyout.append((w0 << 96) | (w1 << 64) | (w2 << 32) | w3)
+	return keyout
+
+# aes_combined: xor with keyout[0], then aes_block with block_num 0 to 9
+# and keyout[1] to keyout[10] (keyout[10] to keyout[0] when decrypting)
+def encrypt_ref(keyout, x):
+	x ^= keyout[0]
+	for block_num in range(ROUNDS):
+		x = shiftrows_ref(subbytes_ref(x))
+		if block_num != ROUNDS - 1:
+			x = mixcolumns_ref(x)
+		x ^= keyout[block_num+1]
+	return x
+
+def decrypt_ref(keyout, x):
+	x ^= keyout[ROUNDS]
+	for block_num in range(ROUNDS):
+		x = subbytes_ref(shiftrows_ref(x, True), True)
+		x ^= keyout[ROUNDS-1-block_num]
+		if block_num != ROUNDS - 1:
+			x = mixcolumns_ref(x, True)
+	return x
+
+# subbytes works on single bytes and the other steps are linear, so a round
+# is the xor of one table entry per input byte (indexed from bit 0 up)
+# linear is only evaluated on single bits, and the rest built by xor
+def _gen_tables(box, linear):
+	tables = []
+	for p in range(16):
+		images = [0] * 256
+		for v in range(1, 256):
+			low = v & -v
+			images[v] = (images[v ^ low] if v != low
+				else linear(v << (8 * p)))
+			if v != low:
+				images[v] ^= images[low]
+		tables.append(tuple(images[box[v]] for v in range(256)))
+	return tables
+
+TE = _gen_tables(aes_fast.SBOX, lambda x: mixcolumns_ref(shiftrows_ref(x)))
+TE_LAST = _gen_tables(aes_fast.SBOX, shiftrows_ref)
+TD = _gen_tables(aes_fast.INV_SBOX,
+	lambda x: mixcolumns_ref(shiftrows_ref(x, True), True))
+TD_LAST = _gen_tables(aes_fast.INV_SBOX, lambda x: shiftrows_ref(x, True))
+
+# round keys in the order they are used; the decryption ones (except the
+# first and last) go through inverse mixcolumns, like the equivalent
+# inverse cipher, since mixcolumns is applied after addroundkey
+@functools.lru_cache(maxsize=aes_fast.KEY_CACHE_SIZE)
+def key_schedule(key):
+	keyout = keygen_ref(key)
+	dk = ([keyout[ROUNDS]] +
+		[mixcolumns_ref(k, True) for k in keyout[ROUNDS-1:0:-1]] + [keyout[0]])
+	return tuple(keyout), tuple(dk)
+
+def _rounds(keys, x, tables, last):
+	t0, t1, t2, t3, t4, t5, t6, t7, t8, t9, t10, t11, t12, t13, t14, t15 = \
+		tables
+	x ^= keys[0]
+	for k in keys[1:-1]:
+		b = x.to_bytes(16, 'little')
+		x = (t0[b[0]] ^ t1[b[1]] ^ t2[b[2]] ^ t3[b[3]] ^
+			t4[b[4]] ^ t5[b[5]] ^ t6[b[6]] ^ t7[b[7]] ^
+			t8[b[8]] ^ t9[b[9]] ^ t10[b[10]] ^ t11[b[11]] ^
+			t12[b[12]] ^ t13[b[13]] ^ t14[b[14]] ^ t15[b[15]] ^ k)
+	b = x.to_bytes(16, 'little')
+	x = keys[-1]
+	for p in range(16):
+		x ^= last[p][b[p]]
+	return x
+
+def encrypt_int(rk, x):
+	return _rounds(rk, x, TE, TE_LAST)
+
+def decrypt_int(dk, x):
+	return _rounds(dk, x, TD, TD_LAST)
+
+# aes_chain as driven by aes_combined_bytes_buf: CBC with a zero iv after
+# reset, or plain ECB when cbc_enable is off
+# bytes_to_blocks packs little-endian (the first byte of a block ends up in
+# bits [7:0]) and blocks_to_bytes unpacks the same way; a trailing partial
+# block is never packed by stream_pack, so the hardware drops it, and so
+# does this
+class Chain:
+	def __init__(self, key, cbc_enable=True, decr_select=False):
+		self.rk, self.dk = key_schedule(key)
+		self.cbc_enable = cbc_enable
+		self.decr_select = decr_select
+		self.reset()
+
+	def reset(self):
+		self.prev = 0
+
+	def encrypt(self, data):
+		rk = self.rk
+		cbc = self.cbc_enable
+		prev = self.prev
+		out = bytearray(len(data) & ~0xf)
+		for i in range(0, len(out), 16):
+			x = int.from_bytes(data[i:i+16], 'little')
+			if cbc:
+				x ^= prev
+			prev = _rounds(rk, x, TE, TE_LAST)
+			out[i:i+16] = prev.to_bytes(16, 'little')
+		self.prev = prev
+		return bytes(out)
+
+	def decrypt(self, data):
+		dk = self.dk
+		cbc = self.cbc_enable
+		prev = self.prev
+		out = bytearray(len(data) & ~0xf)
+		for i in range(0, len(out), 16):
+			x = int.from_bytes(data[i:i+16], 'little')
+			y = _rounds(dk, x, TD, TD_LAST)
+			if cbc:
+				y ^= prev
+			prev = x
+			out[i:i+16] = y.to_bytes(16, 'little')
+		self.prev = prev
+		return bytes(out)
+
+	def process(self, data):
+		return self.decrypt(data) if self.decr_select else self.encrypt(data)
@@ -0,0 +1,114 @@
+import numpy as np
+import aes_fast
+
+# AES over many independent blocks at once: the T-table rounds of
+# aes_fast, with every table lookup done for all blocks by numpy indexing
+# blocks are an (N, 16) uint8 array (or bytes-like of a multiple of 16
+# bytes), processed CHUNK_BLOCKS at a time to stay in cache
+
+CHUNK_BLOCKS = 1 << 14
+MASK64 = (1 << 64) - 1
+
+TE = [np.array(t, dtype=np.uint32) for t in (aes_fast.TE0, aes_fast.TE1,
+	aes_fast.TE2, aes_fast.TE3)]
+TD = [np.array(t, dtype=np.uint32) for t in (aes_fast.TD0, aes_fast.TD1,
+	aes_fast.TD2, aes_fast.TD3)]
+SBOX = np.array(aes_fast.SBOX, dtype=np.uint32)
+INV_SBOX = np.array(aes_fast.INV_SBOX, dtype=np.uint32)
+
+def as_blocks(data):
+	if isinstance(data, np.ndarray):
+		return np.ascontiguousarray(data, dtype=np.uint8).reshape(-1, 16)
+	buf = np.frombuffer(data, dtype=np.uint8)
+	if len(buf) % aes_fast.BLOCK_LEN:
+		raise ValueError('data length %d is not a multiple of %d' % (
+			len(buf), aes_fast.BLOCK_LEN))
+	return buf.reshape(-1, 16)
+
+def to_words(blocks):
+	return blocks.view('>u4').astype(np.uint32)
+
+def from_words(words):
+	return words.astype('>u4').view(np.uint8).reshape(-1, 16)
+
+# order is the source column of each byte of a column word (row 0 to 3):
+# (0, 1, 2, 3) for ShiftRows and (0, 3, 2, 1) for InvShiftRows
+def _rounds(words, keys, tables, box, order):
+	t0, t1, t2, t3 = tables
+	a, b, c = order[1], order[2], order[3]
+	s = [words[:, i] ^ keys[0][i] for i in range(4)]
+	for k in keys[1:-1]:
+		s = [t0[s[i] >> 24] ^ t1[(s[(i+a) % 4] >> 16) & 0xff] ^
+			t2[(s[(i+b) % 4] >> 8) & 0xff] ^ t3[s[(i+c) % 4] & 0xff] ^ k[i]
+			for i in range(4)]
+	k = keys[-1]
+	out = np.empty_like(words)
+	for i in range(4):
+		out[:, i] = ((box[s[i] >> 24] << 24) |
+			(box[(s[(i+a) % 4] >> 16) & 0xff] << 16) |
+			(box[(s[(i+b) % 4] >> 8) & 0xff] << 8) |
+			box[s[(i+c) % 4] & 0xff]) ^ k[i]
+	return out
+
+class BatchCipher:
+	def __init__(self, key):
+		rk, dk = aes_fast.key_schedule(bytes(key))
+		self.rk = np.array(rk, dtype=np.uint32).reshape(-1, 4)
+		self.dk = np.array(dk, dtype=np.uint32).reshape(-1, 4)
+
+	def _map(self, blocks, fn):
+		blocks = as_blocks(blocks)
+		out = np.empty_like(blocks)
+		for start in range(0, len(blocks), CHUNK_BLOCKS):
+			chunk = blocks[start:start+CHUNK_BLOCKS]
+			out[start:start+CHUNK_BLOCKS] = from_words(fn(to_words(chunk)))
+		return out
+
+	def encrypt_words(self, words):
+		return _rounds(words, self.rk, TE, SBOX, (0, 1, 2, 3))
+
+	def decrypt_words(self, words):
+		return _rounds(words, self.dk, TD, INV_SBOX, (0, 3, 2, 1))
+
+	def encrypt_ecb(self, blocks):
+		return self._map(blocks, self.encrypt_words)
+
+	def decrypt_ecb(self, blocks):
+		return self._map(blocks, self.decrypt_words)
+
+	# CBC decryption doesn't chain through the cipher, so every block can
+	# be decrypted at once and xored with the previous ciphertext block
+	def decrypt_cbc(self, blocks, iv):
+		blocks = as_blocks(blocks)
+		out = self.decrypt_ecb(blocks)
+		out[0] ^= np.frombuffer(bytes(iv), dtype=np.uint8)
+		out[1:] ^= blocks[:-1]
+		return out
+
+	# counter blocks for CTR mode: iv is the initial 128-bit counter block
+	# (bytes or int), incremented as a big-endian integer
+	@staticmethod
+	def ctr_blocks(iv, n, start=0):
+		if not isinstance(iv, int):
+			iv = int.from_bytes(iv, 'big')
+		iv = (iv + start) & ((1 << 128) - 1)
+		hi0 = np.uint64(iv >> 64)
+		lo0 = np.uint64(iv & MASK64)
+		lo = lo0 + np.arange(n, dtype=np.uint64)
+		# carry into the high half when the low half wraps around
+		hi = hi0 + (lo < lo0).astype(np.uint64)
+		counters = np.empty((n, 2), dtype='>u8')
+		counters[:, 0] = hi
+		counters[:, 1] = lo
+		return counters.view(np.uint8).reshape(-1, 16)
+
+	def ctr_keystream(self, iv, n, start=0):
+		return self.encrypt_ecb(self.ctr_blocks(iv, n, start))
+
+	# CTR encryption and decryption; data need not be whole blocks
+	def ctr_xor(self, data, iv, start=0):
+		data = np.frombuffer(data, dtype=np.uint8) if not isinstance(
+			data, np.ndarray) else data.reshape(-1)
+		n = -(-len(data) // aes_fast.BLOCK_LEN)
+		keystream = self.ctr_keystream(iv, n, start).reshape(-1)
+		return data ^ keystream[:len(data)]
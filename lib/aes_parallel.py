@@ -0,0 +1,125 @@
+import multiprocessing
+import os
+import numpy as np
+from multiprocessing import shared_memory
+import aes_fast
+import aes_np
+
+# CBC decryption and CTR over large buffers, split across a process pool
+# each plaintext block only depends on its own ciphertext block and the one
+# before it (CBC) or on its counter (CTR), so the buffer is cut into chunks
+# that are decrypted independently; input and output live in one shared
+# memory segment, so only chunk boundaries are sent to the workers
+# this only pays off with several cores: on one core the pool and the copies
+# make it slower than BatchCipher alone, and no multi-core speedup has been
+# measured yet
+
+# below this many blocks, the pool costs more than it saves
+MIN_PARALLEL_BLOCKS = 1 << 15
+# a few chunks per process evens out differences in worker speed
+CHUNKS_PER_PROCESS = 4
+
+MODE_CBC = 0
+MODE_CTR = 1
+
+# per-worker state: attached segments by name, ciphers by key
+_segments = {}
+_ciphers = {}
+
+def _get_cipher(key):
+	cipher = _ciphers.get(key)
+	if cipher is None:
+		cipher = _ciphers[key] = aes_np.BatchCipher(key)
+	return cipher
+
+def _attach(name):
+	shm = _segments.get(name)
+	if shm is None:
+		# only keep the most recent segment attached
+		for old in _segments.values():
+			old.close()
+		_segments.clear()
+		shm = _segments[name] = shared_memory.SharedMemory(name=name)
+	return shm
+
+# processes bytes [start, end) of the input, which is the first n bytes of
+# the segment; output follows it
+def _work(name, n, start, end, mode, key, iv):
+	shm = _attach(name)
+	buf = np.ndarray((2 * n,), dtype=np.uint8, buffer=shm.buf)
+	data = buf[start:end]
+	out = buf[n+start:n+end]
+	cipher = _get_cipher(key)
+	if mode == MODE_CBC:
+		# the previous ciphertext block, or the iv for the first chunk
+		prev = (np.frombuffer(iv, dtype=np.uint8) if start == 0
+			else buf[start-aes_fast.BLOCK_LEN:start])
+		blocks = data.reshape(-1, 16)
+		res = cipher.decrypt_ecb(blocks)
+		res[0] ^= prev
+		res[1:] ^= blocks[:-1]
+		out[:] = res.reshape(-1)
+	else:
+		out[:] = cipher.ctr_xor(data, iv, start // aes_fast.BLOCK_LEN)
+	del buf, data, out
+	return end - start
+
+class ParallelCipher:
+	def __init__(self, key, processes=None):
+		self.key = bytes(key)
+		self.processes = processes or os.cpu_count() or 1
+		self.cipher = aes_np.BatchCipher(self.key)
+		self.pool = None
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def close(self):
+		if self.pool is not None:
+			self.pool.close()
+			self.pool.join()
+			self.pool = None
+
+	def get_pool(self):
+		if self.pool is None:
+			self.pool = multiprocessing.get_context('fork').Pool(
+				self.processes)
+		return self.pool
+
+	def _run(self, data, mode, iv, whole_blocks):
+		data = memoryview(data).cast('B')
+		n = len(data)
+		n_blocks = -(-n // aes_fast.BLOCK_LEN)
+		if whole_blocks and n % aes_fast.BLOCK_LEN:
+			raise ValueError('data length %d is not a multiple of %d' % (
+				n, aes_fast.BLOCK_LEN))
+		# the iv may be a 128-bit int, like for BatchCipher.ctr_xor
+		iv = iv.to_bytes(16, 'big') if isinstance(iv, int) else bytes(iv)
+		if self.processes == 1 or n_blocks < MIN_PARALLEL_BLOCKS:
+			if mode == MODE_CBC:
+				return self.cipher.decrypt_cbc(data, iv).tobytes()
+			return self.cipher.ctr_xor(data, iv).tobytes()
+		chunks = self.processes * CHUNKS_PER_PROCESS
+		chunk_len = -(-n_blocks // chunks) * aes_fast.BLOCK_LEN
+		shm = shared_memory.SharedMemory(create=True, size=2 * n)
+		try:
+			shm.buf[:n] = data
+			results = [self.get_pool().apply_async(_work, (shm.name, n,
+				start, min(start + chunk_len, n), mode, self.key, iv))
+				for start in range(0, n, chunk_len)]
+			for res in results:
+				res.get()
+			return bytes(shm.buf[n:2*n])
+		finally:
+			shm.close()
+			shm.unlink()
+
+	def decrypt_cbc(self, data, iv):
+		return self._run(data, MODE_CBC, iv, True)
+
+	# CTR encryption and decryption are the same
+	def ctr_xor(self, data, iv):
+		return self._run(data, MODE_CTR, iv, False)
@@ -1,3 +1,4 @@
+import struct
 import eth
 import ip
 
@@ -27,3 +28,37 @@ def get_target_addr(packet):
 
 def get_sender_mac(packet):
 	return packet[8:14]
+
+U16 = struct.Struct('!H')
+
+# zero-copy view over a received ARP packet, see eth.EthView
+class ARPView:
+	__slots__ = ('buf', 'off')
+
+	def __init__(self, buf, off=0):
+		self.reset(buf, off)
+
+	def reset(self, buf, off=0):
+		self.buf = buf if isinstance(buf, memoryview) else memoryview(buf)
+		self.off = off
+		return self
+
+	@property
+	def op(self):
+		return U16.unpack_from(self.buf, self.off+6)[0]
+
+	@property
+	def sender_mac(self):
+		return self.buf[self.off+8:self.off+14]
+
+	@property
+	def sender_addr(self):
+		return self.buf[self.off+14:self.off+18]
+
+	@property
+	def target_mac(self):
+		return self.buf[self.off+18:self.off+24]
+
+	@property
+	def target_addr(self):
+		return self.buf[self.off+24:self.off+28]
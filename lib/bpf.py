@@ -0,0 +1,141 @@
+import ctypes
+import socket
+import struct
+import eth
+import ip
+import dhcp
+import arp
+
+# classic BPF (see linux/filter.h), so that the kernel drops uninteresting
+# frames before they ever reach a python socket
+SO_ATTACH_FILTER = 26
+SO_DETACH_FILTER = 27
+
+BPF_LD_W_ABS = 0x20
+BPF_LD_H_ABS = 0x28
+BPF_LD_B_ABS = 0x30
+BPF_LD_W_IND = 0x40
+BPF_LD_H_IND = 0x48
+BPF_LD_B_IND = 0x50
+# X = 4 * (P[k] & 0xf), i.e. the IPv4 header length
+BPF_LDX_B_MSH = 0xb1
+BPF_JEQ_K = 0x15
+BPF_JSET_K = 0x45
+BPF_RET_K = 0x06
+
+# number of bytes of an accepted frame passed to userspace
+ACCEPT_LEN = 0x40000
+
+# struct sock_filter
+INSN = struct.Struct('=HBBI')
+
+def insn(code, k=0, jt=0, jf=0):
+	return (code, jt, jf, k)
+
+IP_OFF = eth.HEADER_LEN
+IP_FRAG_OFF = IP_OFF + 6
+IP_FRAG_MASK = 0x1fff
+IP_PROT_OFF = IP_OFF + 9
+
+# a check is (instructions loading A, value, is_eq); with is_eq, A must
+# equal value, otherwise A must have none of the bits in value set
+# indirect loads are relative to the start of the IP payload (X)
+def check_ethertype(eth_type):
+	return ([insn(BPF_LD_H_ABS, 2*eth.MAC_LEN)],
+		int.from_bytes(eth_type, 'big'), True)
+
+def check_ip_prot(prot):
+	return ([insn(BPF_LD_B_ABS, IP_PROT_OFF)], prot, True)
+
+def check_not_fragment():
+	return ([insn(BPF_LD_H_ABS, IP_FRAG_OFF)], IP_FRAG_MASK, False)
+
+def check_udp_dst_port(port):
+	return ([insn(BPF_LDX_B_MSH, IP_OFF), insn(BPF_LD_H_IND, IP_OFF + 2)],
+		port, True)
+
+DHCP_OFF = IP_OFF + ip.UDP_HEADER_LEN
+
+def check_dhcp_op(op):
+	return ([insn(BPF_LDX_B_MSH, IP_OFF), insn(BPF_LD_B_IND, DHCP_OFF)],
+		op, True)
+
+def check_dhcp_xid(xid):
+	return ([insn(BPF_LDX_B_MSH, IP_OFF), insn(BPF_LD_W_IND, DHCP_OFF + 4)],
+		xid, True)
+
+ARP_OFF = eth.HEADER_LEN
+
+def check_arp_op(op):
+	return ([insn(BPF_LD_H_ABS, ARP_OFF + 6)], op, True)
+
+def check_arp_target_addr(addr):
+	return ([insn(BPF_LD_W_ABS, ARP_OFF + 24)],
+		int.from_bytes(addr, 'big'), True)
+
+# compiles a list of alternatives, each of which is a list of checks; a
+# frame is accepted if all the checks of any alternative pass
+def compile_filter(alternatives):
+	alt_lens = [sum(len(load) + 1 for load, _, _ in checks) + 1
+		for checks in alternatives]
+	prog = []
+	for i, checks in enumerate(alternatives):
+		# index of the first instruction of the next alternative
+		# (or of the final reject)
+		next_alt = len(prog) + alt_lens[i]
+		for load, val, is_eq in checks:
+			prog += load
+			skip = next_alt - (len(prog) + 1)
+			if is_eq:
+				prog.append(insn(BPF_JEQ_K, val, 0, skip))
+			else:
+				prog.append(insn(BPF_JSET_K, val, skip, 0))
+		prog.append(insn(BPF_RET_K, ACCEPT_LEN))
+	prog.append(insn(BPF_RET_K, 0))
+	return prog
+
+def dhcp_reply_checks(xid, port=dhcp.PORT_CLIENT):
+	return [
+		check_ethertype(eth.ETHERTYPE_IP),
+		check_ip_prot(ip.IP_PROT_UDP),
+		check_not_fragment(),
+		check_udp_dst_port(port),
+		check_dhcp_op(dhcp.OP_REPLY),
+		check_dhcp_xid(xid)
+	]
+
+def arp_reply_checks(target_addr=None):
+	checks = [
+		check_ethertype(eth.ETHERTYPE_ARP),
+		check_arp_op(arp.OP_REPLY)
+	]
+	if target_addr is not None:
+		checks.append(check_arp_target_addr(target_addr))
+	return checks
+
+DROP_ALL = [insn(BPF_RET_K, 0)]
+
+def attach(sock, prog):
+	insns = b''.join(INSN.pack(*i) for i in prog)
+	buf = ctypes.create_string_buffer(insns, len(insns))
+	# struct sock_fprog
+	fprog = struct.pack('@HP', len(prog), ctypes.addressof(buf))
+	sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+
+# frames that were queued before a filter was attached are still
+# delivered, so drop everything first and drain the socket
+def attach_filter(sock, prog):
+	attach(sock, DROP_ALL)
+	timeout = sock.gettimeout()
+	sock.setblocking(False)
+	try:
+		while True:
+			sock.recv(1)
+	except BlockingIOError:
+		pass
+	finally:
+		sock.settimeout(timeout)
+	attach(sock, prog)
+
+def detach(sock):
+	sock.setsockopt(socket.SOL_SOCKET, SO_DETACH_FILTER, 0)
@@ -1,3 +1,5 @@
+import struct
+
 def reflect(x):
 	res = 0
 	for i in range(32):
@@ -22,3 +24,102 @@ def crc(frame):
 		multiple = POLY if (curr & 1) == 1 else 0
 		curr = ((curr >> 1) ^ multiple) & MASK
 	return reflect_bytes((~curr) & MASK)
+
+# table-driven implementation
+# TABLES[0] is the standard byte-at-a-time table for the reflected
+# polynomial; TABLES[k][n] is the register contribution of byte n followed
+# by k zero bytes, which lets crc_slice8 consume 8 bytes per iteration
+def _gen_tables(num_tables):
+	tables = [[0] * 256 for _ in range(num_tables)]
+	for n in range(256):
+		curr = n
+		for _ in range(8):
+			curr = (curr >> 1) ^ (POLY if (curr & 1) == 1 else 0)
+		tables[0][n] = curr
+	for k in range(1, num_tables):
+		prev = tables[k-1]
+		for n in range(256):
+			tables[k][n] = (prev[n] >> 8) ^ tables[0][prev[n] & 0xff]
+	return tables
+
+TABLES = _gen_tables(8)
+TABLE = TABLES[0]
+_SLICE8_STRUCT = struct.Struct('<II')
+
+# the update functions operate on the raw register, i.e. before the final
+# inversion and byte reflection that crc() applies
+def _update_table(curr, data):
+	table = TABLE
+	for b in data:
+		curr = (curr >> 8) ^ table[(curr ^ b) & 0xff]
+	return curr
+
+def _update_slice8(curr, data):
+	t0, t1, t2, t3, t4, t5, t6, t7 = TABLES
+	data = memoryview(data).cast('B')
+	n = len(data) & ~7
+	for lo, hi in _SLICE8_STRUCT.iter_unpack(data[:n]):
+		lo ^= curr
+		curr = (t7[lo & 0xff] ^ t6[(lo >> 8) & 0xff] ^
+			t5[(lo >> 16) & 0xff] ^ t4[lo >> 24] ^
+			t3[hi & 0xff] ^ t2[(hi >> 8) & 0xff] ^
+			t1[(hi >> 16) & 0xff] ^ t0[hi >> 24])
+	return _update_table(curr, data[n:])
+
+def crc_table(frame):
+	return reflect_bytes((~_update_table(INIT, frame)) & MASK)
+
+def crc_slice8(frame):
+	return reflect_bytes((~_update_slice8(INIT, frame)) & MASK)
+
+# zlib computes the same reflected CRC-32; only use it if it agrees with the
+# reference implementation, otherwise fall back to slicing-by-8
+try:
+	import zlib
+	_CHECK_FRAME = bytes(range(256)) * 3
+	HAS_ZLIB = zlib.crc32(_CHECK_FRAME) == reflect_bytes(crc(_CHECK_FRAME))
+except ImportError:
+	HAS_ZLIB = False
+
+if HAS_ZLIB:
+	def _update(curr, data):
+		return (~zlib.crc32(data, (~curr) & MASK)) & MASK
+else:
+	_update = _update_slice8
+
+# public incremental interface on the raw register: start from INIT, feed
+# data through update() as it comes, and finalize() gives the same value
+# as crc() of all of it
+def update(curr, data):
+	return _update(curr, data)
+
+def finalize(curr):
+	return reflect_bytes((~curr) & MASK)
+
+def fast_crc(frame):
+	return finalize(_update(INIT, frame))
+
+# streaming interface, so that the crc state after a constant prefix
+# (e.g. the MAC addresses and ethertype) can be computed once and copied
+# for every frame
+class Crc32:
+	def __init__(self, data=b''):
+		self.curr = INIT
+		self.update(data)
+
+	def update(self, data):
+		self.curr = _update(self.curr, data)
+		return self
+
+	def copy(self):
+		res = Crc32.__new__(Crc32)
+		res.curr = self.curr
+		return res
+
+	# same byte order as crc(), i.e. ready to be appended big-endian
+	def digest(self):
+		return finalize(self.curr)
+
+# crc() of any frame with a correct FCS appended, as in
+# emulation/test-crc.py
+RESIDUE = 0x1cdf4421
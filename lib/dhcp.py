@@ -1,3 +1,4 @@
+import struct
 import ip
 import eth
 
@@ -15,7 +16,10 @@ MAGIC_COOKIE = bytes([99, 130, 83, 99])
 OPT_TYPE_CODE = 53
 OPT_TYPE_LEN = 1
 OPT_TYPE_DISCOVER = 1
+OPT_TYPE_OFFER = 2
 OPT_TYPE_REQUEST = 3
+OPT_TYPE_ACK = 5
+OPT_TYPE_NAK = 6
 OPT_LIST_CODE = 55
 OPT_MASK = 1
 OPT_ROUTER = 3
@@ -23,6 +27,9 @@ OPT_DNS = 6
 OPT_DOMAIN_NAME = 15
 OPT_DHCP_SERVER_IP = 54
 OPT_REQUESTED_IP = 50
+OPT_LEASE_TIME = 51
+OPT_RENEWAL_TIME = 58
+OPT_REBINDING_TIME = 59
 OPT_END = 255
 
 HEADER_LEN_BASE = (12 + ip.IPADDR_LEN * 4 + CHADDR_LEN +
@@ -102,13 +109,48 @@ def get_xid(packet):
 def get_ip(packet):
 	return packet[16:20]
 
-def get_opts(packet):
-	curr_index = HEADER_LEN_BASE
+# stops at OPT_END or at the end of packet, dropping an option cut short
+# by it
+def get_opts(packet, off=0):
+	curr_index = off + HEADER_LEN_BASE
 	opts = {}
-	while True:
-		if packet[curr_index] == OPT_END:
-			return opts
+	while (curr_index + 1 < len(packet) and
+		packet[curr_index] != OPT_END):
 		opt_len = packet[curr_index+1]
+		if curr_index + 2 + opt_len > len(packet):
+			break
 		opts[packet[curr_index]] = (
 			packet[curr_index+2:curr_index+2+opt_len])
 		curr_index += 2 + opt_len
+	return opts
+
+U32 = struct.Struct('!I')
+
+# zero-copy view over a received DHCP message, see eth.EthView
+class DHCPView:
+	__slots__ = ('buf', 'off')
+
+	def __init__(self, buf, off=0):
+		self.reset(buf, off)
+
+	def reset(self, buf, off=0):
+		self.buf = buf if isinstance(buf, memoryview) else memoryview(buf)
+		self.off = off
+		return self
+
+	@property
+	def op(self):
+		return self.buf[self.off]
+
+	@property
+	def xid(self):
+		return U32.unpack_from(self.buf, self.off+4)[0]
+
+	# these are copied, since they outlive the received frame
+	@property
+	def ip(self):
+		return bytes(self.buf[self.off+16:self.off+20])
+
+	def opts(self):
+		return {code: bytes(val)
+			for code, val in get_opts(self.buf, self.off).items()}
@@ -0,0 +1,275 @@
+import asyncio
+import random
+import struct
+import time
+import eth
+import ip
+import dhcp
+import arp
+
+# retransmission timeouts, in seconds, following RFC 2131 section 4.1:
+# start at 4s and double on every retransmission up to 64s; the RFC
+# randomizes by +/- 1s, here by +/- 25% so shorter timeouts scale too
+RETRANSMIT_INITIAL = 4.0
+RETRANSMIT_MAX = 64.0
+RETRANSMIT_JITTER = 0.25
+MAX_ATTEMPTS = 5
+ARP_RETRANSMIT_INITIAL = 1.0
+# after a NAK, wait before starting over, doubling the wait (up to
+# retransmit_max) on every NAK and giving up after MAX_NAKS; RFC 2131
+# section 3.1 asks for at least 10s before restarting after a DECLINE
+NAK_DELAY_INITIAL = 10.0
+MAX_NAKS = 5
+
+BUF_SIZE = 4096
+
+class Lease:
+	def __init__(self, client_ip, server_mac, opts):
+		self.client_ip = client_ip
+		self.server_mac = server_mac
+		self.opts = opts
+		self.server_ip = opts.get(dhcp.OPT_DHCP_SERVER_IP, ip.IPADDR_BROADCAST)
+		self.upstream_ip = opts.get(dhcp.OPT_ROUTER)
+		self.netmask = opts.get(dhcp.OPT_MASK)
+		self.dns_ip = opts.get(dhcp.OPT_DNS)
+		self.upstream_mac = None
+		self.start = time.monotonic()
+		self.lease_time = self.get_time(dhcp.OPT_LEASE_TIME, None)
+		# default T1 and T2 from RFC 2131 section 4.4.5
+		if self.lease_time is not None:
+			self.t1 = self.get_time(dhcp.OPT_RENEWAL_TIME,
+				self.lease_time * 0.5)
+			self.t2 = self.get_time(dhcp.OPT_REBINDING_TIME,
+				self.lease_time * 0.875)
+		else:
+			self.t1 = self.t2 = None
+
+	def get_time(self, code, default):
+		if code not in self.opts:
+			return default
+		return int.from_bytes(self.opts[code], 'big')
+
+	def remaining(self, t):
+		return max(0.0, self.start + t - time.monotonic())
+
+# asyncio DHCP/ARP client driven by a non-blocking raw socket
+# sock only needs fileno/recv/send, so a socketpair can stand in for the
+# link when testing against a local server
+class DhcpClient:
+	def __init__(self, sock, xid=None, loop=None,
+		retransmit_initial=RETRANSMIT_INITIAL,
+		retransmit_max=RETRANSMIT_MAX, max_attempts=MAX_ATTEMPTS,
+		nak_delay_initial=NAK_DELAY_INITIAL, max_naks=MAX_NAKS):
+		self.sock = sock
+		self.sock.setblocking(False)
+		self.xid = random.getrandbits(32) if xid is None else xid
+		self.loop = loop
+		self.retransmit_initial = retransmit_initial
+		self.retransmit_max = retransmit_max
+		self.max_attempts = max_attempts
+		self.nak_delay_initial = nak_delay_initial
+		self.max_naks = max_naks
+		self.start_time = time.monotonic()
+		self.lease = None
+		# list of (match, future); match returns None for frames it
+		# is not interested in
+		self.waiters = []
+		self.eth_view = eth.EthView(b'')
+		self.ip_view = ip.IPv4View(b'')
+		self.udp_view = ip.UDPView(b'')
+		self.dhcp_view = dhcp.DHCPView(b'')
+		self.arp_view = arp.ARPView(b'')
+
+	def __enter__(self):
+		if self.loop is None:
+			self.loop = asyncio.get_running_loop()
+		self.loop.add_reader(self.sock.fileno(), self.on_readable)
+		return self
+
+	def __exit__(self, *args):
+		self.loop.remove_reader(self.sock.fileno())
+		for _, fut in self.waiters:
+			fut.cancel()
+		self.waiters = []
+
+	def secs(self):
+		return min(int(time.monotonic() - self.start_time), 0xffff)
+
+	def send(self, dst, eth_type, payload):
+		frame = eth.gen_eth(dst, eth.MAC_SEND, eth_type, payload)
+		# remove crc
+		self.sock.send(memoryview(frame)[:-eth.CRC_LEN])
+
+	def on_readable(self):
+		while True:
+			try:
+				frame = self.sock.recv(BUF_SIZE)
+			except (BlockingIOError, InterruptedError):
+				return
+			if not frame:
+				return
+			for match, fut in self.waiters:
+				if fut.done():
+					continue
+				try:
+					res = match(frame)
+				except (IndexError, struct.error):
+					# truncated frame
+					continue
+				if res is not None:
+					fut.set_result(res)
+			self.waiters = [w for w in self.waiters if not w[1].done()]
+
+	async def wait_for(self, match, timeout):
+		fut = self.loop.create_future()
+		self.waiters.append((match, fut))
+		try:
+			return await asyncio.wait_for(fut, timeout)
+		finally:
+			if not fut.done():
+				fut.cancel()
+
+	# sends the frame from gen_frame() and waits for a reply accepted by
+	# match, retransmitting with exponential backoff
+	async def transact(self, gen_frame, match, initial=None):
+		timeout = self.retransmit_initial if initial is None else initial
+		for _ in range(self.max_attempts):
+			self.send(*gen_frame())
+			jitter = random.uniform(-RETRANSMIT_JITTER, RETRANSMIT_JITTER)
+			try:
+				return await self.wait_for(match, timeout * (1 + jitter))
+			except asyncio.TimeoutError:
+				timeout = min(timeout * 2, self.retransmit_max)
+		raise asyncio.TimeoutError('no reply after %d attempts' %
+			self.max_attempts)
+
+	# returns (message type, client ip, server mac, options) for DHCP
+	# replies to our xid, otherwise None
+	def match_dhcp_reply(self, frame):
+		eth_view = self.eth_view.reset(frame)
+		if eth_view.ethertype != eth.ETHERTYPE_IP:
+			return None
+		ip_view = self.ip_view.reset(eth_view.buf, eth_view.payload_off)
+		if (ip_view.version != ip.IP_VERSION_4 or
+			ip_view.protocol != ip.IP_PROT_UDP):
+			return None
+		udp_view = self.udp_view.reset(ip_view.buf, ip_view.payload_off)
+		if udp_view.dst_port != dhcp.PORT_CLIENT:
+			return None
+		dhcp_view = self.dhcp_view.reset(udp_view.buf, udp_view.payload_off)
+		if (dhcp_view.op != dhcp.OP_REPLY or
+			dhcp_view.xid != self.xid):
+			return None
+		opts = dhcp_view.opts()
+		msg_type = opts.get(dhcp.OPT_TYPE_CODE, b'\x00')[0]
+		return msg_type, dhcp_view.ip, bytes(eth_view.src), opts
+
+	def match_types(self, *msg_types):
+		def match(frame):
+			res = self.match_dhcp_reply(frame)
+			if res is None or res[0] not in msg_types:
+				return None
+			return res
+		return match
+
+	async def discover(self):
+		return await self.transact(
+			lambda: (eth.MAC_BROADCAST, eth.ETHERTYPE_IP,
+				dhcp.gen_dhcp_discover(self.xid, self.secs())),
+			self.match_types(dhcp.OPT_TYPE_OFFER))
+
+	# returns a Lease, or raises ValueError on a NAK
+	async def request(self, client_ip, server_mac, server_ip,
+		broadcast=False):
+		dst = eth.MAC_BROADCAST if broadcast else server_mac
+		msg_type, client_ip, server_mac, opts = await self.transact(
+			lambda: (dst, eth.ETHERTYPE_IP,
+				dhcp.gen_dhcp_request(self.xid, self.secs(), client_ip,
+					False, server_ip)),
+			self.match_types(dhcp.OPT_TYPE_ACK, dhcp.OPT_TYPE_NAK))
+		if msg_type == dhcp.OPT_TYPE_NAK:
+			raise ValueError('DHCP request NAKed')
+		return Lease(client_ip, server_mac, opts)
+
+	async def resolve_arp(self, client_ip, target_ip):
+		def match(frame):
+			eth_view = self.eth_view.reset(frame)
+			if eth_view.ethertype != eth.ETHERTYPE_ARP:
+				return None
+			arp_view = self.arp_view.reset(eth_view.buf,
+				eth_view.payload_off)
+			if (arp_view.op != arp.OP_REPLY or
+				arp_view.target_addr != client_ip or
+				arp_view.sender_addr != target_ip):
+				return None
+			return bytes(arp_view.sender_mac)
+		return await self.transact(
+			lambda: (eth.MAC_BROADCAST, eth.ETHERTYPE_ARP,
+				arp.gen_arp(client_ip, target_ip)),
+			match, ARP_RETRANSMIT_INITIAL)
+
+	# DISCOVER -> OFFER -> REQUEST -> ACK, then resolve the router
+	# raises ValueError if the request is NAKed max_naks times
+	async def bring_up(self):
+		delay = self.nak_delay_initial
+		for naks in range(self.max_naks):
+			if naks:
+				await asyncio.sleep(delay * (1 + random.uniform(
+					-RETRANSMIT_JITTER, RETRANSMIT_JITTER)))
+				delay = min(delay * 2, self.retransmit_max)
+			_, offered_ip, server_mac, opts = await self.discover()
+			server_ip = opts.get(dhcp.OPT_DHCP_SERVER_IP,
+				ip.IPADDR_BROADCAST)
+			try:
+				lease = await self.request(offered_ip, server_mac, server_ip)
+				break
+			except ValueError:
+				# start over with a fresh discover
+				continue
+		else:
+			raise ValueError('DHCP request NAKed %d times' % self.max_naks)
+		if lease.upstream_ip is not None:
+			lease.upstream_mac = await self.resolve_arp(lease.client_ip,
+				lease.upstream_ip)
+		self.lease = lease
+		return lease
+
+	# keeps the lease alive: renew with the server at T1, rebind by
+	# broadcast at T2, and start over if the lease expires
+	async def maintain(self):
+		while True:
+			lease = self.lease
+			if lease.lease_time is None:
+				# infinite lease
+				return
+			try:
+				await asyncio.sleep(lease.remaining(lease.t1))
+				# just re-request since renew doesn't work (see
+				# emulation/networking.py)
+				self.lease = await self.renew(lease, False, lease.t2)
+				continue
+			except (asyncio.TimeoutError, ValueError):
+				pass
+			try:
+				await asyncio.sleep(lease.remaining(lease.t2))
+				self.lease = await self.renew(lease, True,
+					lease.lease_time)
+				continue
+			except (asyncio.TimeoutError, ValueError):
+				pass
+			await asyncio.sleep(lease.remaining(lease.lease_time))
+			# keep the xid: the socket may filter replies on it (see
+			# bpf.dhcp_reply_checks)
+			await self.bring_up()
+
+	# renewal is abandoned once deadline (relative to the lease start)
+	# passes
+	async def renew(self, lease, broadcast, deadline):
+		new_lease = await asyncio.wait_for(
+			self.request(lease.client_ip, lease.server_mac,
+				lease.server_ip, broadcast),
+			max(lease.remaining(deadline), 0.001))
+		new_lease.upstream_mac = lease.upstream_mac
+		if new_lease.upstream_ip is None:
+			new_lease.upstream_ip = lease.upstream_ip
+		return new_lease
@@ -1,6 +1,8 @@
 from socket import *
+import struct
 import image_bytes
 import crc32
+import rawsock
 
 MAC_LEN = 6
 MAC_ZERO = bytes.fromhex('000000000000')
@@ -21,37 +23,186 @@ def gen_eth_body(dst, src, eth_type, payload):
 	assert(len(eth_type) == ETHERTYPE_LEN)
 	return dst + src + eth_type + payload
 
-def gen_eth(dst, src, eth_type, payload):
+CRC_LEN = 4
+CRC_STRUCT = struct.Struct('>I')
+
+def gen_eth(dst, src, eth_type, payload, prefix_crc=None):
 	body = gen_eth_body(dst, src, eth_type, payload)
-	crc = crc32.crc(body)
-	return body + bytes([
-		crc >> 24,
-		(crc >> 16) & 0xff,
-		(crc >> 8) & 0xff,
-		crc & 0xff
-	])
+	# prefix_crc is the crc32.Crc32 state after dst + src + eth_type,
+	# so only the payload needs to be processed
+	if prefix_crc is None:
+		crc = crc32.fast_crc(body)
+	else:
+		crc = prefix_crc.copy().update(payload).digest()
+	return body + crc.to_bytes(CRC_LEN, 'big')
+
+# crc states after the (constant) fpga to fpga header, per ethertype
+f2f_prefix_crcs = {}
+
+def get_f2f_prefix_crc(eth_type):
+	if eth_type not in f2f_prefix_crcs:
+		f2f_prefix_crcs[eth_type] = crc32.Crc32(
+			gen_eth_body(MAC_RECV, MAC_SEND, eth_type, b''))
+	return f2f_prefix_crcs[eth_type]
 
 # fpga to fpga
 def gen_eth_f2f(eth_type, payload):
-	return gen_eth(MAC_RECV, MAC_SEND, eth_type, payload)
+	return gen_eth(MAC_RECV, MAC_SEND, eth_type, payload,
+		get_f2f_prefix_crc(eth_type))
+
+FGP_BLOCK_COLORS = 512
+FGP_OFFSET_LEN = 1
+FGP_DATA_LEN = FGP_BLOCK_COLORS * 3 // 2
+FGP_LEN = FGP_OFFSET_LEN + FGP_DATA_LEN
+
+FFCP_TYPE_LEN = 2
+FFCP_INDEX_LEN = 6
+FFCP_METADATA_LEN = 1
+FFCP_LEN = FFCP_METADATA_LEN + FGP_LEN
+FFCP_TYPE_SYN = 0
+FFCP_TYPE_MSG = 1
+FFCP_TYPE_ACK = 2
+
+# the receiving FPGA's packet buffer queue (see hdl/inc/networking.vh)
+PACKET_BUFFER_SIZE = 16384
+PB_PARTITION_LEN = 1 << (FFCP_LEN - 1).bit_length()
+PB_QUEUE_LEN = PACKET_BUFFER_SIZE // PB_PARTITION_LEN
+PB_QUEUE_ALMOST_FULL_THRES = PB_QUEUE_LEN * 7 // 8
 
 def gen_eth_fgp_payload(offset, colors):
-	assert(len(colors) == 512)
-	return (bytes([offset//512]) +
-		image_bytes.colors_to_bytes(colors))
+	assert(len(colors) == FGP_BLOCK_COLORS)
+	return (bytes([offset//FGP_BLOCK_COLORS]) +
+		image_bytes.colors_to_bytes_fast(colors))
 
 def gen_eth_fgp(offset, colors):
 	return gen_eth_f2f(ETHERTYPE_FGP,
 		gen_eth_fgp_payload(offset, colors))
 
-def sendeth(frame, interface = "enp2s0"):
-	s = socket(AF_PACKET, SOCK_RAW)
-	s.bind((interface, 0))
-	# remove crc
-	return s.send(frame[:-4])
+# preallocated frame with the header written once; the payload is filled
+# in place through the payload memoryview, and finish() computes the crc
+# in place
+# if with_crc is False, the NIC is left to append the crc, so no crc is
+# computed and frame excludes it (send it with get_transmitter(
+# interface, 0))
+class FrameTemplate:
+	def __init__(self, dst, src, eth_type, payload_len, with_crc=True):
+		self.with_crc = with_crc
+		self.buf = bytearray(gen_eth_body(dst, src, eth_type,
+			bytes(payload_len + (CRC_LEN if with_crc else 0))))
+		view = memoryview(self.buf)
+		self.payload = view[HEADER_LEN:HEADER_LEN+payload_len]
+		self.frame = view if with_crc else view[:HEADER_LEN+payload_len]
+		self.crc_view = view[HEADER_LEN+payload_len:]
+		self.prefix_crc = crc32.Crc32(view[:HEADER_LEN]).curr
+
+	def finish(self):
+		if self.with_crc:
+			crc = crc32.finalize(crc32.update(self.prefix_crc, self.payload))
+			CRC_STRUCT.pack_into(self.crc_view, 0, crc)
+		return self.frame
+
+class FgpTemplate(FrameTemplate):
+	def __init__(self, with_crc=True):
+		super().__init__(MAC_RECV, MAC_SEND, ETHERTYPE_FGP, FGP_LEN,
+			with_crc)
+		self.data = self.payload[FGP_OFFSET_LEN:]
+		self.packer = image_bytes.ColorPacker(self.data, FGP_BLOCK_COLORS)
+
+	def fill(self, offset, colors):
+		assert(len(colors) == FGP_BLOCK_COLORS)
+		self.payload[0] = offset//FGP_BLOCK_COLORS
+		self.packer.pack(colors)
+		return self.finish()
+
+	# payload is the output of gen_eth_fgp_payload
+	def fill_payload(self, payload):
+		self.payload[:] = payload
+		return self.finish()
+
+class FfcpTemplate(FrameTemplate):
+	def __init__(self, with_crc=True):
+		super().__init__(MAC_RECV, MAC_SEND, ETHERTYPE_FFCP, FFCP_LEN,
+			with_crc)
+		self.fgp = self.payload[FFCP_METADATA_LEN:]
+		self.data = self.fgp[FGP_OFFSET_LEN:]
+		self.packer = image_bytes.ColorPacker(self.data, FGP_BLOCK_COLORS)
+
+	def set_metadata(self, ffcp_type, index):
+		self.payload[0] = (ffcp_type << FFCP_INDEX_LEN) | index
+
+	def fill(self, ffcp_type, index, offset, colors):
+		assert(len(colors) == FGP_BLOCK_COLORS)
+		self.set_metadata(ffcp_type, index)
+		self.fgp[0] = offset//FGP_BLOCK_COLORS
+		self.packer.pack(colors)
+		return self.finish()
+
+	def fill_payload(self, ffcp_type, index, fgp_payload):
+		self.set_metadata(ffcp_type, index)
+		self.fgp[:] = fgp_payload
+		return self.finish()
+
+# one long-lived transmitter per interface, shared by all sendeth calls
+# by default the crc is removed, since the NIC appends its own
+transmitters = {}
+
+def get_transmitter(interface=rawsock.DEFAULT_INTERFACE, strip_len=CRC_LEN):
+	if (interface, strip_len) not in transmitters:
+		transmitters[(interface, strip_len)] = rawsock.Transmitter(
+			interface, strip_len=strip_len)
+	return transmitters[(interface, strip_len)]
+
+def sendeth(frame, interface=rawsock.DEFAULT_INTERFACE):
+	return get_transmitter(interface).send(frame)
+
+def sendeth_batch(frames, interface=rawsock.DEFAULT_INTERFACE):
+	return get_transmitter(interface).send_batch(frames)
 
 def get_ethertype(frame):
 	return frame[2*MAC_LEN:2*MAC_LEN+2]
 
 def get_src_mac(frame):
 	return frame[MAC_LEN:2*MAC_LEN]
+
+U16 = struct.Struct('!H')
+
+# zero-copy views over a received frame
+# each view holds the memoryview of the whole frame plus the offset of its
+# own header, so stacking views never slices the frame; fields are only
+# decoded when accessed, and reset() lets a view be reused for the next
+# frame
+class EthView:
+	__slots__ = ('buf', 'off')
+
+	def __init__(self, frame, off=0):
+		self.reset(frame, off)
+
+	def reset(self, frame, off=0):
+		self.buf = frame if isinstance(frame, memoryview) else memoryview(frame)
+		self.off = off
+		return self
+
+	@property
+	def dst(self):
+		return self.buf[self.off:self.off+MAC_LEN]
+
+	@property
+	def src(self):
+		return self.buf[self.off+MAC_LEN:self.off+2*MAC_LEN]
+
+	# comparable with the ETHERTYPE_* constants
+	@property
+	def ethertype(self):
+		return self.buf[self.off+2*MAC_LEN:self.off+HEADER_LEN]
+
+	@property
+	def ethertype_int(self):
+		return U16.unpack_from(self.buf, self.off+2*MAC_LEN)[0]
+
+	@property
+	def payload_off(self):
+		return self.off + HEADER_LEN
+
+	@property
+	def payload(self):
+		return self.buf[self.payload_off:]
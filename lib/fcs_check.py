@@ -0,0 +1,135 @@
+# batch FCS verification for frames captured with rx-fcs enabled
+# (see laptop-src/eth-rx-bad-packets.sh)
+# frames are stored back to back in a single buffer, with frame i at
+# buf[offsets[i]:offsets[i+1]], including its 4 byte FCS
+import numpy as np
+import crc32
+import eth
+
+CRC_TABLE = np.array(crc32.TABLE, dtype=np.uint32)
+# raw crc register (see crc32._update_table) after a frame with a
+# correct FCS
+RESIDUE_REG = (~crc32.reflect_bytes(crc32.RESIDUE)) & crc32.MASK
+# maximum length of a frame (with FCS and an 802.1Q tag)
+MAX_FRAME_LEN = 1522
+# get_ethertypes of a frame too short to have one
+RUNT_ETHERTYPE = -1
+
+# the crc is linear, so a bad frame's register XOR RESIDUE_REG is the crc
+# (with zero init) of just the error pattern, which for a single bit error
+# depends only on the bit and its distance from the end of the frame
+def _gen_syndromes(max_len):
+	syndromes = {}
+	for bit in range(8):
+		curr = crc32._update_table(0, bytes([1 << bit]))
+		for dist in range(max_len):
+			syndromes[curr] = (dist, bit)
+			curr = crc32._update_table(curr, b'\x00')
+	return syndromes
+
+SYNDROMES = _gen_syndromes(MAX_FRAME_LEN)
+
+def as_buffer(buf):
+	return np.frombuffer(buf, dtype=np.uint8)
+
+def crc_registers(buf, offsets):
+	buf = as_buffer(buf)
+	offsets = np.asarray(offsets, dtype=np.int64)
+	starts = offsets[:-1]
+	lens = offsets[1:] - starts
+	# process the longest frames first, so the frames still being
+	# processed at each byte index are always a prefix
+	order = np.argsort(-lens, kind='stable')
+	starts = starts[order]
+	lens = lens[order]
+	regs = np.full(len(order), crc32.INIT, dtype=np.uint32)
+	# number of frames longer than each byte index
+	active = np.searchsorted(-lens, -np.arange(lens[0] if len(lens) else 0),
+		side='left')
+	for i, num in enumerate(active):
+		curr = regs[:num]
+		idx = (curr ^ buf[starts[:num] + i]) & 0xff
+		regs[:num] = (curr >> 8) ^ CRC_TABLE[idx]
+	res = np.empty_like(regs)
+	res[order] = regs
+	return res
+
+def check_fcs(buf, offsets):
+	return crc_registers(buf, offsets) == RESIDUE_REG
+
+# returns a dict mapping frame index to the (byte index, bit index) of the
+# error within the frame, for each bad frame that has a single bit error;
+# bad frames with more corrupted bits are mapped to None
+def locate_errors(buf, offsets, regs=None):
+	offsets = np.asarray(offsets, dtype=np.int64)
+	if regs is None:
+		regs = crc_registers(buf, offsets)
+	lens = offsets[1:] - offsets[:-1]
+	res = {}
+	for i in np.flatnonzero(regs != RESIDUE_REG):
+		loc = SYNDROMES.get(int(regs[i]) ^ RESIDUE_REG)
+		if loc is None or loc[0] >= lens[i]:
+			res[int(i)] = None
+		else:
+			res[int(i)] = (int(lens[i]) - 1 - loc[0], loc[1])
+	return res
+
+# ethertype of each frame, or RUNT_ETHERTYPE for frames shorter than an
+# ethernet header, whose bytes at the ethertype offset belong to the next
+# frame or lie past the end of the buffer
+def get_ethertypes(buf, offsets):
+	buf = as_buffer(buf)
+	offsets = np.asarray(offsets, dtype=np.int64)
+	starts = offsets[:-1]
+	full = offsets[1:] - starts >= eth.HEADER_LEN
+	pos = starts[full] + 2 * eth.MAC_LEN
+	res = np.full(len(starts), RUNT_ETHERTYPE, dtype=np.int32)
+	res[full] = (buf[pos].astype(np.int32) << 8) | buf[pos + 1]
+	return res
+
+# good/bad counts per second, given the capture time of each frame
+def rates_per_second(timestamps, good):
+	secs = np.floor(np.asarray(timestamps)).astype(np.int64)
+	if len(secs) == 0:
+		return secs, secs, secs
+	base = secs.min()
+	good_cnt = np.bincount(secs - base, weights=good,
+		minlength=secs.max() - base + 1).astype(np.int64)
+	all_cnt = np.bincount(secs - base,
+		minlength=secs.max() - base + 1)
+	return np.arange(base, base + len(all_cnt)), good_cnt, all_cnt - good_cnt
+
+# accumulates captured frames into a contiguous buffer for check_fcs
+class FrameBatch:
+	def __init__(self, capacity=1 << 22, max_frames=8192):
+		self.buf = bytearray(capacity)
+		self.offsets = np.zeros(max_frames + 1, dtype=np.int64)
+		self.timestamps = np.zeros(max_frames)
+		self.num_frames = 0
+
+	def full(self, frame_len=MAX_FRAME_LEN):
+		return (self.num_frames == len(self.timestamps) or
+			self.offsets[self.num_frames] + frame_len > len(self.buf))
+
+	def append(self, frame, timestamp):
+		start = self.offsets[self.num_frames]
+		self.buf[start:start+len(frame)] = frame
+		self.timestamps[self.num_frames] = timestamp
+		self.num_frames += 1
+		self.offsets[self.num_frames] = start + len(frame)
+
+	def clear(self):
+		self.num_frames = 0
+
+	def check(self):
+		n = self.num_frames
+		offsets = self.offsets[:n+1]
+		buf = memoryview(self.buf)[:offsets[-1]]
+		regs = crc_registers(buf, offsets)
+		good = regs == RESIDUE_REG
+		return {
+			'good': good,
+			'rates': rates_per_second(self.timestamps[:n], good),
+			'ethertypes': get_ethertypes(buf, offsets),
+			'errors': locate_errors(buf, offsets, regs),
+		}
@@ -0,0 +1,284 @@
+# FFCP: FGPA Flow Control Protocol (see hdl/networking/ffcp.v)
+# format: [ type (2 bits) | index (6 bits) | FGP data (769 bytes) ]
+# FGP data is omitted in ack
+# FfcpSender and FfcpReceiver follow ffcp_tx_server and ffcp_rx_server;
+# all methods take the current time explicitly, so they can be driven by
+# a simulated clock as well as the wall clock
+import collections
+import socket
+import time
+import eth
+import rawsock
+
+BUFFER_LEN = 2 ** eth.FFCP_INDEX_LEN
+INDEX_MASK = BUFFER_LEN - 1
+WINDOW_LEN = 4
+# ffcp_tx_server's timeouts are 500000 and 50000000 cycles at 50MHz
+RESEND_TIMEOUT = 0.01
+RESYN_TIMEOUT = 1.0
+# an ack carries no data, but the frame still has to be padded to the
+# minimum ethernet payload length
+ETH_MIN_PAYLOAD = 46
+
+def gen_metadata(ffcp_type, index):
+	return (ffcp_type << eth.FFCP_INDEX_LEN) | index
+
+def parse_metadata(metadata):
+	return metadata >> eth.FFCP_INDEX_LEN, metadata & INDEX_MASK
+
+def gen_ffcp_payload(ffcp_type, index, fgp_payload=b''):
+	payload = bytes([gen_metadata(ffcp_type, index)]) + fgp_payload
+	if len(payload) < ETH_MIN_PAYLOAD:
+		payload += bytes(ETH_MIN_PAYLOAD - len(payload))
+	return payload
+
+# returns (type, index, FGP payload) for FFCP frames, otherwise None
+def parse_frame(frame):
+	frame = memoryview(frame)
+	if (len(frame) <= eth.HEADER_LEN or
+		eth.get_ethertype(frame) != eth.ETHERTYPE_FFCP):
+		return None
+	ffcp_type, index = parse_metadata(frame[eth.HEADER_LEN])
+	start = eth.HEADER_LEN + eth.FFCP_METADATA_LEN
+	return ffcp_type, index, frame[start:start+eth.FGP_LEN]
+
+class FfcpSender:
+	def __init__(self, link, window_len=WINDOW_LEN,
+		resend_timeout=RESEND_TIMEOUT, resyn_timeout=RESYN_TIMEOUT,
+		max_queue=eth.PB_QUEUE_LEN, now=None):
+		assert(window_len < BUFFER_LEN)
+		self.link = link
+		self.window_len = window_len
+		self.resend_timeout = resend_timeout
+		self.resyn_timeout = resyn_timeout
+		self.max_queue = max_queue
+		# FGP payloads not yet acked; queue[0] has index queue_head
+		# this is the packet buffer queue of ffcp_tx_server
+		self.queue = collections.deque()
+		self.template = eth.FfcpTemplate(with_crc=False)
+		now = time.monotonic() if now is None else now
+		self.reset()
+		self.last_send = now
+		self.last_ack = now
+		# like resyn_pg, only resyn once until an ack is heard
+		self.resyn_armed = True
+		self.frames_sent = 0
+		self.resends = 0
+		self.resyns = 0
+		self.acks = 0
+
+	def reset(self):
+		self.queue_head = 0
+		self.curr_index = 0
+		self.syn_buf = True
+
+	def stats(self):
+		return {
+			'frames_sent': self.frames_sent,
+			'resends': self.resends,
+			'resyns': self.resyns,
+			'acks': self.acks,
+			'queued': len(self.queue),
+		}
+
+	def full(self):
+		return len(self.queue) >= self.max_queue
+
+	def push(self, fgp_payload):
+		assert(not self.full())
+		self.queue.append(fgp_payload)
+
+	def idle(self):
+		return len(self.queue) == 0
+
+	# offset in the transmit window, truncated to take care of wraparound
+	def window_off(self, index):
+		return (index - self.queue_head) & INDEX_MASK
+
+	def at_end(self):
+		off = self.window_off(self.curr_index)
+		return off == self.window_len or off >= len(self.queue)
+
+	def on_frame(self, frame, now=None):
+		res = parse_frame(frame)
+		if res is None or res[0] != eth.FFCP_TYPE_ACK:
+			return
+		now = time.monotonic() if now is None else now
+		self.on_ack(res[1], now)
+
+	def on_ack(self, index, now):
+		self.acks += 1
+		self.last_ack = now
+		self.resyn_armed = True
+		off = self.window_off(index)
+		# ffcp_tx_server ignores acks with off == window_len, i.e. acks
+		# for the entire window, which stalls the stream until a resyn if
+		# the earlier acks were lost; accept them here
+		if off > self.window_len or off > len(self.queue):
+			return
+		self.syn_buf = False
+		for _ in range(off):
+			self.queue.popleft()
+		curr_off = (index - self.curr_index) & INDEX_MASK
+		self.queue_head = index
+		# if the transmit window has shifted beyond the packet we're
+		# currently transmitting, just skip ahead
+		if curr_off < self.window_len:
+			self.curr_index = index
+
+	# sends everything the window allows and handles the timeouts
+	# returns the number of frames sent
+	def poll(self, now=None):
+		now = time.monotonic() if now is None else now
+		if self.resyn_armed and now - self.last_ack >= self.resyn_timeout:
+			self.resyn_armed = False
+			self.resyns += 1
+			self.reset()
+		if self.at_end():
+			if (self.curr_index != self.queue_head and
+				now - self.last_send >= self.resend_timeout):
+				# go back to the head of the transmit window
+				self.resends += 1
+				self.curr_index = self.queue_head
+			else:
+				return 0
+		sent = 0
+		while not self.at_end():
+			self.send_curr()
+			sent += 1
+		self.last_send = now
+		return sent
+
+	def send_curr(self):
+		index = self.curr_index
+		ffcp_type = (eth.FFCP_TYPE_SYN if self.syn_buf and index == 0
+			else eth.FFCP_TYPE_MSG)
+		payload = self.queue[self.window_off(index)]
+		self.link.send(self.template.fill_payload(ffcp_type, index, payload))
+		self.frames_sent += 1
+		self.curr_index = (index + 1) & INDEX_MASK
+
+# commit is called with each FGP payload, in order
+class FfcpReceiver:
+	def __init__(self, link, commit, window_len=WINDOW_LEN, reack=True):
+		self.link = link
+		self.commit = commit
+		self.window_len = window_len
+		# ffcp_rx_server ignores packets outside the receive window
+		# without acking them, so a sender whose acks were all lost only
+		# recovers with a resyn; with reack, such duplicates are acked
+		self.reack = reack
+		self.queue_head = 0
+		self.received = [None] * BUFFER_LEN
+		self.frames_received = 0
+		self.commits = 0
+		self.acks_sent = 0
+		self.ignored = 0
+		self.syns = 0
+
+	def stats(self):
+		return {
+			'frames_received': self.frames_received,
+			'commits': self.commits,
+			'acks_sent': self.acks_sent,
+			'ignored': self.ignored,
+			'syns': self.syns,
+		}
+
+	def on_frame(self, frame, now=None):
+		res = parse_frame(frame)
+		if res is None or res[0] == eth.FFCP_TYPE_ACK:
+			return
+		ffcp_type, index, payload = res
+		self.frames_received += 1
+		if ffcp_type == eth.FFCP_TYPE_SYN:
+			self.syns += 1
+			self.queue_head = 0
+			self.received = [None] * BUFFER_LEN
+		elif (index - self.queue_head) & INDEX_MASK >= self.window_len:
+			self.ignored += 1
+			if self.reack:
+				self.send_ack()
+			return
+		self.received[index] = bytes(payload)
+		ack = False
+		# commit everything at the head of the window, then ack once
+		while self.received[self.queue_head] is not None:
+			self.commit(self.received[self.queue_head])
+			self.commits += 1
+			self.received[self.queue_head] = None
+			self.queue_head = (self.queue_head + 1) & INDEX_MASK
+			ack = True
+		if ack:
+			self.send_ack()
+
+	def send_ack(self):
+		self.link.send(eth.gen_eth_f2f(eth.ETHERTYPE_FFCP,
+			gen_ffcp_payload(eth.FFCP_TYPE_ACK, self.queue_head)
+		)[:-eth.CRC_LEN])
+		self.acks_sent += 1
+
+# in-process link for tests; frames sent on one end are received on the
+# other, and drop (if given) decides which frames are lost
+class LoopbackLink:
+	def __init__(self, drop=None):
+		self.rx = collections.deque()
+		self.peer = None
+		self.drop = drop
+
+	@staticmethod
+	def pair(drop=None):
+		a = LoopbackLink(drop)
+		b = LoopbackLink(drop)
+		a.peer = b
+		b.peer = a
+		return a, b
+
+	def send(self, frame):
+		if self.drop is None or not self.drop(frame):
+			self.peer.rx.append(bytes(frame))
+
+	def recv(self):
+		return self.rx.popleft() if self.rx else None
+
+# link over a raw socket; frames are sent without a crc
+class RawLink:
+	def __init__(self, interface=rawsock.DEFAULT_INTERFACE):
+		self.tx = rawsock.Transmitter(interface)
+		self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW,
+			socket.htons(rawsock.ETH_P_ALL))
+		self.sock.bind((interface, rawsock.ETH_P_ALL))
+		self.sock.setblocking(False)
+		self.buf = bytearray(4096)
+
+	def close(self):
+		self.tx.close()
+		self.sock.close()
+
+	def send(self, frame):
+		self.tx.send(frame)
+
+	def recv(self):
+		try:
+			n = self.sock.recv_into(self.buf)
+		except BlockingIOError:
+			return None
+		return memoryview(self.buf)[:n]
+
+# streams payloads through sender until all of them are acked
+def send_all(sender, payloads, timeout=None):
+	start = time.monotonic()
+	payloads = iter(payloads)
+	pending = next(payloads, None)
+	while pending is not None or not sender.idle():
+		while pending is not None and not sender.full():
+			sender.push(pending)
+			pending = next(payloads, None)
+		while True:
+			frame = sender.link.recv()
+			if frame is None:
+				break
+			sender.on_frame(frame)
+		sender.poll()
+		if timeout is not None and time.monotonic() - start > timeout:
+			raise TimeoutError('FFCP stream not acked')
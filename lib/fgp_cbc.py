@@ -0,0 +1,72 @@
+import aes_hdl
+import eth
+import ffcp
+
+# FGP payloads encrypted the way the transmitting FPGA does it (see the AES
+# section of hdl/main.v): the offset byte is split off in the clear, and
+# the 768 data bytes (exactly 48 blocks, so never padded) go through
+# aes_combined_bytes_buf with key KEY[127:8] | SW[15:8]
+# the CBC chain is not restarted per packet: aes_encr_rst is only asserted
+# when ffcp_tx_server starts a SYN, and the receiver's aes_decr_rst when
+# ffcp_rx_server receives one, so every other packet continues from the
+# last block of the one before it (including resent packets, which are
+# encrypted again)
+
+class FgpCbc:
+	def __init__(self, swkey=0, cbc_enable=True, decr_select=False):
+		self.chain = aes_hdl.Chain(aes_hdl.fpga_key(swkey), cbc_enable,
+			decr_select)
+		self.payloads = 0
+		self.resets = 0
+
+	def stats(self):
+		return {
+			'payloads': self.payloads,
+			'resets': self.resets,
+		}
+
+	def reset(self):
+		self.chain.reset()
+		self.resets += 1
+
+	def process(self, payload):
+		assert(len(payload) == eth.FGP_LEN)
+		self.payloads += 1
+		return (bytes(payload[:eth.FGP_OFFSET_LEN]) +
+			self.chain.process(payload[eth.FGP_OFFSET_LEN:]))
+
+	# takes an FFCP payload (metadata byte and FGP payload), and replays
+	# the reset of the AES instance when it is a SYN
+	def process_ffcp(self, payload):
+		ffcp_type, _ = ffcp.parse_metadata(payload[0])
+		if ffcp_type == eth.FFCP_TYPE_ACK:
+			return bytes(payload)
+		if ffcp_type == eth.FFCP_TYPE_SYN:
+			self.reset()
+		end = eth.FFCP_LEN
+		return (bytes(payload[:eth.FFCP_METADATA_LEN]) +
+			self.process(payload[eth.FFCP_METADATA_LEN:end]) +
+			bytes(payload[end:]))
+
+# pipeline stages: FGP payloads (as from eth.gen_eth_fgp_payload) as one
+# stream from reset, or FFCP payloads in the order they are sent, with
+# resets wherever a SYN is sent
+def encrypt_fgp(payloads, swkey=0, cbc_enable=True):
+	fgp_cbc = FgpCbc(swkey, cbc_enable)
+	for payload in payloads:
+		yield fgp_cbc.process(payload)
+
+def encrypt_ffcp(payloads, swkey=0, cbc_enable=True):
+	fgp_cbc = FgpCbc(swkey, cbc_enable)
+	for payload in payloads:
+		yield fgp_cbc.process_ffcp(payload)
+
+def decrypt_fgp(payloads, swkey=0, cbc_enable=True):
+	fgp_cbc = FgpCbc(swkey, cbc_enable, True)
+	for payload in payloads:
+		yield fgp_cbc.process(payload)
+
+def decrypt_ffcp(payloads, swkey=0, cbc_enable=True):
+	fgp_cbc = FgpCbc(swkey, cbc_enable, True)
+	for payload in payloads:
+		yield fgp_cbc.process_ffcp(payload)
@@ -0,0 +1,180 @@
+import os
+import struct
+import threading
+import numpy as np
+import aes_fast
+import aes_np
+import eth
+
+# CTR encryption of FGP payloads, as an alternative to the CBC chain of
+# aes_combined: the 768 data bytes (exactly 48 blocks) are xored with the
+# keystream for
+#   nonce (8 bytes) | frame (4 bytes) | FGP offset (2 bytes) | block (2 bytes)
+# so the keystream of any packet can be computed before its data is known,
+# and independently of every other packet
+# the receiver needs the whole counter, so the encrypted payload carries it
+# in the clear: [ offset (1) | nonce (8) | frame (4) | data (768) ]
+# which makes every encrypted payload CTR_PAYLOAD_LEN (781) bytes instead
+# of eth.FGP_LEN (769), so it doesn't fit the paths sized for plain FGP
+# payloads (FgpTemplate, FFCP, the 'fgp' records of serial_rx)
+# every packet is self-describing, so lost packets or whole lost frames
+# don't desynchronize the receiver
+# a keystream is never reused as long as the nonce is fresh for the key
+# (random per FgpCtr by default) and fewer than 2^32 frames are sent with
+# it (over 11 years at 12 fps)
+
+NONCE_LEN = 8
+COUNTER_STRUCT = struct.Struct('>8sIHH')
+HEADER_STRUCT = struct.Struct('>8sI')
+HEADER_LEN = HEADER_STRUCT.size
+DATA_OFF = eth.FGP_OFFSET_LEN + HEADER_LEN
+CTR_PAYLOAD_LEN = eth.FGP_LEN + HEADER_LEN
+DATA_BLOCKS = eth.FGP_DATA_LEN // aes_fast.BLOCK_LEN
+FRAME_MASK = 0xffffffff
+# number of FGP blocks in a 128x128 frame
+FRAME_BLOCKS = 128 * 128 // eth.FGP_BLOCK_COLORS
+DEFAULT_LOOKAHEAD = 2
+
+def counter_block(nonce, frame, offset, block=0):
+	return COUNTER_STRUCT.pack(nonce, frame & FRAME_MASK, offset, block)
+
+# keystreams for whole frames are computed by a background thread, up to
+# lookahead frames past the last one requested, so encrypting a payload is
+# a single xor; keystream for packets outside the cache is computed on the
+# spot
+# the sender picks the nonce (random if not given) and the frame; the
+# receiver takes both from the packets it gets
+class FgpCtr:
+	def __init__(self, key, nonce=None, lookahead=DEFAULT_LOOKAHEAD,
+		frame_blocks=FRAME_BLOCKS, threaded=True):
+		if nonce is None:
+			nonce = os.urandom(NONCE_LEN)
+		assert(len(nonce) == NONCE_LEN)
+		self.cipher = aes_np.BatchCipher(key)
+		self.nonce = bytes(nonce)
+		self.lookahead = lookahead
+		self.frame_blocks = frame_blocks
+		# frame -> (frame_blocks, FGP_DATA_LEN) uint8 keystream
+		self.cache = {}
+		self.curr_frame = 0
+		self.hits = 0
+		self.misses = 0
+		self.precomputed = 0
+		self.cond = threading.Condition()
+		self.stopped = False
+		self.thread = None
+		if threaded:
+			self.thread = threading.Thread(target=self.run, daemon=True)
+			self.thread.start()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def close(self):
+		with self.cond:
+			self.stopped = True
+			self.cond.notify()
+		if self.thread is not None:
+			self.thread.join()
+
+	def stats(self):
+		with self.cond:
+			return {
+				'hits': self.hits,
+				'misses': self.misses,
+				'precomputed': self.precomputed,
+				'cached_frames': len(self.cache),
+			}
+
+	def counter_blocks(self, nonce, frame, offsets):
+		counters = np.empty((len(offsets), DATA_BLOCKS, 16), dtype=np.uint8)
+		for i, offset in enumerate(offsets):
+			counters[i] = np.frombuffer(b''.join(
+				counter_block(nonce, frame, offset, block)
+				for block in range(DATA_BLOCKS)), dtype=np.uint8).reshape(-1, 16)
+		return counters.reshape(-1, 16)
+
+	def frame_keystream(self, nonce, frame):
+		offsets = range(self.frame_blocks)
+		return self.cipher.encrypt_ecb(
+			self.counter_blocks(nonce, frame, offsets)).reshape(
+				self.frame_blocks, eth.FGP_DATA_LEN)
+
+	def next_missing(self):
+		for frame in range(self.curr_frame,
+			self.curr_frame + self.lookahead + 1):
+			if (frame & FRAME_MASK) not in self.cache:
+				return frame & FRAME_MASK
+		return None
+
+	def run(self):
+		while True:
+			with self.cond:
+				while not self.stopped and self.next_missing() is None:
+					self.cond.wait()
+				if self.stopped:
+					return
+				frame = self.next_missing()
+				nonce = self.nonce
+			keystream = self.frame_keystream(nonce, frame)
+			with self.cond:
+				# drop it if the nonce changed in the meantime
+				if nonce == self.nonce:
+					self.cache[frame] = keystream
+					self.precomputed += 1
+
+	# marks frame as the current one, dropping older keystreams and
+	# letting the worker move ahead
+	def set_frame(self, frame):
+		with self.cond:
+			self.curr_frame = frame
+			for old in [f for f in self.cache
+				if (f - frame) & FRAME_MASK > self.lookahead]:
+				del self.cache[old]
+			self.cond.notify()
+
+	# switches to another nonce, dropping every cached keystream
+	def set_nonce(self, nonce):
+		assert(len(nonce) == NONCE_LEN)
+		with self.cond:
+			self.nonce = bytes(nonce)
+			self.cache.clear()
+			self.cond.notify()
+
+	def keystream(self, frame, offset):
+		frame &= FRAME_MASK
+		with self.cond:
+			keystream = self.cache.get(frame)
+			nonce = self.nonce
+			if keystream is not None and offset < self.frame_blocks:
+				self.hits += 1
+				return keystream[offset]
+			self.misses += 1
+		return self.cipher.encrypt_ecb(
+			self.counter_blocks(nonce, frame, [offset])).reshape(-1)
+
+	# takes an FGP payload, and returns it with the counter header
+	def encrypt(self, frame, payload):
+		assert(len(payload) == eth.FGP_LEN)
+		payload = np.frombuffer(payload, dtype=np.uint8)
+		data = payload[eth.FGP_OFFSET_LEN:] ^ self.keystream(frame, payload[0])
+		return (payload[:eth.FGP_OFFSET_LEN].tobytes() +
+			HEADER_STRUCT.pack(self.nonce, frame & FRAME_MASK) +
+			data.tobytes())
+
+	# takes an encrypted payload, and returns the FGP payload; the counter
+	# comes only from the header, and the cache follows the newest frame
+	def decrypt(self, payload):
+		assert(len(payload) == CTR_PAYLOAD_LEN)
+		nonce, frame = HEADER_STRUCT.unpack_from(payload, eth.FGP_OFFSET_LEN)
+		if nonce != self.nonce:
+			self.set_nonce(nonce)
+			self.set_frame(frame)
+		elif 0 < (frame - self.curr_frame) & FRAME_MASK <= FRAME_MASK >> 1:
+			self.set_frame(frame)
+		data = np.frombuffer(payload, dtype=np.uint8, offset=DATA_OFF)
+		return (bytes(payload[:eth.FGP_OFFSET_LEN]) +
+			(data ^ self.keystream(frame, payload[0])).tobytes())
@@ -0,0 +1,50 @@
+# resend every block at least this often (in frames), so blocks lost on
+# the link are eventually repaired
+DEFAULT_REFRESH_PERIOD = 24
+
+# only transmits the FGP blocks that changed since they were last sent
+# frames are lists of FGP payloads (see frame_cache.FrameCache), indexed
+# by their FGP offset byte
+class DeltaEncoder:
+	def __init__(self, refresh_period=DEFAULT_REFRESH_PERIOD):
+		self.refresh_period = refresh_period
+		self.last_sent = {}
+		self.frame_cnt = 0
+		self.blocks_sent = 0
+		self.blocks_skipped = 0
+		self.bytes_sent = 0
+		self.bytes_skipped = 0
+
+	def stats(self):
+		return {
+			'frames': self.frame_cnt,
+			'blocks_sent': self.blocks_sent,
+			'blocks_skipped': self.blocks_skipped,
+			'bytes_sent': self.bytes_sent,
+			'bytes_skipped': self.bytes_skipped,
+		}
+
+	def reset(self):
+		self.last_sent = {}
+
+	# returns the payloads of frame that need to be sent
+	def changed(self, payloads):
+		refresh = (self.refresh_period and
+			self.frame_cnt % self.refresh_period == 0)
+		self.frame_cnt += 1
+		res = []
+		for payload in payloads:
+			offset = payload[0]
+			last = self.last_sent.get(offset)
+			# cached payloads are usually the same object, so check
+			# identity before comparing contents
+			if (not refresh and last is not None and
+				(last is payload or last == payload)):
+				self.blocks_skipped += 1
+				self.bytes_skipped += len(payload)
+				continue
+			self.last_sent[offset] = payload
+			self.blocks_sent += 1
+			self.bytes_sent += len(payload)
+			res.append(payload)
+		return res
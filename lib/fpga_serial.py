@@ -2,6 +2,10 @@
 jodalyst 9/2017
 '''
 
+import queue
+import threading
+import time
+import serial
 import serial.tools.list_ports
 
 def get_usb_port():
@@ -45,3 +49,188 @@ def do_serial(callback):
 			print(ser.name + ' is open...')
 
 		callback(ser)
+
+# about 32 FGP payloads per buffer
+DEFAULT_BUFFER_SIZE = 1 << 15
+DEFAULT_NUM_BUFFERS = 2
+# bytes per ser.write call; CTS is checked between writes
+DEFAULT_WRITE_SIZE = 4096
+CTS_POLL_INTERVAL = 0.0005
+# how long the writer waits for the FPGA to raise CTS before failing with
+# SerialTimeoutException; None waits until close()
+DEFAULT_CTS_TIMEOUT = 5.0
+
+# writes to a serial port from a background thread, so the next frame can
+# be encoded while the current one drains over the UART
+# write() copies data into preallocated buffers, and full buffers are
+# handed to the writer thread; with the default of two buffers one is
+# filled while the other is written. write() blocks when all buffers are
+# waiting to be written, which keeps the producer from getting ahead of the
+# link
+# errors in the writer (including a CTS timeout) are raised by the next
+# write(), submit(), drain() or close(); buffers queued after an error are
+# dropped
+# close() stops the writer from waiting for CTS, so anything still held back
+# by flow control is dropped; call drain() first to write everything
+class SerialStreamer:
+	def __init__(self, ser, buffer_size=DEFAULT_BUFFER_SIZE,
+		num_buffers=DEFAULT_NUM_BUFFERS, write_size=DEFAULT_WRITE_SIZE,
+		cts_timeout=DEFAULT_CTS_TIMEOUT):
+		self.ser = ser
+		self.buffer_size = buffer_size
+		self.write_size = write_size
+		self.cts_timeout = cts_timeout
+		self.stopped = threading.Event()
+		# only check CTS when the port does hardware flow control, and
+		# give up if the port can't report it (e.g. a pty)
+		self.check_cts = getattr(ser, 'rtscts', False)
+		self.free = queue.Queue()
+		for _ in range(num_buffers):
+			self.free.put(bytearray(buffer_size))
+		# (buffer, length), or None to stop the writer
+		self.pending = queue.Queue()
+		self.curr = None
+		self.curr_len = 0
+		self.error = None
+		self.start_time = time.monotonic()
+		self.bytes_queued = 0
+		self.bytes_written = 0
+		self.writes = 0
+		self.buffers_written = 0
+		self.cts_blocked = 0.0
+		self.cts_stalls = 0
+		self.producer_blocked = 0.0
+		self.max_depth = 0
+		self.thread = threading.Thread(target=self.run, daemon=True)
+		self.thread.start()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def raise_error(self):
+		if self.error is not None:
+			raise self.error
+
+	def get_buffer(self):
+		self.raise_error()
+		try:
+			self.curr = self.free.get_nowait()
+		except queue.Empty:
+			start = time.monotonic()
+			while True:
+				try:
+					self.curr = self.free.get(timeout=0.1)
+					break
+				except queue.Empty:
+					self.raise_error()
+			self.producer_blocked += time.monotonic() - start
+		self.curr_len = 0
+
+	def write(self, data):
+		data = memoryview(data).cast('B')
+		self.bytes_queued += len(data)
+		while len(data):
+			if self.curr is None:
+				self.get_buffer()
+			n = min(len(data), self.buffer_size - self.curr_len)
+			self.curr[self.curr_len:self.curr_len+n] = data[:n]
+			self.curr_len += n
+			data = data[n:]
+			if self.curr_len == self.buffer_size:
+				self.submit()
+
+	# hands the partially filled buffer to the writer, e.g. at the end of
+	# a frame
+	def submit(self):
+		self.raise_error()
+		if self.curr is None or self.curr_len == 0:
+			return
+		self.pending.put((self.curr, self.curr_len))
+		self.max_depth = max(self.max_depth, self.pending.qsize())
+		self.curr = None
+
+	# waits until everything written so far has left the serial port
+	def drain(self):
+		self.submit()
+		self.pending.join()
+		self.raise_error()
+		self.ser.flush()
+
+	def close(self):
+		if self.thread.is_alive():
+			try:
+				self.submit()
+			finally:
+				self.pending.put(None)
+				self.stopped.set()
+				self.thread.join()
+		self.raise_error()
+
+	def wait_cts(self):
+		try:
+			if self.ser.cts:
+				return
+		except (serial.SerialException, OSError):
+			self.check_cts = False
+			return
+		start = time.monotonic()
+		self.cts_stalls += 1
+		try:
+			while not self.ser.cts:
+				if self.stopped.is_set():
+					raise serial.SerialTimeoutException(
+						'closed while waiting for CTS')
+				if (self.cts_timeout is not None and
+					time.monotonic() - start >= self.cts_timeout):
+					raise serial.SerialTimeoutException(
+						'CTS not raised within %g s' % self.cts_timeout)
+				self.stopped.wait(CTS_POLL_INTERVAL)
+		finally:
+			self.cts_blocked += time.monotonic() - start
+
+	def write_buffer(self, buf, length):
+		with memoryview(buf)[:length] as view:
+			off = 0
+			while off < length:
+				if self.check_cts:
+					self.wait_cts()
+				chunk = view[off:off+self.write_size]
+				self.ser.write(chunk)
+				off += len(chunk)
+				self.writes += 1
+		self.bytes_written += length
+		self.buffers_written += 1
+
+	def run(self):
+		while True:
+			item = self.pending.get()
+			try:
+				if item is None:
+					return
+				buf, length = item
+				try:
+					if self.error is None:
+						self.write_buffer(buf, length)
+				except Exception as e:
+					self.error = e
+				# the buffer goes back to the pool even if it wasn't written
+				self.free.put(buf)
+			finally:
+				self.pending.task_done()
+
+	def stats(self):
+		elapsed = max(time.monotonic() - self.start_time, 1e-9)
+		return {
+			'bytes_written': self.bytes_written,
+			'bytes_per_sec': self.bytes_written / elapsed,
+			'writes': self.writes,
+			'buffers_written': self.buffers_written,
+			'queue_depth': self.pending.qsize(),
+			'max_queue_depth': self.max_depth,
+			'cts_blocked': self.cts_blocked,
+			'cts_stalls': self.cts_stalls,
+			'producer_blocked': self.producer_blocked,
+		}
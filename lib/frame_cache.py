@@ -0,0 +1,57 @@
+import collections
+import os
+import eth
+import image_bytes
+
+# default budget: ~100 128x128 frames worth of FGP payloads
+DEFAULT_MAX_BYTES = 100 * 32 * eth.FGP_LEN
+
+# LRU cache of images encoded as FGP payloads (the output of
+# eth.gen_eth_fgp_payload for each block of FGP_BLOCK_COLORS colors),
+# keyed by (path, mtime, width, height) so modified files are re-encoded
+class FrameCache:
+	def __init__(self, width, height, max_bytes=DEFAULT_MAX_BYTES):
+		self.width = width
+		self.height = height
+		self.max_bytes = max_bytes
+		self.entries = collections.OrderedDict()
+		self.curr_bytes = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+
+	def stats(self):
+		return {
+			'hits': self.hits,
+			'misses': self.misses,
+			'evictions': self.evictions,
+			'entries': len(self.entries),
+			'bytes': self.curr_bytes,
+		}
+
+	def encode(self, path):
+		colors = image_bytes.image_to_colors_fast(path,
+			self.width, self.height)
+		block = eth.FGP_BLOCK_COLORS
+		return [eth.gen_eth_fgp_payload(i*block, colors[i*block:(i+1)*block])
+			for i in range(len(colors)//block)]
+
+	def get(self, path):
+		key = (path, os.stat(path).st_mtime_ns, self.width, self.height)
+		payloads = self.entries.get(key)
+		if payloads is not None:
+			self.hits += 1
+			self.entries.move_to_end(key)
+			return payloads
+		self.misses += 1
+		payloads = self.encode(path)
+		size = sum(len(p) for p in payloads)
+		# an entry larger than the whole budget is returned uncached
+		if size <= self.max_bytes:
+			while self.curr_bytes + size > self.max_bytes:
+				_, evicted = self.entries.popitem(last=False)
+				self.curr_bytes -= sum(len(p) for p in evicted)
+				self.evictions += 1
+			self.entries[key] = payloads
+			self.curr_bytes += size
+		return payloads
@@ -0,0 +1,55 @@
+# arithmetic in GF(2^8) modulo the AES polynomial x^8 + x^4 + x^3 + x + 1
+# (FIPS-197 section 4.2)
+# multiplication goes through log/antilog tables with generator 3; the
+# MixColumns constants also get a 256-entry table each
+
+POLY = 0x11b
+GENERATOR = 3
+ORDER = 255
+
+def xtime(a):
+	a <<= 1
+	return a ^ POLY if a & 0x100 else a
+
+# shift and add, one bit of b at a time; only used to build the tables
+def mul_bits(a, b):
+	p = 0
+	while b:
+		if b & 1:
+			p ^= a
+		a = xtime(a)
+		b >>= 1
+	return p
+
+# EXP is doubled, so EXP[LOG[a] + LOG[b]] needs no reduction mod 255
+EXP = [1] * (2 * ORDER)
+for i in range(1, 2 * ORDER):
+	EXP[i] = mul_bits(EXP[i-1], GENERATOR)
+LOG = [0] * 256
+for i in range(ORDER):
+	LOG[EXP[i]] = i
+
+def mul(a, b):
+	if a == 0 or b == 0:
+		return 0
+	return EXP[LOG[a] + LOG[b]]
+
+def inverse(a):
+	if a == 0:
+		raise ZeroDivisionError('0 has no inverse in GF(2^8)')
+	return EXP[ORDER - LOG[a]]
+
+def mul_table(c):
+	return tuple(mul(c, x) for x in range(256))
+
+# MixColumns uses (2, 3, 1, 1) and InvMixColumns (14, 11, 13, 9)
+MIX_CONSTANTS = (2, 3, 9, 11, 13, 14)
+MUL = {c: mul_table(c) for c in MIX_CONSTANTS}
+MUL2, MUL3, MUL9, MUL11, MUL13, MUL14 = [MUL[c] for c in MIX_CONSTANTS]
+
+# multiplying by a constant is linear over GF(2): bit t of mul(c, x) is
+# the parity of x & mul_matrix(c)[t]
+def mul_matrix(c):
+	cols = [mul(c, 1 << k) for k in range(8)]
+	return [sum(1 << k for k in range(8) if cols[k] >> t & 1)
+		for t in range(8)]
@@ -1,3 +1,4 @@
+import numpy as np
 from PIL import Image
 
 def colors_to_bytes(arr):
@@ -11,6 +12,52 @@ def colors_to_bytes(arr):
 		]
 	return bytes(res)
 
+# vectorized colors_to_bytes, writing two 12-bit colors into every 3 bytes
+# of out (a uint8 array of shape (len(colors)//2, 3))
+def pack_colors_np(colors, out):
+	pairs = np.asarray(colors, dtype=np.uint16).reshape(-1, 2)
+	col1 = pairs[:, 0]
+	col2 = pairs[:, 1]
+	out[:, 0] = col1 >> 4
+	out[:, 1] = ((col1 & 0xf) << 4) | (col2 >> 8)
+	out[:, 2] = col2 & 0xff
+	return out
+
+def colors_to_bytes_fast(colors):
+	out = np.empty((len(colors)//2, 3), dtype=np.uint8)
+	return pack_colors_np(colors, out).tobytes()
+
+# same packing as colors_to_bytes, but written in place into buf
+def pack_colors_into(buf, colors):
+	out = np.frombuffer(buf, dtype=np.uint8)[:len(colors)//2*3]
+	pack_colors_np(colors, out.reshape(-1, 3))
+
+# pack_colors_into for a fixed buf and number of colors, keeping the
+# intermediate arrays so that pack() allocates no numpy arrays when colors
+# is already a numpy array (a list is still converted on every call)
+class ColorPacker:
+	def __init__(self, buf, num_colors):
+		self.colors = np.empty(num_colors, dtype=np.uint16)
+		self.tmp = np.empty(num_colors//2, dtype=np.uint16)
+		self.tmp2 = np.empty(num_colors//2, dtype=np.uint16)
+		pairs = self.colors.reshape(-1, 2)
+		self.col1 = pairs[:, 0]
+		self.col2 = pairs[:, 1]
+		out = np.frombuffer(buf, dtype=np.uint8)[:num_colors//2*3]
+		out = out.reshape(-1, 3)
+		self.out = out[:, 0], out[:, 1], out[:, 2]
+
+	def pack(self, colors):
+		np.copyto(self.colors, colors, casting='unsafe')
+		col1, col2, tmp, tmp2 = self.col1, self.col2, self.tmp, self.tmp2
+		out0, out1, out2 = self.out
+		np.right_shift(col1, 4, out=out0, casting='unsafe')
+		np.bitwise_and(col1, 0xf, out=tmp)
+		np.left_shift(tmp, 4, out=tmp)
+		np.right_shift(col2, 8, out=tmp2)
+		np.bitwise_or(tmp, tmp2, out=out1, casting='unsafe')
+		np.bitwise_and(col2, 0xff, out=out2, casting='unsafe')
+
 def image_to_colors(fin_name, width, height):
 	im = Image.open(fin_name).convert('RGB')
 	im = im.resize((width, height))
@@ -25,5 +72,18 @@ def image_to_colors(fin_name, width, height):
 	im.close()
 	return colors
 
+# vectorized image_to_colors, returns a uint16 array in row-major order
+def rgb_to_colors(rgb):
+	rgb = np.asarray(rgb, dtype=np.uint8) >> 4
+	colors = rgb[..., 0].astype(np.uint16) << 8
+	colors |= rgb[..., 1].astype(np.uint16) << 4
+	colors |= rgb[..., 2]
+	return colors.reshape(-1)
+
+def image_to_colors_fast(fin_name, width, height):
+	with Image.open(fin_name) as im:
+		im = im.convert('RGB').resize((width, height))
+		return rgb_to_colors(np.asarray(im))
+
 def image_to_bytestream(fin_name, width, height):
-	return colors_to_bytes(image_to_colors(fin_name, width, height))
+	return colors_to_bytes_fast(image_to_colors_fast(fin_name, width, height))
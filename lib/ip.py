@@ -1,3 +1,6 @@
+import struct
+import sys
+
 IP_VERSION_4 = 4
 IP_HEADER_LEN_DEFAULT = 5
 IP_FLAGS_DF = 0x40
@@ -22,6 +25,64 @@ def ipv4_checksum(header):
 	checksum = (curr_sum >> 16) + (curr_sum & 0xffff)
 	return (~checksum) & 0xffff
 
+# ones' complement sum of the 16-bit big-endian words in data, computed
+# word-wise (RFC 1071): the sum of native-order 64-bit words folded down to
+# 16 bits is the same sum, just byte-swapped on little-endian machines
+def ones_complement_sum(data):
+	data = memoryview(data).cast('B')
+	rem = len(data) % 8
+	curr_sum = sum(data[:len(data)-rem].cast('Q'))
+	if rem:
+		curr_sum += sum(memoryview(
+			bytes(data[len(data)-rem:]) + bytes(8 - rem)).cast('Q'))
+	while curr_sum >> 16:
+		curr_sum = (curr_sum >> 16) + (curr_sum & 0xffff)
+	if sys.byteorder == 'little':
+		curr_sum = ((curr_sum & 0xff) << 8) | (curr_sum >> 8)
+	return curr_sum
+
+def fast_checksum(data):
+	return (~ones_complement_sum(data)) & 0xffff
+
+# incremental update of a checksum after a 16-bit word changes from
+# old_word to new_word, following eqn. 3 of RFC 1624:
+# HC' = ~(~HC + ~m + m')
+def checksum_update(checksum, old_word, new_word):
+	curr_sum = (~checksum & 0xffff) + (~old_word & 0xffff) + new_word
+	while curr_sum >> 16:
+		curr_sum = (curr_sum >> 16) + (curr_sum & 0xffff)
+	return (~curr_sum) & 0xffff
+
+IP_CHECKSUM_OFF = 10
+IP_ID_OFF = 4
+IP_TOTAL_LEN_OFF = 2
+IP_TTL_OFF = 8
+
+# overwrite the field at offset off in header (a bytearray) with value,
+# adjusting the checksum at checksum_off instead of recomputing it
+def update_field(header, off, value, checksum_off=IP_CHECKSUM_OFF):
+	# work on the 16-bit words containing the field
+	start = off & ~1
+	end = (off + len(value) + 1) & ~1
+	old_words = bytes(header[start:end])
+	header[off:off+len(value)] = value
+	checksum = (header[checksum_off] << 8) | header[checksum_off+1]
+	for i in range(0, end - start, 2):
+		checksum = checksum_update(checksum,
+			(old_words[i] << 8) | old_words[i+1],
+			(header[start+i] << 8) | header[start+i+1])
+	header[checksum_off] = checksum >> 8
+	header[checksum_off+1] = checksum & 0xff
+
+def ip_set_total_len(header, total_len):
+	update_field(header, IP_TOTAL_LEN_OFF, total_len.to_bytes(2, 'big'))
+
+def ip_set_id(header, ident):
+	update_field(header, IP_ID_OFF, ident.to_bytes(2, 'big'))
+
+def ip_set_ttl(header, ttl):
+	update_field(header, IP_TTL_OFF, bytes([ttl]))
+
 def gen_ip(protocol, ip_src, ip_dst, payload):
 	header_len = 20
 	total_len = header_len + len(payload)
@@ -39,7 +100,7 @@ def gen_ip(protocol, ip_src, ip_dst, payload):
 		0,
 		0 # set checksum to 0 for calculation
 		] + list(ip_src + ip_dst)
-	checksum = ipv4_checksum(bytes(header))
+	checksum = fast_checksum(bytes(header))
 	header[10] = checksum >> 8
 	header[11] = checksum & 0xff
 	return bytes(header) + payload
@@ -56,7 +117,7 @@ def gen_ip_udp(ip_src, ip_dst, port_src, port_dst, payload):
 		0,
 		0 # set checksum to 0 for calculation
 	]
-	checksum = ipv4_checksum(ip_src + ip_dst + bytes([
+	checksum = fast_checksum(ip_src + ip_dst + bytes([
 		0, IP_PROT_UDP, total_len >> 8, total_len & 0xff
 	]) + bytes(header) + payload)
 	header[6] = checksum >> 8
@@ -75,3 +136,104 @@ def ip_get_dst_addr(packet):
 
 def udp_get_dst_port(packet):
 	return (packet[2] << 8) | packet[3]
+
+U16 = struct.Struct('!H')
+
+# zero-copy views over received packets, in the same style as eth.EthView
+# buf is the memoryview of the whole frame and off the offset of the header
+class IPv4View:
+	__slots__ = ('buf', 'off')
+
+	def __init__(self, buf, off=0):
+		self.reset(buf, off)
+
+	def reset(self, buf, off=0):
+		self.buf = buf if isinstance(buf, memoryview) else memoryview(buf)
+		self.off = off
+		return self
+
+	@property
+	def version(self):
+		return self.buf[self.off] >> 4
+
+	# header length in bytes, from the IHL field
+	@property
+	def header_len(self):
+		return (self.buf[self.off] & 0xf) * 4
+
+	@property
+	def total_len(self):
+		return U16.unpack_from(self.buf, self.off+IP_TOTAL_LEN_OFF)[0]
+
+	@property
+	def ident(self):
+		return U16.unpack_from(self.buf, self.off+IP_ID_OFF)[0]
+
+	@property
+	def ttl(self):
+		return self.buf[self.off+IP_TTL_OFF]
+
+	@property
+	def protocol(self):
+		return self.buf[self.off+9]
+
+	@property
+	def checksum(self):
+		return U16.unpack_from(self.buf, self.off+IP_CHECKSUM_OFF)[0]
+
+	@property
+	def src(self):
+		return self.buf[self.off+12:self.off+16]
+
+	@property
+	def dst(self):
+		return self.buf[self.off+16:self.off+20]
+
+	def checksum_ok(self):
+		return ones_complement_sum(
+			self.buf[self.off:self.off+self.header_len]) == 0xffff
+
+	@property
+	def payload_off(self):
+		return self.off + self.header_len
+
+	@property
+	def payload(self):
+		return self.buf[self.payload_off:self.off+self.total_len]
+
+UDP_HEADER_STRUCT = struct.Struct('!4H')
+
+class UDPView:
+	__slots__ = ('buf', 'off')
+
+	def __init__(self, buf, off=0):
+		self.reset(buf, off)
+
+	def reset(self, buf, off=0):
+		self.buf = buf if isinstance(buf, memoryview) else memoryview(buf)
+		self.off = off
+		return self
+
+	# (src port, dst port, length, checksum)
+	def header(self):
+		return UDP_HEADER_STRUCT.unpack_from(self.buf, self.off)
+
+	@property
+	def src_port(self):
+		return U16.unpack_from(self.buf, self.off)[0]
+
+	@property
+	def dst_port(self):
+		return U16.unpack_from(self.buf, self.off+2)[0]
+
+	@property
+	def length(self):
+		return U16.unpack_from(self.buf, self.off+4)[0]
+
+	@property
+	def payload_off(self):
+		return self.off + UDP_HEADER_LEN
+
+	@property
+	def payload(self):
+		return self.buf[self.payload_off:self.off+self.length]
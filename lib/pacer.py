@@ -0,0 +1,99 @@
+import math
+import time
+
+# sleeping is only accurate to ~0.1ms, so sleep until this long before the
+# deadline and spin for the rest
+DEFAULT_SPIN_NS = 200000
+# enough for one full size ethernet frame
+DEFAULT_BURST_BYTES = 1518
+
+# token bucket rate limiter for transmission, in bytes/s and/or frames/s
+# (either may be None for no limit); the buckets hold at most burst_bytes
+# and burst_frames (None for no cap), which bounds how far ahead of the
+# target rate a sender can get after being idle
+class Pacer:
+	def __init__(self, bytes_per_sec=None, frames_per_sec=None,
+		burst_bytes=DEFAULT_BURST_BYTES, burst_frames=1,
+		spin_ns=DEFAULT_SPIN_NS):
+		self.bytes_per_sec = bytes_per_sec
+		self.frames_per_sec = frames_per_sec
+		self.burst_bytes = burst_bytes
+		self.burst_frames = burst_frames
+		self.spin_ns = spin_ns
+		self.reset()
+
+	def reset(self):
+		now = time.perf_counter_ns()
+		self.start = now
+		self.last_refill = now
+		self.byte_tokens = self.burst_bytes or 0
+		self.frame_tokens = self.burst_frames or 0
+		self.total_bytes = 0
+		self.total_frames = 0
+		# lateness of each release relative to when tokens became
+		# available, for jitter reporting
+		self.late_sum = 0
+		self.late_sq_sum = 0
+		self.late_max = 0
+
+	def refill(self, now):
+		elapsed = now - self.last_refill
+		self.last_refill = now
+		if self.bytes_per_sec:
+			self.byte_tokens += elapsed * self.bytes_per_sec / 1e9
+			if self.burst_bytes is not None:
+				self.byte_tokens = min(self.byte_tokens, self.burst_bytes)
+		if self.frames_per_sec:
+			self.frame_tokens += elapsed * self.frames_per_sec / 1e9
+			if self.burst_frames is not None:
+				self.frame_tokens = min(self.frame_tokens, self.burst_frames)
+
+	# ns until a frame of nbytes can be sent
+	def delay_ns(self, nbytes):
+		delay = 0
+		if self.bytes_per_sec and self.byte_tokens < nbytes:
+			delay = (nbytes - self.byte_tokens) * 1e9 / self.bytes_per_sec
+		if self.frames_per_sec and self.frame_tokens < 1:
+			delay = max(delay,
+				(1 - self.frame_tokens) * 1e9 / self.frames_per_sec)
+		return int(math.ceil(delay))
+
+	# blocks until a frame of nbytes may be sent, then consumes its tokens
+	def wait(self, nbytes=0):
+		now = time.perf_counter_ns()
+		self.refill(now)
+		delay = self.delay_ns(nbytes)
+		if delay > 0:
+			deadline = now + delay
+			if delay > self.spin_ns:
+				time.sleep((delay - self.spin_ns) / 1e9)
+			while True:
+				now = time.perf_counter_ns()
+				if now >= deadline:
+					break
+			late = now - deadline
+			self.late_sum += late
+			self.late_sq_sum += late * late
+			self.late_max = max(self.late_max, late)
+			self.refill(now)
+		if self.bytes_per_sec:
+			self.byte_tokens -= nbytes
+		if self.frames_per_sec:
+			self.frame_tokens -= 1
+		self.total_bytes += nbytes
+		self.total_frames += 1
+
+	def report(self):
+		elapsed = (time.perf_counter_ns() - self.start) / 1e9
+		n = max(self.total_frames, 1)
+		late_mean = self.late_sum / n
+		late_std = math.sqrt(max(self.late_sq_sum / n - late_mean ** 2, 0))
+		return {
+			'bytes_per_sec': self.total_bytes / elapsed if elapsed else 0,
+			'target_bytes_per_sec': self.bytes_per_sec,
+			'frames_per_sec': self.total_frames / elapsed if elapsed else 0,
+			'target_frames_per_sec': self.frames_per_sec,
+			'jitter_mean_us': late_mean / 1e3,
+			'jitter_std_us': late_std / 1e3,
+			'jitter_max_us': self.late_max / 1e3,
+		}
@@ -0,0 +1,318 @@
+import ctypes
+import ctypes.util
+import errno
+import mmap
+import os
+import select
+import socket
+import struct
+
+DEFAULT_INTERFACE = os.environ.get('ETH_INTERFACE', 'enp2s0')
+# large enough to hold a full frame of every FGP block of an image
+DEFAULT_SNDBUF = 1 << 21
+# maximum number of messages passed to a single sendmmsg call
+MAX_BATCH = 64
+
+class iovec(ctypes.Structure):
+	_fields_ = [
+		('iov_base', ctypes.c_void_p),
+		('iov_len', ctypes.c_size_t)]
+
+class msghdr(ctypes.Structure):
+	_fields_ = [
+		('msg_name', ctypes.c_void_p),
+		('msg_namelen', ctypes.c_uint32),
+		('msg_iov', ctypes.POINTER(iovec)),
+		('msg_iovlen', ctypes.c_size_t),
+		('msg_control', ctypes.c_void_p),
+		('msg_controllen', ctypes.c_size_t),
+		('msg_flags', ctypes.c_int)]
+
+class mmsghdr(ctypes.Structure):
+	_fields_ = [
+		('msg_hdr', msghdr),
+		('msg_len', ctypes.c_uint)]
+
+def _load_sendmmsg():
+	try:
+		libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+		fn = libc.sendmmsg
+	except (OSError, AttributeError, TypeError):
+		return None
+	fn.argtypes = [ctypes.c_int, ctypes.POINTER(mmsghdr),
+		ctypes.c_uint, ctypes.c_int]
+	fn.restype = ctypes.c_int
+	return fn
+
+_sendmmsg = _load_sendmmsg()
+
+# returns a pointer to the start of frame, along with an object that has to
+# be kept alive while the pointer is used
+def _buffer_address(frame):
+	if isinstance(frame, bytes):
+		keep = ctypes.c_char_p(frame)
+		return ctypes.cast(keep, ctypes.c_void_p).value, keep
+	frame = memoryview(frame)
+	if frame.readonly or not frame.contiguous:
+		keep = frame.tobytes()
+		return _buffer_address(keep)
+	keep = (ctypes.c_char * frame.nbytes).from_buffer(frame)
+	return ctypes.addressof(keep), keep
+
+# long-lived raw socket for transmitting frames on one interface
+# strip_len bytes are removed from the end of every frame before sending,
+# e.g. eth.CRC_LEN when the frames carry an FCS that the NIC will append
+# anyway
+class Transmitter:
+	def __init__(self, interface=DEFAULT_INTERFACE, strip_len=0,
+		sndbuf=DEFAULT_SNDBUF, use_sendmmsg=True):
+		self.interface = interface
+		self.strip_len = strip_len
+		self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW)
+		self.sock.bind((interface, 0))
+		if sndbuf:
+			self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF,
+				sndbuf)
+		self.use_sendmmsg = use_sendmmsg and _sendmmsg is not None
+		self.msgs = (mmsghdr * MAX_BATCH)()
+		self.iovs = (iovec * MAX_BATCH)()
+		for i in range(MAX_BATCH):
+			self.msgs[i].msg_hdr.msg_iov = ctypes.pointer(self.iovs[i])
+			self.msgs[i].msg_hdr.msg_iovlen = 1
+		self.frames_sent = 0
+		self.bytes_sent = 0
+		self.eagain_cnt = 0
+		self.enobufs_cnt = 0
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def close(self):
+		self.sock.close()
+
+	def stats(self):
+		return {
+			'frames_sent': self.frames_sent,
+			'bytes_sent': self.bytes_sent,
+			'eagain': self.eagain_cnt,
+			'enobufs': self.enobufs_cnt,
+		}
+
+	# counts transient errors and waits for the socket to drain
+	# returns False if the error is not a transient one
+	def _handle_error(self, err):
+		if err == errno.EAGAIN:
+			self.eagain_cnt += 1
+		elif err == errno.ENOBUFS:
+			self.enobufs_cnt += 1
+		else:
+			return False
+		select.select([], [self.sock], [], 0.001)
+		return True
+
+	def send(self, frame):
+		frame = memoryview(frame)
+		if self.strip_len:
+			frame = frame[:len(frame)-self.strip_len]
+		while True:
+			try:
+				n = self.sock.send(frame)
+				break
+			except OSError as e:
+				if not self._handle_error(e.errno):
+					raise
+		self.frames_sent += 1
+		self.bytes_sent += n
+		return n
+
+	# returns the number of bytes sent
+	def send_batch(self, frames):
+		if not self.use_sendmmsg:
+			return sum(self.send(frame) for frame in frames)
+		frames = list(frames)
+		total = 0
+		for start in range(0, len(frames), MAX_BATCH):
+			total += self._send_mmsg(frames[start:start+MAX_BATCH])
+		return total
+
+	def _send_mmsg(self, frames):
+		keep = []
+		for i, frame in enumerate(frames):
+			addr, ref = _buffer_address(frame)
+			keep.append(ref)
+			self.iovs[i].iov_base = addr
+			self.iovs[i].iov_len = memoryview(frame).nbytes - self.strip_len
+		total = 0
+		sent = 0
+		fd = self.sock.fileno()
+		while sent < len(frames):
+			n = _sendmmsg(fd, ctypes.byref(self.msgs[sent]),
+				len(frames) - sent, 0)
+			if n < 0:
+				err = ctypes.get_errno()
+				if not self._handle_error(err):
+					raise OSError(err, os.strerror(err))
+				continue
+			for i in range(sent, sent + n):
+				total += self.msgs[i].msg_len
+			sent += n
+		self.frames_sent += sent
+		self.bytes_sent += total
+		return total
+
+# PACKET_MMAP receive ring (see linux/if_packet.h)
+SOL_PACKET = 263
+PACKET_RX_RING = 5
+PACKET_STATISTICS = 6
+PACKET_VERSION = 10
+TPACKET_V3 = 2
+TP_STATUS_KERNEL = 0
+TP_STATUS_USER = 1
+ETH_P_ALL = 3
+
+# tpacket_req3: block_size, block_nr, frame_size, frame_nr,
+# retire_blk_tov, sizeof_priv, feature_req_word
+TPACKET_REQ3 = struct.Struct('=7I')
+# tpacket_stats_v3: tp_packets, tp_drops, tp_freeze_q_cnt
+TPACKET_STATS_V3 = struct.Struct('=3I')
+# tpacket_block_desc with tpacket_hdr_v1: block_status, num_pkts,
+# offset_to_first_pkt at byte 8
+BLOCK_DESC = struct.Struct('=3I')
+BLOCK_DESC_OFF = 8
+# tpacket3_hdr: tp_next_offset, tp_sec, tp_nsec, tp_snaplen, tp_len,
+# tp_status, tp_mac
+TPACKET3_HDR = struct.Struct('=6IH')
+
+DEFAULT_BLOCK_SIZE = 1 << 20
+DEFAULT_BLOCK_NR = 16
+DEFAULT_FRAME_SIZE = 2048
+# ms before the kernel hands over a partially filled block
+DEFAULT_BLOCK_TIMEOUT = 10
+
+# receives frames through a TPACKET_V3 ring shared with the kernel, so
+# frames are read straight out of the ring without a syscall or a copy each
+# the memoryviews yielded by frames() point into the ring and are
+# released when the next frame is requested, so copy anything that needs
+# to be kept
+class Receiver:
+	def __init__(self, interface=DEFAULT_INTERFACE, protocol=ETH_P_ALL,
+		block_size=DEFAULT_BLOCK_SIZE, block_nr=DEFAULT_BLOCK_NR,
+		frame_size=DEFAULT_FRAME_SIZE, block_timeout=DEFAULT_BLOCK_TIMEOUT):
+		self.interface = interface
+		self.sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW,
+			socket.htons(protocol))
+		self.sock.setsockopt(SOL_PACKET, PACKET_VERSION, TPACKET_V3)
+		self.sock.setsockopt(SOL_PACKET, PACKET_RX_RING, TPACKET_REQ3.pack(
+			block_size, block_nr, frame_size,
+			block_size * block_nr // frame_size,
+			block_timeout, 0, 0))
+		self.sock.bind((interface, protocol))
+		self.block_size = block_size
+		self.block_nr = block_nr
+		self.ring = mmap.mmap(self.sock.fileno(), block_size * block_nr,
+			mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+		self.view = memoryview(self.ring)
+		self.poll = select.poll()
+		self.poll.register(self.sock, select.POLLIN | select.POLLERR)
+		self.curr_block = 0
+		# (block, next frame, frames left) of a block left partway through
+		self.partial = None
+		self.frames_received = 0
+		self.bytes_received = 0
+		self.blocks_received = 0
+		self.packets = 0
+		self.drops = 0
+		self.freeze_cnt = 0
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def close(self):
+		self.view.release()
+		self.ring.close()
+		self.sock.close()
+
+	# the kernel resets its counters on every read, so accumulate them
+	def update_stats(self):
+		packets, drops, freeze_cnt = TPACKET_STATS_V3.unpack(
+			self.sock.getsockopt(SOL_PACKET, PACKET_STATISTICS,
+				TPACKET_STATS_V3.size))
+		self.packets += packets
+		self.drops += drops
+		self.freeze_cnt += freeze_cnt
+
+	def stats(self):
+		self.update_stats()
+		return {
+			'frames_received': self.frames_received,
+			'bytes_received': self.bytes_received,
+			'blocks_received': self.blocks_received,
+			'kernel_packets': self.packets,
+			'ring_drops': self.drops,
+			'ring_freezes': self.freeze_cnt,
+		}
+
+	# returns the offset of the next block handed to us by the kernel,
+	# waiting up to timeout ms (forever if None)
+	def next_block(self, timeout=None):
+		off = self.curr_block * self.block_size
+		while True:
+			status = BLOCK_DESC.unpack_from(self.ring,
+				off + BLOCK_DESC_OFF)[0]
+			if status & TP_STATUS_USER:
+				return off
+			if not self.poll.poll(timeout) and timeout is not None:
+				return None
+
+	def release_block(self, off):
+		struct.pack_into('=I', self.ring, off + BLOCK_DESC_OFF,
+			TP_STATUS_KERNEL)
+		self.curr_block = (self.curr_block + 1) % self.block_nr
+
+	# yields (memoryview of frame, timestamp in ns) for every received
+	# frame; stops after timeout ms without any frames
+	# a block is handed back to the kernel once all its frames have been
+	# yielded; if the caller stops partway through one, the position is
+	# kept in self.partial and the next call resumes there
+	def frames_ts(self, timeout=None):
+		view = self.view
+		while True:
+			if self.partial is not None:
+				block, pkt, left = self.partial
+				self.partial = None
+			else:
+				block = self.next_block(timeout)
+				if block is None:
+					return
+				_, left, pkt_off = BLOCK_DESC.unpack_from(self.ring,
+					block + BLOCK_DESC_OFF)
+				pkt = block + pkt_off
+			try:
+				while left:
+					(next_off, sec, nsec, snaplen, frame_len, _,
+						mac) = TPACKET3_HDR.unpack_from(self.ring, pkt)
+					self.frames_received += 1
+					self.bytes_received += snaplen
+					frame = view[pkt+mac:pkt+mac+snaplen]
+					pkt += next_off
+					left -= 1
+					yield frame, sec * 1000000000 + nsec
+					# the block is handed back to the kernel later, so
+					# make sure the frame is not used after that
+					frame.release()
+			finally:
+				if left:
+					self.partial = (block, pkt, left)
+				else:
+					self.blocks_received += 1
+					self.release_block(block)
+
+	def frames(self, timeout=None):
+		for frame, _ in self.frames_ts(timeout):
+			yield frame
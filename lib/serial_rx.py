@@ -0,0 +1,197 @@
+import mmap
+import os
+import time
+import eth
+import ffcp
+
+# the FPGA dumps its entire video cache (transmit configuration) or packet
+# buffer (receive configuration) over the uart when BTNC is pressed; both
+# are 16384 bytes (see hdl/main.v)
+DUMP_LEN = 16384
+# number of FGP blocks in a 128x128 frame
+FGP_BLOCKS = 128 * 128 // eth.FGP_BLOCK_COLORS
+
+DEFAULT_BUFFER_SIZE = 1 << 20
+DEFAULT_BATCH_SIZE = 1 << 20
+DEFAULT_MMAP_SIZE = 1 << 26
+
+# byte buffer that the serial reader appends to and the parser consumes
+# from; unconsumed bytes (at most one partial record) are moved back to the
+# start when the end is reached, so records are always contiguous
+class StreamBuffer:
+	def __init__(self, size=DEFAULT_BUFFER_SIZE):
+		self.buf = bytearray(size)
+		self.view = memoryview(self.buf)
+		self.head = 0
+		self.tail = 0
+
+	def __len__(self):
+		return self.tail - self.head
+
+	def compact(self):
+		n = self.tail - self.head
+		if self.head:
+			self.buf[:n] = self.view[self.head:self.tail]
+		self.head = 0
+		self.tail = n
+
+	def write(self, data):
+		n = len(data)
+		if n > len(self.buf) - self.tail:
+			self.compact()
+			if n > len(self.buf) - self.tail:
+				raise ValueError('stream buffer overflow')
+		self.buf[self.tail:self.tail+n] = data
+		self.tail += n
+
+	def data(self):
+		return self.view[self.head:self.tail]
+
+	def consume(self, n):
+		self.head += n
+		if self.head == self.tail:
+			self.head = self.tail = 0
+
+# splits a byte stream into fixed length records (there is no framing on
+# the uart beyond the record length) and counts frames
+# kind is 'fgp', 'ffcp' or 'dump'
+class RecordParser:
+	def __init__(self, kind='fgp', buffer_size=DEFAULT_BUFFER_SIZE):
+		self.kind = kind
+		self.record_len = {
+			'fgp': eth.FGP_LEN,
+			'ffcp': eth.FFCP_LEN,
+			'dump': DUMP_LEN,
+		}[kind]
+		self.buffer = StreamBuffer(buffer_size)
+		self.last_offset = None
+		self.num_records = 0
+		self.frames = 0
+		self.bad_offsets = 0
+		self.types = [0] * (1 << eth.FFCP_TYPE_LEN)
+
+	# returns the FGP part of a record
+	def fgp(self, record):
+		if self.kind == 'ffcp':
+			ffcp_type, _ = ffcp.parse_metadata(record[0])
+			self.types[ffcp_type] += 1
+			return record[eth.FFCP_METADATA_LEN:]
+		return record
+
+	# a frame is complete when the FGP offsets wrap around; only changed
+	# blocks may be sent, so a frame can't be detected by counting them
+	def count_frame(self, record):
+		if self.kind == 'dump':
+			self.frames += 1
+			return
+		offset = self.fgp(record)[0]
+		if offset >= FGP_BLOCKS:
+			self.bad_offsets += 1
+		elif self.last_offset is not None and offset <= self.last_offset:
+			self.frames += 1
+		self.last_offset = offset
+
+	# appends data; its records are only parsed by records()
+	def feed(self, data):
+		self.buffer.write(data)
+
+	# yields every complete record buffered so far as a memoryview, which
+	# is only valid until the next feed(); a record is consumed (and
+	# counted) when it is yielded, so stopping early leaves the rest
+	# buffered for the next call
+	def records(self):
+		while len(self.buffer) >= self.record_len:
+			view = self.buffer.data()
+			record = view[:self.record_len]
+			view.release()
+			self.buffer.consume(self.record_len)
+			self.num_records += 1
+			self.count_frame(record)
+			yield record
+
+	def stats(self):
+		res = {
+			'records': self.num_records,
+			'frames': self.frames,
+			'bad_offsets': self.bad_offsets,
+			'buffered': len(self.buffer),
+		}
+		if self.kind == 'ffcp':
+			res['types'] = list(self.types)
+		return res
+
+# appends to a file in large batches; with use_mmap, the file is
+# preallocated and written through a mapping (doubling it when full), and
+# truncated to the data written on close
+class BatchWriter:
+	def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE, use_mmap=False,
+		mmap_size=DEFAULT_MMAP_SIZE):
+		self.use_mmap = use_mmap
+		self.batch_size = batch_size
+		self.bytes_written = 0
+		self.flushes = 0
+		if use_mmap:
+			self.fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+			os.ftruncate(self.fd, mmap_size)
+			self.mm = mmap.mmap(self.fd, mmap_size)
+		else:
+			self.f = open(path, 'wb')
+			self.batch = bytearray()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *args):
+		self.close()
+
+	def write(self, data):
+		n = len(data)
+		if self.use_mmap:
+			end = self.bytes_written + n
+			if end > len(self.mm):
+				self.mm.resize(max(end, 2 * len(self.mm)))
+			self.mm[self.bytes_written:end] = data
+		else:
+			self.batch += data
+			if len(self.batch) >= self.batch_size:
+				self.flush()
+		self.bytes_written += n
+
+	def flush(self):
+		if self.use_mmap:
+			self.mm.flush()
+		elif self.batch:
+			self.f.write(self.batch)
+			self.f.flush()
+			del self.batch[:]
+		self.flushes += 1
+
+	def close(self):
+		if self.use_mmap:
+			self.mm.flush()
+			self.mm.close()
+			os.ftruncate(self.fd, self.bytes_written)
+			os.close(self.fd)
+		else:
+			self.flush()
+			self.f.close()
+
+# reports rates once every interval seconds
+class RateReporter:
+	def __init__(self, interval=1.0):
+		self.interval = interval
+		self.last_time = time.monotonic()
+		self.last = {}
+
+	# counts is a dict of running totals; returns a dict of rates per
+	# second when an interval has passed, otherwise None
+	def update(self, counts):
+		now = time.monotonic()
+		elapsed = now - self.last_time
+		if elapsed < self.interval:
+			return None
+		rates = {key: (val - self.last.get(key, 0)) / elapsed
+			for key, val in counts.items()}
+		self.last = dict(counts)
+		self.last_time = now
+		return rates
@@ -0,0 +1,148 @@
+import sys
+sys.path.append('../lib/')
+import argparse
+import os
+import aes_hdl
+import eth
+import generate_vectors
+
+# runs the checks of the vector testbenches on a python model of the
+# hardware, for when no verilog simulator is available:
+# - test_aes_vectors and test_aes_chain_vectors, with the transliterated
+#   verilog of aes_hdl (keygen_ref, encrypt_ref and decrypt_ref, not the
+#   tables the vectors were generated with), and the prev/prev_prev
+#   registers of aes_chain
+# - test_eth_rx_vectors, with the dibit crc32 module and the FCS comparison
+#   of eth_rx
+# files are read like $readmemh does (hex words, // comments skipped), and
+# the number of vectors defaults to the testbench's
+# usage: python3 check_vectors.py [--aes-ecb N] [--aes-cbc N] [--frames N]
+
+CRC_INIT = 0xffffffff
+CRC_POLY = 0xedb88320
+MASK128 = (1 << 128) - 1
+
+DEFAULT_COUNTS = {
+	'aes_ecb': 1024,
+	'aes_cbc': 48 * 16,
+	'frames': 1 << 12,
+}
+
+def readmemh(path, n):
+	words = []
+	with open(path) as f:
+		for line in f:
+			line = line.split('//')[0].strip()
+			if line:
+				words.append(int(line, 16))
+				if len(words) == n:
+					break
+	return words
+
+def split_vector(word):
+	return word >> 256, (word >> 128) & MASK128, word & MASK128
+
+def check_aes_ecb(n):
+	vectors = readmemh(os.path.join(generate_vectors.OUT_DIR,
+		'aes_ecb.mem'), n)
+	errors = 0
+	keyout = None
+	prev_key = None
+	for decrypt in (False, True):
+		for word in vectors:
+			key, x, expected = split_vector(word)
+			if decrypt:
+				x, expected = expected, x
+			if key != prev_key:
+				keyout = aes_hdl.keygen_ref(key)
+				prev_key = key
+			out = (aes_hdl.decrypt_ref if decrypt else aes_hdl.encrypt_ref)(
+				keyout, x)
+			errors += out != expected
+	return 2 * len(vectors), errors
+
+# aes_chain with cbc_enable, one block at a time
+def check_aes_cbc(n):
+	n -= n % generate_vectors.CBC_CHAIN_LEN
+	vectors = readmemh(os.path.join(generate_vectors.OUT_DIR,
+		'aes_cbc.mem'), n)
+	errors = 0
+	for decrypt in (False, True):
+		for i, word in enumerate(vectors):
+			key, x, expected = split_vector(word)
+			if decrypt:
+				x, expected = expected, x
+			if i % generate_vectors.CBC_CHAIN_LEN == 0:
+				keyout = aes_hdl.keygen_ref(key)
+				prev = prev_prev = 0
+			if decrypt:
+				prev_prev, prev = prev, x
+				out = aes_hdl.decrypt_ref(keyout, x) ^ prev_prev
+			else:
+				out = aes_hdl.encrypt_ref(keyout, x ^ prev)
+				prev = out
+			errors += out != expected
+	return 2 * len(vectors), errors
+
+def crc_step(curr, dibit):
+	curr ^= dibit
+	for _ in range(2):
+		curr = (curr >> 1) ^ (CRC_POLY if curr & 1 else 0)
+	return curr
+
+# eth_rx: the crc runs over every dibit up to the FCS, which is then
+# compared one dibit at a time against the low bits of ~curr, shifting it
+def eth_rx_accepts(frame):
+	curr = CRC_INIT
+	body_dibits = 4 * (len(frame) - eth.CRC_LEN)
+	for j in range(4 * len(frame)):
+		dibit = frame[j // 4] >> (2 * (j % 4)) & 3
+		if j < body_dibits:
+			curr = crc_step(curr, dibit)
+		elif dibit != ~curr & 3:
+			return False
+		else:
+			curr = (0b11 << 30) | (curr >> 2)
+	return True
+
+# {offset (32 bits), length (16), flags (16)}
+def split_index(word):
+	return word >> 32, word >> 16 & 0xffff, word & 0xffff
+
+def check_frames(n):
+	index = readmemh(os.path.join(generate_vectors.OUT_DIR,
+		'frames_index.mem'), n)
+	offset, length, _ = split_index(index[-1])
+	data = readmemh(os.path.join(generate_vectors.OUT_DIR, 'frames.mem'),
+		offset + length)
+	errors = 0
+	for word in index:
+		offset, length, flags = split_index(word)
+		frame = data[offset:offset+length]
+		bad_fcs = bool(flags & generate_vectors.FLAG_BAD_FCS)
+		errors += eth_rx_accepts(frame) == bad_fcs
+	return len(index), errors
+
+CHECKS = {
+	'aes_ecb': check_aes_ecb,
+	'aes_cbc': check_aes_cbc,
+	'frames': check_frames,
+}
+
+def main():
+	parser = argparse.ArgumentParser()
+	for kind, count in DEFAULT_COUNTS.items():
+		parser.add_argument('--' + kind.replace('_', '-'), type=int,
+			default=count, dest=kind)
+	args = parser.parse_args()
+	failed = False
+	for kind, check in CHECKS.items():
+		if getattr(args, kind) <= 0:
+			continue
+		n, errors = check(getattr(args, kind))
+		print('%s: %d checked, %d errors' % (kind, n, errors))
+		failed |= errors > 0
+	sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+	main()
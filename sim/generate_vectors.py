@@ -0,0 +1,248 @@
+import sys
+sys.path.append('../lib/')
+import argparse
+import hashlib
+import multiprocessing
+import os
+import random
+import time
+import aes_hdl
+import eth
+import ffcp
+
+# golden vectors for the testbenches, as $readmemh files in vectors/:
+# - aes_ecb.mem: {key, plaintext, ciphertext} per line, 384 bits, for
+#   aes_combined (see test_aes_vectors in test_aes.v); the key changes
+#   every KEY_REUSE lines
+# - aes_cbc.mem: the same for aes_chain with cbc_enable, in chains of
+#   CBC_CHAIN_LEN blocks (one FGP payload) from a reset, each with a key
+#   from the switches (aes_hdl.fpga_key)
+# - frames.mem: ethernet frames with FCS, one byte per line, and
+#   frames_index.mem: {offset (32 bits), length (16), flags (16)} per frame,
+#   where flag FLAG_BAD_FCS marks a frame whose FCS was corrupted
+# the AES vectors come from aes_hdl, the model of hdl/crypto/aes.v, so they
+# are not FIPS-197 vectors
+# every file is generated in shards of SHARD_LEN vectors across a process
+# pool; each shard has its own seed, derived from the global seed, so the
+# output doesn't depend on the number of processes
+# shards are cached in vectors/.cache under a hash of everything they
+# depend on (kind, seed, shard, and the source of this script and of every
+# module it loaded from ../lib/, directly or not), so only shards whose
+# inputs changed are regenerated
+# the testbenches are test_aes_vectors and test_aes_chain_vectors in
+# test_aes.v, and test_eth_rx_vectors in test_networking.v; check_vectors.py
+# runs the same checks on a python model of the hardware
+# usage: python3 generate_vectors.py [--seed N] [--processes N]
+#   [--aes-ecb N] [--aes-cbc N] [--frames N]
+
+OUT_DIR = 'vectors'
+CACHE_DIR = os.path.join(OUT_DIR, '.cache')
+SHARD_LEN = 1 << 14
+KEY_REUSE = 64
+CBC_CHAIN_LEN = eth.FGP_DATA_LEN // 16
+FLAG_BAD_FCS = 1
+BAD_FCS_RATE = 1 / 16
+LIB_DIR = os.path.abspath('../lib/')
+
+DEFAULT_COUNTS = {
+	'aes_ecb': 1 << 20,
+	'aes_cbc': 1 << 18,
+	'frames': 1 << 12,
+}
+
+HEX_BYTES = ['%02x\n' % b for b in range(256)]
+
+def shard_rand(seed, kind, shard):
+	digest = hashlib.sha256(('%d:%s:%d' % (seed, kind, shard)).encode())
+	return random.Random(int.from_bytes(digest.digest()[:8], 'big'))
+
+def vector_line(key, plaintext, ciphertext):
+	return '%032x%032x%032x\n' % (key, plaintext, ciphertext)
+
+def gen_aes_ecb(rand, n):
+	lines = []
+	for i in range(n):
+		if i % KEY_REUSE == 0:
+			key = rand.getrandbits(128)
+			rk, _ = aes_hdl.key_schedule(key)
+		x = rand.getrandbits(128)
+		lines.append(vector_line(key, x, aes_hdl.encrypt_int(rk, x)))
+	return ''.join(lines), None
+
+def gen_aes_cbc(rand, n):
+	lines = []
+	for i in range(n):
+		if i % CBC_CHAIN_LEN == 0:
+			key = aes_hdl.fpga_key(rand.getrandbits(8))
+			rk, _ = aes_hdl.key_schedule(key)
+			prev = 0
+		x = rand.getrandbits(128)
+		prev = aes_hdl.encrypt_int(rk, x ^ prev)
+		lines.append(vector_line(key, x, prev))
+	return ''.join(lines), None
+
+# FGP frames, and FFCP frames of every type, as sent between the FPGAs
+def gen_frame(rand):
+	fgp_payload = bytes([rand.getrandbits(5)]) + rand.randbytes(
+		eth.FGP_DATA_LEN)
+	kind = rand.randrange(4)
+	if kind == 0:
+		return eth.gen_eth_f2f(eth.ETHERTYPE_FGP, fgp_payload)
+	index = rand.getrandbits(eth.FFCP_INDEX_LEN)
+	if kind == 1:
+		payload = ffcp.gen_ffcp_payload(eth.FFCP_TYPE_ACK, index)
+	else:
+		payload = ffcp.gen_ffcp_payload(eth.FFCP_TYPE_SYN if kind == 2
+			else eth.FFCP_TYPE_MSG, index, fgp_payload)
+	return eth.gen_eth_f2f(eth.ETHERTYPE_FFCP, payload)
+
+def gen_frames(rand, n):
+	data = []
+	index = []
+	for _ in range(n):
+		frame = bytearray(gen_frame(rand))
+		flags = 0
+		if rand.random() < BAD_FCS_RATE:
+			frame[-1 - rand.randrange(eth.CRC_LEN)] ^= 1 << rand.randrange(8)
+			flags |= FLAG_BAD_FCS
+		data.append(''.join(map(HEX_BYTES.__getitem__, frame)))
+		index.append('%d %d\n' % (len(frame), flags))
+	return ''.join(data), ''.join(index)
+
+GENERATORS = {
+	'aes_ecb': gen_aes_ecb,
+	'aes_cbc': gen_aes_cbc,
+	'frames': gen_frames,
+}
+
+# this script, and every module loaded from LIB_DIR by the time it runs
+def sources():
+	paths = [os.path.abspath(__file__)]
+	for module in list(sys.modules.values()):
+		path = getattr(module, '__file__', None)
+		if path and os.path.dirname(os.path.abspath(path)) == LIB_DIR:
+			paths.append(os.path.abspath(path))
+	return sorted(set(paths))
+
+def source_hash():
+	h = hashlib.sha256()
+	for path in sources():
+		with open(path, 'rb') as f:
+			h.update(os.path.basename(path).encode() + b'\0' + f.read())
+	return h.hexdigest()
+
+def shard_key(sources, seed, kind, shard, n):
+	return hashlib.sha256(('%s:%d:%s:%d:%d:%d' % (sources, seed, kind,
+		shard, n, SHARD_LEN)).encode()).hexdigest()[:32]
+
+def cache_paths(kind, key):
+	base = os.path.join(CACHE_DIR, '%s-%s' % (kind, key))
+	return base + '.mem', base + '.idx'
+
+def is_cached(task):
+	mem_path, idx_path = cache_paths(task[0], task[-1])
+	return os.path.exists(mem_path) and (task[0] != 'frames' or
+		os.path.exists(idx_path))
+
+def write_atomic(path, text):
+	tmp = '%s.%d.tmp' % (path, os.getpid())
+	with open(tmp, 'w') as f:
+		f.write(text)
+	os.replace(tmp, path)
+
+def _work(task):
+	kind, seed, shard, n, key = task
+	start = time.perf_counter()
+	data, index = GENERATORS[kind](shard_rand(seed, kind, shard), n)
+	mem_path, idx_path = cache_paths(kind, key)
+	if index is not None:
+		write_atomic(idx_path, index)
+	write_atomic(mem_path, data)
+	return kind, shard, time.perf_counter() - start
+
+def shards(kind, count, seed, sources):
+	for shard, start in enumerate(range(0, count, SHARD_LEN)):
+		n = min(SHARD_LEN, count - start)
+		yield kind, seed, shard, n, shard_key(sources, seed, kind, shard, n)
+
+# the first line of each output is a comment with the hash of its shards,
+# so unchanged outputs aren't rewritten either; frames_index.mem has the
+# same header as frames.mem
+def read_header(path):
+	try:
+		with open(path) as f:
+			return f.readline().strip()
+	except FileNotFoundError:
+		return None
+
+def assemble(kind, tasks):
+	header = '// %s %s' % (kind, hashlib.sha256(''.join(
+		task[-1] for task in tasks).encode()).hexdigest()[:32])
+	mem_path = os.path.join(OUT_DIR, kind + '.mem')
+	index_path = os.path.join(OUT_DIR, 'frames_index.mem')
+	if read_header(mem_path) == header and (kind != 'frames' or
+		read_header(index_path) == header):
+		return False
+	count = sum(task[3] for task in tasks)
+	if kind == 'frames':
+		offset = 0
+		lines = [header + '\n']
+		for task in tasks:
+			with open(cache_paths(kind, task[-1])[1]) as f:
+				for line in f:
+					length, flags = map(int, line.split())
+					lines.append('%08x%04x%04x\n' % (offset, length, flags))
+					offset += length
+		write_atomic(index_path, ''.join(lines))
+	tmp = '%s.%d.tmp' % (mem_path, os.getpid())
+	with open(tmp, 'w') as out:
+		out.write(header + '\n// %d %s\n' % (count,
+			'frames' if kind == 'frames' else 'vectors'))
+		for task in tasks:
+			with open(cache_paths(kind, task[-1])[0]) as f:
+				while True:
+					buf = f.read(1 << 20)
+					if not buf:
+						break
+					out.write(buf)
+	os.replace(tmp, mem_path)
+	return True
+
+# removes cached shards of the generated kinds that weren't used
+def prune(kinds, keep):
+	for name in os.listdir(CACHE_DIR):
+		kind, _, rest = name.rpartition('-')
+		if kind in kinds and rest.split('.')[0] not in keep:
+			os.remove(os.path.join(CACHE_DIR, name))
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument('--seed', type=int, default=0)
+	parser.add_argument('--processes', type=int, default=os.cpu_count())
+	for kind, count in DEFAULT_COUNTS.items():
+		parser.add_argument('--' + kind.replace('_', '-'), type=int,
+			default=count, dest=kind)
+	args = parser.parse_args()
+	os.makedirs(CACHE_DIR, exist_ok=True)
+	sources = source_hash()
+	tasks = {kind: list(shards(kind, getattr(args, kind), args.seed, sources))
+		for kind in GENERATORS if getattr(args, kind) > 0}
+	todo = [task for kind_tasks in tasks.values() for task in kind_tasks
+		if not is_cached(task)]
+	start = time.perf_counter()
+	if todo:
+		with multiprocessing.get_context('fork').Pool(args.processes) as pool:
+			for kind, shard, elapsed in pool.imap_unordered(_work, todo):
+				print('%s shard %d: %.1fs' % (kind, shard, elapsed))
+	cached = sum(len(kind_tasks) for kind_tasks in tasks.values()) - len(todo)
+	for kind, kind_tasks in tasks.items():
+		written = assemble(kind, kind_tasks)
+		print('%s: %d %s' % (kind, sum(task[3] for task in kind_tasks),
+			'written' if written else 'unchanged'))
+	prune(set(tasks), {task[-1] for kind_tasks in tasks.values()
+		for task in kind_tasks})
+	print('%d shards generated, %d cached, %.1fs' % (len(todo), cached,
+		time.perf_counter() - start))
+
+if __name__ == '__main__':
+	main()
@@ -165,3 +165,150 @@ initial begin
 end
 
 endmodule
+
+// checks aes_combined against vectors/aes_ecb.mem from generate_vectors.py,
+// encrypting every vector and then decrypting them
+module test_aes_vectors();
+
+`include "params.vh"
+
+// golden vectors from generate_vectors.py, by default the first NUM_VECTORS
+// of vectors/aes_ecb.mem; +vector_file=PATH and +vectors=N override them,
+// up to MAX_VECTORS (the size of the array)
+parameter VECTOR_FILE = "vectors/aes_ecb.mem";
+parameter NUM_VECTORS = 1024;
+parameter MAX_VECTORS = 1 << 16;
+
+reg clk = 0;
+// 50MHz clock
+initial forever #10 clk = ~clk;
+
+// {key, plaintext, ciphertext}
+reg [3*BLOCK_LEN-1:0] vectors [0:MAX_VECTORS-1];
+reg [8*256-1:0] vector_file = VECTOR_FILE;
+integer num_vectors = NUM_VECTORS;
+
+reg rst = 1;
+reg inclk = 0;
+reg decr_select = 0;
+reg [BLOCK_LEN-1:0] key = 0, in = 0, expected = 0, prev_key = 0;
+wire outclk;
+wire [BLOCK_LEN-1:0] out;
+aes_combined aes_inst(
+	.clk(clk), .rst(rst),
+	.inclk(inclk), .in(in), .key(key),
+	.outclk(outclk), .out(out), .decr_select(decr_select));
+
+integer i;
+integer errors = 0;
+initial begin
+	if ($value$plusargs("vector_file=%s", vector_file)) ;
+	if ($value$plusargs("vectors=%d", num_vectors) &&
+		num_vectors > MAX_VECTORS)
+		num_vectors = MAX_VECTORS;
+	$readmemh(vector_file, vectors, 0, num_vectors-1);
+	for (i = 0; i < 2 * num_vectors; i = i + 1) begin
+		@(negedge clk);
+		{key, in, expected} = vectors[i % num_vectors];
+		if (i >= num_vectors)
+			{in, expected} = {expected, in};
+		// the round keys are only generated after a reset
+		if (i == 0 || i == num_vectors || key != prev_key) begin
+			rst = 1;
+			decr_select = i >= num_vectors;
+			@(negedge clk);
+			rst = 0;
+			repeat (16) @(negedge clk);
+		end
+		prev_key = key;
+		inclk = 1;
+		@(negedge clk);
+		inclk = 0;
+		wait (outclk);
+		if (out !== expected) begin
+			errors = errors + 1;
+			if (errors <= 10)
+				$display("vector %0d: got %h, expected %h", i, out, expected);
+		end
+	end
+	$display("%0d vectors, %0d errors", 2 * num_vectors, errors);
+	$stop();
+end
+
+endmodule
+
+module test_aes_chain_vectors();
+
+`include "params.vh"
+
+// vectors/aes_cbc.mem: aes_chain with cbc_enable, in chains of CHAIN_LEN
+// blocks from a reset (the CBC_CHAIN_LEN of generate_vectors.py); the
+// chains are encrypted, then decrypted, in order
+// +vector_file=PATH and +vectors=N work as in test_aes_vectors, and N is
+// rounded down to whole chains
+parameter VECTOR_FILE = "vectors/aes_cbc.mem";
+parameter NUM_VECTORS = 48 * 16;
+parameter MAX_VECTORS = 48 * 1024;
+parameter CHAIN_LEN = 48;
+
+reg clk = 0;
+// 50MHz clock
+initial forever #10 clk = ~clk;
+
+// {key, plaintext, ciphertext}
+reg [3*BLOCK_LEN-1:0] vectors [0:MAX_VECTORS-1];
+reg [8*256-1:0] vector_file = VECTOR_FILE;
+integer num_vectors = NUM_VECTORS;
+
+reg rst = 1;
+reg inclk = 0;
+reg decr_select = 0;
+reg [BLOCK_LEN-1:0] key = 0, in = 0, expected = 0;
+wire outclk;
+wire [BLOCK_LEN-1:0] out;
+aes_chain aes_inst(
+	.clk(clk), .rst(rst),
+	.inclk(inclk), .in(in), .key(key),
+	.outclk(outclk), .out(out),
+	.decr_select(decr_select), .cbc_enable(1'b1));
+
+integer i;
+integer errors = 0;
+initial begin
+	if ($value$plusargs("vector_file=%s", vector_file)) ;
+	if ($value$plusargs("vectors=%d", num_vectors) &&
+		num_vectors > MAX_VECTORS)
+		num_vectors = MAX_VECTORS;
+	num_vectors = num_vectors - num_vectors % CHAIN_LEN;
+	$readmemh(vector_file, vectors, 0, num_vectors-1);
+	for (i = 0; i < 2 * num_vectors; i = i + 1) begin
+		@(negedge clk);
+		{key, in, expected} = vectors[i % num_vectors];
+		if (i >= num_vectors)
+			{in, expected} = {expected, in};
+		// every chain starts from a reset, which also clears prev
+		if (i % CHAIN_LEN == 0) begin
+			rst = 1;
+			decr_select = i >= num_vectors;
+			@(negedge clk);
+			rst = 0;
+			repeat (16) @(negedge clk);
+		end
+		inclk = 1;
+		@(negedge clk);
+		inclk = 0;
+		wait (outclk);
+		if (out !== expected) begin
+			errors = errors + 1;
+			if (errors <= 10)
+				$display("vector %0d: got %h, expected %h", i, out, expected);
+		end
+		// prev is taken from out on the same edge, so it is only valid
+		// for the next block a cycle later
+		@(negedge clk);
+	end
+	$display("%0d vectors, %0d errors", 2 * num_vectors, errors);
+	$stop();
+end
+
+endmodule
@@ -459,3 +459,122 @@ initial begin
 end
 
 endmodule
+
+module test_eth_rx_vectors();
+
+`include "networking.vh"
+
+// golden frames from generate_vectors.py: vectors/frames.mem has one byte
+// per line, and vectors/frames_index.mem {offset, length, flags} per frame;
+// every frame is sent to eth_rx one dibit per cycle (without preamble, like
+// the sample frame of test_packet_parse), and must be accepted with its
+// payload intact, or rejected if its FCS was corrupted
+// +frames=N checks the first N frames (NUM_FRAMES if not given), up to
+// MAX_FRAMES; +frames_file=PATH and +index_file=PATH change the files
+parameter FRAMES_FILE = "vectors/frames.mem";
+parameter INDEX_FILE = "vectors/frames_index.mem";
+parameter NUM_FRAMES = 1 << 12;
+parameter MAX_FRAMES = 1 << 12;
+// the longest frame is an FFCP message
+localparam MAX_FRAME_LEN = 2*ETH_MAC_LEN + ETH_ETHERTYPE_LEN + FFCP_LEN +
+	ETH_CRC_LEN;
+localparam HEADER_LEN = 2*ETH_MAC_LEN + ETH_ETHERTYPE_LEN;
+localparam FLAG_BAD_FCS = 1;
+
+reg clk = 0;
+// 50MHz clock
+initial forever #10 clk = ~clk;
+
+reg [BYTE_LEN-1:0] frames [0:MAX_FRAMES*MAX_FRAME_LEN-1];
+// {offset (32 bits), length (16), flags (16)}
+reg [63:0] index [0:MAX_FRAMES-1];
+reg [8*256-1:0] frames_file = FRAMES_FILE, index_file = INDEX_FILE;
+integer num_frames = NUM_FRAMES;
+
+reg rst = 1;
+reg inclk = 0, in_done = 0;
+reg [1:0] in = 0;
+wire outclk, err, done;
+wire [BYTE_LEN-1:0] out;
+wire ethertype_outclk;
+wire [ETH_ETHERTYPE_LEN*BYTE_LEN-1:0] ethertype_out;
+// the payload length comes from the index instead of a downstream parser
+reg [31:0] offset = 0;
+reg [15:0] payload_len = 0, payload_cnt = 0;
+wire downstream_done;
+assign downstream_done = outclk && payload_cnt == payload_len - 1;
+eth_rx eth_rx_inst(
+	.clk(clk), .rst(rst),
+	.inclk(inclk), .in(in), .in_done(in_done),
+	.downstream_done(downstream_done),
+	.outclk(outclk), .out(out),
+	.ethertype_outclk(ethertype_outclk), .ethertype_out(ethertype_out),
+	.err(err), .done(done));
+
+reg got_err = 0, got_done = 0;
+integer payload_errors = 0;
+always @(posedge clk) begin
+	if (err)
+		got_err <= 1;
+	if (done)
+		got_done <= 1;
+	if (outclk) begin
+		if (out !== frames[offset + HEADER_LEN + payload_cnt])
+			payload_errors = payload_errors + 1;
+		payload_cnt <= payload_cnt + 1;
+	end
+end
+
+integer i, j;
+integer errors = 0, bad_fcs = 0;
+reg [15:0] len, flags;
+reg [BYTE_LEN-1:0] curr;
+initial begin
+	if ($value$plusargs("frames_file=%s", frames_file)) ;
+	if ($value$plusargs("index_file=%s", index_file)) ;
+	if ($value$plusargs("frames=%d", num_frames) && num_frames > MAX_FRAMES)
+		num_frames = MAX_FRAMES;
+	$readmemh(index_file, index, 0, num_frames-1);
+	{offset, len, flags} = index[num_frames-1];
+	$readmemh(frames_file, frames, 0, offset + len - 1);
+	#100
+	rst = 0;
+	for (i = 0; i < num_frames; i = i + 1) begin
+		@(negedge clk);
+		{offset, len, flags} = index[i];
+		payload_len = len - HEADER_LEN - ETH_CRC_LEN;
+		payload_cnt = 0;
+		got_err = 0;
+		got_done = 0;
+		payload_errors = 0;
+		for (j = 0; j < 4 * len; j = j + 1) begin
+			curr = frames[offset + j / 4];
+			inclk = 1;
+			in = curr[2 * (j % 4)+:2];
+			in_done = j == 4 * len - 1;
+			@(negedge clk);
+		end
+		inclk = 0;
+		in_done = 0;
+		// the gap resets eth_rx (frame_rst)
+		repeat (4 * ETH_GAP_LEN) @(negedge clk);
+		if (flags & FLAG_BAD_FCS) begin
+			bad_fcs = bad_fcs + 1;
+			if (got_done || !got_err) begin
+				errors = errors + 1;
+				if (errors <= 10)
+					$display("frame %0d: corrupted FCS accepted", i);
+			end
+		end else if (!got_done || got_err || payload_errors) begin
+			errors = errors + 1;
+			if (errors <= 10)
+				$display("frame %0d: done %0d, err %0d, %0d payload errors",
+					i, got_done, got_err, payload_errors);
+		end
+	end
+	$display("%0d frames (%0d with bad FCS), %0d errors", num_frames,
+		bad_fcs, errors);
+	$stop();
+end
+
+endmodule